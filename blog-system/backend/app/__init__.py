@@ -6,13 +6,18 @@
 
 from flask import Flask
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from app.config import Config
+from app.utils.cache import ResponseCache
+from app.utils.engine import engine_options, init_engine
+from app.utils.fastjson import FastJSONProvider
+from app.utils.replica import RoutingSession, init_replica
+from app.utils.tokens import CachingJWTManager
 
 # 初始化扩展
-db = SQLAlchemy()  # SQLAlchemy数据库实例
-jwt = JWTManager()  # JWT认证管理器
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # SQLAlchemy数据库实例，只读接口可路由到只读库
+jwt = CachingJWTManager()  # JWT认证管理器（缓存解码结果与用户认证状态，支持令牌吊销）
+cache = ResponseCache()  # 公开接口响应缓存
 
 
 def create_app(config_class=Config):
@@ -28,9 +33,17 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # 使用 orjson 编码JSON响应，原生支持 datetime 与枚举
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.json.sort_keys = app.config.get('JSON_SORT_KEYS', True)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    
     # 初始化扩展
     db.init_app(app)
     jwt.init_app(app)
+    cache.init_app(app)
+    init_replica(app)
     
     # 配置CORS，确保OPTIONS请求能正确处理
     # 允许所有来源，支持凭证，允许所有方法和头
@@ -52,8 +65,36 @@ def create_app(config_class=Config):
     app.register_blueprint(comments_bp, url_prefix='/api/comments')  # 注册评论路由
     app.register_blueprint(admin_bp, url_prefix='/api/admin')        # 注册管理员路由
     
-    # 创建数据库表
+    # 配置异步结构化日志（按蓝图设置级别，因此在注册蓝图之后）
+    from app.utils.log import init_logging
+    init_logging(app)
+    
+    # 实时推送后端（评论SSE）
+    from app.utils.realtime import init_realtime
+    init_realtime(app)
+    
+    # 后台任务队列（工作线程在各进程首次处理请求或提交任务时启动）
+    from app.utils.jobs import init_jobs
+    init_jobs(app)
+    
+    # 响应压缩（缓存的响应在写入缓存时已预先压缩）
+    from app.utils.compression import init_compression
+    init_compression(app)
+    
+    # 创建数据库表，补齐已有数据库中缺失的列，初始化请求指标、全文检索索引、站点计数和正文渲染缓存
+    from app.schema import upgrade_schema
+    from app.utils.search import init_search
+    from app.utils.stats import init_stats
+    from app.utils.rendering import init_rendering
+    from app.utils.metrics import init_metrics
     with app.app_context():
-        db.create_all()
+        for engine in db.engines.values():
+            init_engine(app, engine)
+        init_metrics(app, db.engines.values())
+        db.create_all(bind_key=None)  # 只在主库建表，只读库的结构由复制同步
+        upgrade_schema()
+        init_search(app)
+        init_stats(app)
+        init_rendering(app)
     
     return app
\ No newline at end of file
@@ -8,6 +8,24 @@ import os
 from datetime import timedelta
 
 
+def _default_sse_connections():
+    """
+    按Gunicorn的并发模型估算每进程SSE连接数上限（与 gunicorn.conf.py 读取相同的环境变量）：
+
+    - gthread：每个SSE连接在连接期间占用一个工作线程，上限为 GUNICORN_THREADS - SSE_RESERVED_THREADS，
+      保留的线程始终可以处理普通请求；SSE连接不占用数据库连接，为推送调大线程数时无需同步调大连接池
+    - gevent / eventlet：每个连接是一个协程，上限为 GUNICORN_WORKER_CONNECTIONS - SSE_RESERVED_THREADS
+
+    例如默认的每进程8个线程保留2个，每进程最多6个SSE连接；需要更多在线读者时调大 GUNICORN_THREADS
+    （每个空闲线程约占几十KB内存）或改用 gevent 工作进程
+    """
+    threads = int(os.environ.get('GUNICORN_THREADS', 8))
+    reserved = int(os.environ.get('SSE_RESERVED_THREADS', max(2, threads // 4)))
+    if os.environ.get('GUNICORN_WORKER_CLASS', 'gthread') in ('gevent', 'eventlet'):
+        return max(1, int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000)) - reserved)
+    return max(1, threads - reserved)
+
+
 class Config:
     """
     应用配置类
@@ -27,9 +45,91 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{os.path.join(INSTANCE_DIR, "blog_system.db")}'  # 数据库连接URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # 关闭SQLAlchemy的修改追踪
     
+    # 数据库连接池配置：每个工作进程一个连接池，总连接数约为 工作进程数 * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),  # 常驻连接数，与溢出连接数之和建议不小于每进程线程数
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),  # 高峰期额外创建的连接数
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),  # 等待空闲连接的最长时间（秒）
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 3600)),  # 连接最长使用时间（秒），应小于MySQL的wait_timeout
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',  # 使用前检测连接是否可用
+    }
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))  # 查询超时（毫秒），0表示不限制
+    SQLITE_PRAGMAS = os.environ.get('SQLITE_PRAGMAS', 'journal_mode=WAL,synchronous=NORMAL,busy_timeout=5000')  # SQLite连接参数
+    
+    # 读写分离配置
+    DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL')  # 只读库地址，未设置时全部查询使用主库
+    SQLALCHEMY_BINDS = {'replica': DATABASE_READ_URL} if DATABASE_READ_URL else {}  # 只读库绑定
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))  # 写入后读请求固定使用主库的时间（秒）
+    
+    # 日志配置
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')  # 应用日志级别
+    LOG_BLUEPRINT_LEVELS = os.environ.get('LOG_BLUEPRINT_LEVELS', '')  # 按蓝图设置日志级别，例如 admin=DEBUG,auth=WARNING
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')  # 日志格式：json / text
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 0.1))  # DEBUG日志按请求采样的比例
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))  # 日志队列长度，队列满时丢弃日志
+    LOG_PROPAGATE = os.environ.get('LOG_PROPAGATE', '0') == '1'  # 是否同时交给根日志记录器处理
+    
+    # 性能指标配置
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'  # 是否记录请求指标并开放 /metrics
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # 访问 /metrics 时携带 Authorization: Bearer <token>
+    METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '')  # 无需令牌即可访问 /metrics 的IP或网段（逗号分隔）；与 METRICS_TOKEN 都未设置时 /metrics 不开放
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # 慢查询阈值（毫秒），0表示不记录
+    
+    # 分页配置
+    COUNT_CACHE_TTL = int(os.environ.get('COUNT_CACHE_TTL', 60))  # 游标分页总数缓存时间（秒）
+    
+    # 响应缓存配置
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'lru')  # 缓存后端：lru / redis / none
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # 缓存时间（秒）
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 2048))  # LRU后端最大条目数
+    RESPONSE_CACHE_MAX_TAGS = int(os.environ.get('RESPONSE_CACHE_MAX_TAGS', 8192))  # LRU后端保存的标签版本号上限，按最近使用淘汰
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')  # Redis后端地址
+    
     # JWT认证配置
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'your-secret-key-here'  # JWT密钥
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)  # JWT令牌过期时间
+    AUTH_STATE_CACHE_SIZE = int(os.environ.get('AUTH_STATE_CACHE_SIZE', 4096))  # 用户认证状态缓存条目数
+    AUTH_STATE_CACHE_TTL = int(os.environ.get('AUTH_STATE_CACHE_TTL', 60))  # 用户认证状态缓存时间（秒）
+    AUTH_STATE_LOCAL_TTL = int(os.environ.get('AUTH_STATE_LOCAL_TTL', 5))  # 未使用redis缓存后端时的认证状态缓存时间（秒），即吊销在其他进程生效的最长延迟
+    
+    # 密码哈希与登录限制配置
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2')  # 哈希方法，如 pbkdf2:sha256:300000、scrypt:32768:8:1
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # 每进程哈希线程数，0表示在请求线程中计算
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 16))  # 等待哈希的最大请求数，超出返回503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # 等待哈希结果的最长时间（秒）
+    LOGIN_RATE_LIMIT = int(os.environ.get('LOGIN_RATE_LIMIT', 10))  # 每个IP在时间窗口内允许的登录次数，0表示不限制
+    LOGIN_RATE_WINDOW = int(os.environ.get('LOGIN_RATE_WINDOW', 60))  # 登录频率限制时间窗口（秒）
+    
+    # 批量写入配置
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))  # 批量接口单次最多提交的条目数
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 200))  # 批量写入时每个事务写入的条目数
+    IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))  # 幂等键保留时间（秒）
+    
+    # 实时推送（SSE）配置
+    REALTIME_BACKEND = os.environ.get('REALTIME_BACKEND', 'local')  # 推送后端：local（进程内）/ redis（多进程广播）
+    REALTIME_REDIS_URL = os.environ.get('REALTIME_REDIS_URL', RESPONSE_CACHE_REDIS_URL)  # Redis推送后端地址
+    SSE_MAX_CONNECTIONS = int(os.environ.get('SSE_MAX_CONNECTIONS', _default_sse_connections()))  # 每进程SSE连接数上限，默认值的估算方式见 _default_sse_connections
+    SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))  # 没有事件时发送心跳的间隔（秒）
+    SSE_MAX_DURATION = float(os.environ.get('SSE_MAX_DURATION', 300))  # 单个连接的最长时间（秒），到时由客户端自动重连
+    SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', 100))  # 每个订阅者缓存的事件数，消费过慢溢出时要求客户端重新拉取
+    SSE_REPLAY_LIMIT = int(os.environ.get('SSE_REPLAY_LIMIT', 100))  # 重连时按 Last-Event-ID 补发的最多评论数
+    
+    # 后台任务配置
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))  # 每进程后台任务线程数，0表示只由独立进程执行（flask --app run jobs-worker）
+    JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', 5))  # 没有新提交的任务时轮询任务表的间隔（秒）
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))  # 任务最多执行次数，用尽后标记为 failed
+    JOB_RETRY_BASE_SECONDS = float(os.environ.get('JOB_RETRY_BASE_SECONDS', 10))  # 首次失败后的重试间隔（秒），之后每次加倍
+    JOB_RETRY_MAX_SECONDS = float(os.environ.get('JOB_RETRY_MAX_SECONDS', 3600))  # 重试间隔上限（秒）
+    JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', 300))  # 认领超过该秒数仍未完成的任务视为执行者已崩溃，可被重新认领
+    
+    # 响应压缩配置
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') == '1'  # 是否压缩响应（已由网关压缩时可关闭）
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # 小于该字节数的响应不压缩
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))  # gzip压缩级别（1-9）
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))  # brotli压缩质量（0-11），需安装 brotli 包
+    
+    # JSON响应配置
+    JSON_SORT_KEYS = os.environ.get('JSON_SORT_KEYS', '1') == '1'  # 响应中的键按字母排序（与Flask默认行为一致）
     
     # Flask应用配置
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'  # Flask应用密钥
\ No newline at end of file
@@ -5,7 +5,8 @@
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime, Table, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from app import db
@@ -33,13 +34,61 @@ class User(db.Model):
     """
     
     __tablename__ = 'users'  # 数据库表名
+    __table_args__ = (
+        Index('idx_users_created_at', 'created_at'),  # 管理端用户列表游标分页
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)  # 用户ID，主键
     username = Column(String(50), unique=True, nullable=False)  # 用户名，唯一且必填
     email = Column(String(100), unique=True, nullable=False)  # 邮箱，唯一且必填
     password_hash = Column(String(255), nullable=False)  # 密码哈希，必填
     role = Column(Enum(UserRole), default=UserRole.user)  # 用户角色，默认普通用户
+    token_version = Column(Integer, nullable=False, default=0, server_default='0')  # 令牌版本号，递增后已签发的令牌全部失效
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # 创建时间，自动生成
+    
+    # 关联关系
+    articles = relationship('Article', back_populates='author')  # 用户发表的文章
+    comments = relationship('Comment', back_populates='author')  # 用户发表的评论
+
+
+# 文章-标签关联表
+article_tags = Table(
+    'article_tags',
+    db.metadata,
+    Column('article_id', Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),  # 文章ID
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),  # 标签ID
+    Index('idx_article_tags_tag_id', 'tag_id')  # 按标签筛选文章
+)
+
+
+# 标签模型
+class Tag(db.Model):
+    """
+    标签数据模型
+    
+    article_count 为使用该标签的已发布文章数，随文章写入同步维护
+    """
+    
+    __tablename__ = 'tags'  # 数据库表名
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 标签ID，主键
+    name = Column(String(50), unique=True, nullable=False)  # 标签名，唯一且必填
+    article_count = Column(Integer, nullable=False, default=0, server_default='0')  # 已发布文章数
+
+
+# 分类模型
+class Category(db.Model):
+    """
+    分类统计数据模型
+    
+    文章表中的 category 列保存分类名，本表只维护各分类的已发布文章数
+    """
+    
+    __tablename__ = 'categories'  # 数据库表名
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 分类ID，主键
+    name = Column(String(50), unique=True, nullable=False)  # 分类名，唯一且必填
+    article_count = Column(Integer, nullable=False, default=0, server_default='0')  # 已发布文章数
 
 
 # 文章模型
@@ -51,16 +100,31 @@ class Article(db.Model):
     """
     
     __tablename__ = 'articles'  # 数据库表名
+    __table_args__ = (
+        # 列表查询按状态筛选、按创建时间倒序；主键隐含在索引末尾，同时满足 (created_at, id) 游标分页
+        Index('idx_articles_status_created_at', 'status', 'created_at'),
+        # 个人文章列表按作者（及状态）筛选
+        Index('idx_articles_author_status_created_at', 'author_id', 'status', 'created_at'),
+        # 管理端不筛选状态时的文章列表
+        Index('idx_articles_created_at', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)  # 文章ID，主键
     title = Column(String(200), nullable=False)  # 文章标题，必填
     content = Column(Text, nullable=False)  # 文章内容，必填
+    excerpt = Column(String(255))  # 文章摘要，写入时由正文生成，列表查询无需读取正文
+    content_hash = Column(String(64), index=True)  # 正文的SHA-256，对应 rendered_contents 中的渲染结果
     author_id = Column(Integer, ForeignKey('users.id'), nullable=False)  # 作者ID，外键关联用户表
     status = Column(Enum(ArticleStatus), default=ArticleStatus.draft)  # 文章状态，默认草稿
-    category = Column(String(50))  # 文章分类
-    tags = Column(Text)  # 文章标签，使用Text存储JSON格式的标签
+    category = Column(String(50), index=True)  # 文章分类
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # 创建时间，自动生成
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())  # 更新时间，自动更新
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # 版本号，每次更新递增，用于生成ETag
+    
+    # 关联关系
+    author = relationship('User', back_populates='articles')  # 文章作者
+    tags = relationship('Tag', secondary=article_tags, order_by='Tag.id')  # 文章标签
+    comments = relationship('Comment', back_populates='article', cascade='all, delete-orphan')  # 文章评论，随文章一起删除
 
 
 # 评论模型
@@ -72,9 +136,112 @@ class Comment(db.Model):
     """
     
     __tablename__ = 'comments'  # 数据库表名
+    __table_args__ = (
+        Index('idx_comments_article_created_at', 'article_id', 'created_at'),  # 文章评论列表
+        Index('idx_comments_user_id', 'user_id'),  # 删除用户时级联查找评论
+        Index('idx_comments_created_at', 'created_at'),  # 全站最新评论
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)  # 评论ID，主键
     article_id = Column(Integer, ForeignKey('articles.id'), nullable=False)  # 文章ID，外键关联文章表
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)  # 用户ID，外键关联用户表
     content = Column(Text, nullable=False)  # 评论内容，必填
-    created_at = Column(DateTime(timezone=True), server_default=func.now())  # 创建时间，自动生成
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # 创建时间，自动生成
+    
+    # 关联关系
+    article = relationship('Article', back_populates='comments')  # 所属文章
+    author = relationship('User', back_populates='comments')  # 评论作者
+
+
+# 正文渲染结果模型
+class RenderedContent(db.Model):
+    """
+    正文渲染结果数据模型
+    
+    以正文的SHA-256为键保存Markdown渲染后的HTML、目录与阅读时间，正文相同的文章共享一条记录
+    """
+    
+    __tablename__ = 'rendered_contents'  # 数据库表名
+    
+    content_hash = Column(String(64), primary_key=True)  # 正文的SHA-256
+    renderer_version = Column(Integer, nullable=False)  # 生成该结果的渲染器版本
+    html = Column(Text(16777215), nullable=False)  # 渲染后的HTML，MySQL中为 MEDIUMTEXT
+    toc = Column(Text, nullable=False)  # 目录（JSON）
+    word_count = Column(Integer, nullable=False)  # 字数
+    reading_minutes = Column(Integer, nullable=False)  # 预计阅读分钟数
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # 创建时间，自动生成
+
+
+# 站点计数器模型
+class SiteCounter(db.Model):
+    """
+    站点计数器数据模型
+    
+    保存用户数、文章数、评论数等统计值，随数据写入在同一事务中增减
+    """
+    
+    __tablename__ = 'site_counters'  # 数据库表名
+    
+    name = Column(String(50), primary_key=True)  # 计数器名称，主键
+    value = Column(Integer, nullable=False, default=0, server_default='0')  # 当前值
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())  # 最近更新时间
+
+
+# 幂等键模型
+class IdempotencyKey(db.Model):
+    """
+    幂等键数据模型
+    
+    保存携带 Idempotency-Key 请求头的写请求的处理结果，客户端重试同一请求时直接返回保存的响应；
+    status_code 为空表示请求仍在处理中
+    """
+    
+    __tablename__ = 'idempotency_keys'  # 数据库表名
+    
+    scope = Column(String(150), primary_key=True)  # 作用域（端点与用户），同一个键在不同接口或用户之间互不影响
+    key = Column(String(100), primary_key=True)  # 客户端提供的幂等键
+    fingerprint = Column(String(64), nullable=False)  # 请求体的SHA-256，用于识别同一个键被用于不同的请求
+    status_code = Column(Integer)  # 响应状态码，处理完成前为空
+    response_body = Column(Text(16777215))  # 响应体（JSON），MySQL中为 MEDIUMTEXT
+    expires_at = Column(DateTime, nullable=False, index=True)  # 过期时间，过期后该键可以重新使用
+
+
+# 已吊销令牌模型
+class RevokedToken(db.Model):
+    """
+    已吊销令牌数据模型
+    
+    保存单独退出登录的令牌（jti），各进程加载用户认证状态时一并读取，令牌过期后清理
+    """
+    
+    __tablename__ = 'revoked_tokens'  # 数据库表名
+    
+    jti = Column(String(36), primary_key=True)  # 令牌ID
+    user_id = Column(Integer, nullable=False, index=True)  # 令牌所属用户ID
+    expires_at = Column(DateTime, nullable=False, index=True)  # 令牌过期时间（UTC），过期后该记录可以删除
+
+# 后台任务模型
+class Job(db.Model):
+    """
+    后台任务数据模型
+    
+    写接口在同一事务中插入任务，由后台工作线程或独立的工作进程认领并执行，成功后删除；
+    多次失败的任务标记为 failed 保留在表中，便于排查后重新排队
+    """
+    
+    __tablename__ = 'jobs'  # 数据库表名
+    __table_args__ = (
+        Index('idx_jobs_status_run_at', 'status', 'run_at'),  # 工作线程按到期时间认领任务
+    )
+    
+    id = Column(Integer, primary_key=True)  # 任务ID，主键
+    name = Column(String(100), nullable=False)  # 任务名称，对应已注册的处理函数
+    payload = Column(Text, nullable=False)  # 处理函数的参数（JSON）
+    status = Column(String(20), nullable=False, default='pending')  # 状态：pending / running / failed
+    attempts = Column(Integer, nullable=False, default=0)  # 已执行次数
+    max_attempts = Column(Integer, nullable=False)  # 最多执行次数，用尽后标记为 failed
+    run_at = Column(DateTime, nullable=False)  # 最早执行时间（UTC），失败后按退避时间推迟
+    locked_by = Column(String(150))  # 执行该任务的工作线程
+    locked_at = Column(DateTime)  # 认领时间（UTC），超过锁定时间视为执行者已崩溃
+    last_error = Column(Text)  # 最近一次失败的错误信息
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # 创建时间，自动生成
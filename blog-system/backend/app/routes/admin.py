@@ -1,12 +1,26 @@
-from flask import Blueprint, request, jsonify
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt
-from app.models import User, Article, Comment, ArticleStatus, UserRole
-from app import db
-from app.utils.auth import hash_password
-import json
-import traceback
+from datetime import datetime, timedelta
+from app.models import User, Article, ArticleStatus, Comment, UserRole, article_tags
+from app import db, cache, jwt
+from app.utils.auth import hash_password, busy_response, HashingBusyError
+from app.utils.pagination import cursor_requested, keyset_paginate
+from app.utils.search import remove_from_index
+from app.utils.engine import pool_stats
+from app.utils.export import EXPORT_FORMATS, iter_csv, iter_ndjson, iter_json_document, stream_response
+from app.utils import taxonomy, stats, bulk, rendering
+from app.utils.replica import replica_read
+from app.utils.idempotency import idempotent
+from app.serializers import (
+    users as user_serializer, articles as article_serializer, USER_ADMIN_FIELDS, ARTICLE_ADMIN_FIELDS
+)
+from sqlalchemy import or_, func
+from sqlalchemy.orm import defer, selectinload
+import logging
 
 admin_bp = Blueprint('admin', __name__)
+logger = logging.getLogger(__name__)
 
 def admin_required():
     """管理员权限装饰器"""
@@ -15,12 +29,20 @@ def admin_required():
         return jsonify({'message': '需要管理员权限'}), 403
     return None
 
+def admin_only(view):
+    """视图执行前检查管理员权限；放在 @idempotent 之前，未通过检查的请求不会登记幂等键"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        error = admin_required()
+        if error:
+            return error
+        return view(*args, **kwargs)
+    return wrapper
+
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_all_users():
     """获取所有用户列表"""
-    print("接收到获取用户列表的请求")
-    
     # 检查管理员权限
     error = admin_required()
     if error:
@@ -42,13 +64,13 @@ def get_all_users():
                 page = max(1, page)  # 确保页码至少为1
                 per_page = min(100, max(1, per_page))  # 限制每页数量在1-100之间
             except ValueError:
-                print("页码或每页数量不是有效整数，使用默认值")
+                logger.debug('页码或每页数量不是有效整数，使用默认值')
                 page = 1
                 per_page = 10
                 
-            print(f"解析参数成功: page={page}, per_page={per_page}, search={search}")
+            logger.debug('用户列表参数: page=%s per_page=%s search=%s', page, per_page, search)
         except Exception as e:
-            print(f"参数处理异常: {type(e).__name__}: {str(e)}")
+            logger.warning('用户列表参数处理异常: %s: %s', type(e).__name__, e)
             return jsonify({
                 'message': '请求参数格式错误',
                 'error_type': type(e).__name__,
@@ -60,46 +82,35 @@ def get_all_users():
         
         # 添加搜索条件
         if search:
-            print(f"应用搜索条件: {search}")
             query = query.filter(User.username.ilike(f'%{search}%') | User.email.ilike(f'%{search}%'))
         
         try:
-            # 执行分页查询
-            print("执行用户数据分页查询")
-            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-            print(f"查询成功，找到{pagination.total}个用户")
+            # 执行分页查询：传入 cursor 参数时使用游标分页，否则使用页码分页
+            if cursor_requested():
+                try:
+                    items, page_meta = keyset_paginate(query, User, f'admin_users:search={search}')
+                except ValueError as e:
+                    return jsonify({'message': str(e)}), 400
+            else:
+                pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+                items = pagination.items
+                page_meta = {
+                    'total': pagination.total,
+                    'page': page,
+                    'per_page': per_page,
+                    'pages': pagination.pages
+                }
             
             # 构建响应数据
-            user_list = []
-            for user in pagination.items:
-                try:
-                    user_dict = {
-                        'id': int(user.id),  # 确保ID是整数
-                        'username': str(user.username) if user.username else '',  # 确保是字符串并处理空值
-                        'email': str(user.email) if user.email else '',  # 确保是字符串并处理空值
-                        'role': str(user.role.value) if hasattr(user.role, 'value') else str(user.role),  # 安全获取角色值
-                        'created_at': user.created_at.isoformat() if user.created_at else None  # 处理可能的空值
-                    }
-                    user_list.append(user_dict)
-                except Exception as e:
-                    print(f"处理用户数据时出错: {type(e).__name__}: {str(e)}")
-                    # 跳过有问题的用户数据，继续处理其他用户
-                    continue
+            user_list = user_serializer.dump_many(items, USER_ADMIN_FIELDS)
             
             # 构造最终响应
-            response_data = {
-                'users': user_list,
-                'total': pagination.total,
-                'page': page,
-                'per_page': per_page,
-                'pages': pagination.pages
-            }
+            response_data = {'users': user_list, **page_meta}
             
-            print(f"响应数据构造完成，包含{len(user_list)}个用户")
+            logger.debug('用户列表返回 %d 个用户', len(user_list))
             return jsonify(response_data), 200
         except Exception as e:
-            print(f"数据库查询或处理异常: {type(e).__name__}: {str(e)}")
-            traceback.print_exc()
+            logger.exception('用户列表查询或处理异常')
             return jsonify({
                 'message': '数据处理错误',
                 'error_type': type(e).__name__,
@@ -107,8 +118,7 @@ def get_all_users():
             }), 500
     
     except Exception as e:
-        print(f"发生未捕获异常: {type(e).__name__}: {str(e)}")
-        traceback.print_exc()
+        logger.exception('获取用户列表时发生未捕获异常')
         return jsonify({
             'message': '服务器内部错误',
             'error_type': type(e).__name__,
@@ -119,8 +129,6 @@ def get_all_users():
 @jwt_required()
 def get_user(user_id):
     """获取单个用户信息"""
-    print("接收到获取用户信息的请求")
-    
     # 检查管理员权限
     error = admin_required()
     if error:
@@ -128,22 +136,12 @@ def get_user(user_id):
     
     user = User.query.get_or_404(user_id)
     
-    user_data = {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'role': user.role.value if hasattr(user.role, 'value') else user.role,
-        'created_at': user.created_at.isoformat() if user.created_at else None
-    }
-    
-    return jsonify(user_data), 200
+    return jsonify(user_serializer.dump(user, USER_ADMIN_FIELDS)), 200
 
 @admin_bp.route('/users/<int:user_id>', methods=['PUT'])
 @jwt_required()
 def update_user(user_id):
     """更新用户信息"""
-    print("接收到更新用户信息的请求")
-    
     # 检查管理员权限
     error = admin_required()
     if error:
@@ -162,13 +160,24 @@ def update_user(user_id):
     
     # 更新角色
     if 'role' in data:
-        user.role = UserRole[data['role']] if isinstance(data['role'], str) else data['role']
+        role = UserRole[data['role']] if isinstance(data['role'], str) else data['role']
+        if role != user.role:
+            user.role = role
+            # 已签发的令牌携带旧角色，全部吊销
+            user.token_version = (user.token_version or 0) + 1
     
     # 更新密码
     if 'password' in data and data['password']:
-        user.password_hash = hash_password(data['password'])
+        try:
+            user.password_hash = hash_password(data['password'])
+        except HashingBusyError as e:
+            db.session.rollback()
+            return busy_response(e)
+        user.token_version = (user.token_version or 0) + 1
     
     db.session.commit()
+    cache.invalidate('users')
+    jwt.invalidate_user(user_id)
     
     return jsonify({'message': '用户信息更新成功'})
 
@@ -176,8 +185,6 @@ def update_user(user_id):
 @jwt_required()
 def delete_user(user_id):
     """删除用户"""
-    print("接收到删除用户的请求")
-    
     # 检查管理员权限
     error = admin_required()
     if error:
@@ -185,60 +192,278 @@ def delete_user(user_id):
     
     user = User.query.get_or_404(user_id)
     
-    # 删除该用户的所有评论
-    Comment.query.filter_by(user_id=user_id).delete()
+    # 删除该用户的所有文章，并从全文索引中移除、清理不再使用的渲染结果
+    article_rows = db.session.query(Article.id, Article.status, Article.content_hash).filter_by(author_id=user_id).all()
+    article_ids = [article_id for article_id, _, _ in article_rows]
+    
+    # 删除该用户的所有评论以及其文章下的评论
+    comment_filter = Comment.user_id == user_id
+    if article_ids:
+        comment_filter = or_(comment_filter, Comment.article_id.in_(article_ids))
+    deleted_comments = Comment.query.filter(comment_filter).delete(synchronize_session=False)
     
-    # 删除该用户的所有文章
+    if article_ids:
+        db.session.execute(article_tags.delete().where(article_tags.c.article_id.in_(article_ids)))
     Article.query.filter_by(author_id=user_id).delete()
+    remove_from_index(article_ids)
+    rendering.drop_unused(db.session.connection(), [digest for _, _, digest in article_rows])
+    
+    # 批量删除不会触发映射器事件，显式扣减站点计数
+    deltas = stats.article_deltas([status for _, status, _ in article_rows], sign=-1)
+    deltas[stats.COMMENTS] -= deleted_comments
+    stats.apply_deltas(deltas)
+    
+    # 批量删除绕过了逐篇维护，重新计算标签与分类计数
+    taxonomy.recount()
     
     # 删除用户
     db.session.delete(user)
     db.session.commit()
+    cache.invalidate('users', 'articles', 'comments')
+    jwt.invalidate_user(user_id)
     
     return jsonify({'message': '用户删除成功'})
 
+# 管理端文章筛选参数
+ARTICLE_FILTER_ARGS = ('status', 'author_id', 'date_from', 'date_to', 'search')
+# 流式读取时每批加载的文章数
+EXPORT_BATCH_SIZE = 500
+
+def _parse_date_arg(name, end=False):
+    """
+    解析日期筛选参数，支持日期或日期时间的ISO格式
+    
+    只给出日期的结束参数包含当天，返回第二天零点作为开区间上界
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f'{name} 必须是ISO格式的日期或时间') from e
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def filtered_articles_query():
+    """
+    根据请求参数构建管理端文章查询（status、author_id、date_from、date_to、search）
+    
+    Raises:
+        ValueError: 参数格式错误
+    """
+    query = Article.query
+    status = request.args.get('status')
+    if status:
+        try:
+            query = query.filter(Article.status == ArticleStatus(status))
+        except ValueError as e:
+            raise ValueError('status 必须是 draft 或 published') from e
+    author_id = request.args.get('author_id')
+    if author_id:
+        if not author_id.isdigit():
+            raise ValueError('author_id 必须是整数')
+        query = query.filter(Article.author_id == int(author_id))
+    date_from = _parse_date_arg('date_from')
+    if date_from:
+        query = query.filter(Article.created_at >= date_from)
+    date_to = _parse_date_arg('date_to', end=True)
+    if date_to:
+        query = query.filter(Article.created_at < date_to)
+    search = request.args.get('search', '').strip()
+    if search:
+        query = query.filter(Article.title.ilike(f'%{search}%'))
+    return query
+
+def admin_article_data(article, with_content=False):
+    """管理端文章数据"""
+    return article_serializer.dump(article, ARTICLE_ADMIN_FIELDS + ('content',) if with_content else ARTICLE_ADMIN_FIELDS)
+
+def _stream_articles(query, with_content=False):
+    """按批次读取文章，已输出的对象随批次释放"""
+    if not with_content:
+        query = query.options(defer(Article.content))
+    query = query.options(selectinload(Article.tags)).order_by(Article.id).yield_per(EXPORT_BATCH_SIZE)
+    for article in query:
+        yield admin_article_data(article, with_content)
+
+@admin_bp.route('/articles', methods=['GET'])
+@jwt_required()
+def get_articles_page():
+    """分页获取文章（包括草稿），支持按状态、作者、创建日期和标题筛选"""
+    error = admin_required()
+    if error:
+        return error
+    
+    try:
+        query = filtered_articles_query().options(defer(Article.content), selectinload(Article.tags))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # 传入 cursor 参数时使用游标分页，否则使用页码分页
+    if cursor_requested():
+        try:
+            count_key = 'admin_articles:' + ':'.join(
+                f'{name}={request.args.get(name, "")}' for name in ARTICLE_FILTER_ARGS)
+            items, page_meta = keyset_paginate(query, Article, count_key)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+    else:
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(100, max(1, request.args.get('per_page', 10, type=int)))
+        pagination = query.order_by(Article.created_at.desc(), Article.id.desc()) \
+            .paginate(page=page, per_page=per_page, error_out=False, count=False)
+        pagination.total = query.with_entities(func.count(Article.id)).order_by(None).scalar()
+        items = pagination.items
+        page_meta = {'total': pagination.total, 'page': page, 'per_page': per_page, 'pages': pagination.pages}
+    
+    return jsonify({'articles': [admin_article_data(article) for article in items], **page_meta})
+
 @admin_bp.route('/articles/all', methods=['GET'])
 @jwt_required()
 def get_all_articles():
-    """获取所有文章（包括草稿）"""
+    """获取所有文章（包括草稿），响应逐篇流式输出"""
     error = admin_required()
     if error:
         return error
     
-    articles = Article.query.all()
-    article_list = []
-    for article in articles:
-        article_list.append({
-            'id': article.id,
-            'title': article.title,
-            'author_id': article.author_id,
-            'status': article.status.value,
-            'category': article.category,
-            'tags': json.loads(article.tags) if article.tags else [],
-            'created_at': article.created_at.isoformat()
-        })
-    
-    return jsonify({'articles': article_list})
+    try:
+        query = filtered_articles_query()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return stream_response(iter_json_document('articles', _stream_articles(query)), 'application/json')
+
+@admin_bp.route('/articles/export', methods=['GET'])
+@jwt_required()
+def export_articles():
+    """流式导出文章（含正文），format 为 ndjson（默认）或 csv，筛选参数与文章列表相同"""
+    error = admin_required()
+    if error:
+        return error
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'message': 'format 必须是 ndjson 或 csv'}), 400
+    try:
+        query = filtered_articles_query()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    rows = _stream_articles(query, with_content=True)
+    if export_format == 'csv':
+        chunks = iter_csv(rows, ARTICLE_ADMIN_FIELDS + ('content',))
+    else:
+        chunks = iter_ndjson(rows)
+    filename = f'articles-{datetime.now().strftime("%Y%m%d%H%M%S")}.{export_format}'
+    return stream_response(chunks, EXPORT_FORMATS[export_format], filename)
+
+def _bulk_items(name):
+    """
+    读取批量接口的条目列表
+    
+    Raises:
+        ValueError: 请求体格式错误或条目数超出 BULK_MAX_ITEMS
+    """
+    data = request.get_json(silent=True)
+    items = data.get(name) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError(f'{name} 必须是非空数组')
+    limit = current_app.config.get('BULK_MAX_ITEMS', 1000)
+    if len(items) > limit:
+        raise ValueError(f'单次最多提交{limit}条')
+    return items
+
+@admin_bp.route('/articles/bulk', methods=['POST'])
+@jwt_required()
+@admin_only
+@idempotent
+def bulk_create_articles():
+    """批量创建文章，逐条报告错误；支持 Idempotency-Key 请求头"""
+    try:
+        items = _bulk_items('articles')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    result = bulk.bulk_create_articles(items, current_app.config.get('BULK_CHUNK_SIZE', 200))
+    if result.created:
+        cache.invalidate('articles')
+    logger.info('批量创建文章 成功%d条 失败%d条', len(result.created), len(result.errors))
+    body = result.to_dict()
+    body['articles'] = [{'index': index, 'id': article_id} for index, article_id in result.created]
+    return jsonify(body), result.status_code()
+
+@admin_bp.route('/comments/bulk', methods=['POST'])
+@jwt_required()
+@admin_only
+@idempotent
+def bulk_import_comments():
+    """批量导入评论（可保留原始 created_at），逐条报告错误；支持 Idempotency-Key 请求头"""
+    try:
+        items = _bulk_items('comments')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    result = bulk.bulk_create_comments(items, current_app.config.get('BULK_CHUNK_SIZE', 200))
+    if result.created:
+        article_ids = {items[index]['article_id'] for index, _ in result.created}
+        cache.invalidate('comments', *(f'comments:article:{article_id}' for article_id in sorted(article_ids)))
+    logger.info('批量导入评论 成功%d条 失败%d条', len(result.created), len(result.errors))
+    return jsonify(result.to_dict()), result.status_code()
 
 @admin_bp.route('/statistics', methods=['GET'])
 @jwt_required()
+@replica_read
 def get_statistics():
     """获取站点统计信息"""
     error = admin_required()
     if error:
         return error
     
-    # 统计数据
-    total_users = User.query.count()
-    total_articles = Article.query.count()
-    published_articles = Article.query.filter_by(status=ArticleStatus.published).count()
-    draft_articles = Article.query.filter_by(status=ArticleStatus.draft).count()
-    total_comments = Comment.query.count()
+    # 统计数据由写操作增量维护，这里只读取计数表
+    return jsonify(stats.get_counters())
+
+@admin_bp.route('/statistics/reconcile', methods=['POST'])
+@jwt_required()
+def reconcile_statistics():
+    """重新统计站点计数，返回并修正存储值与实际值的偏差"""
+    error = admin_required()
+    if error:
+        return error
+    
+    drift = stats.reconcile()
+    return jsonify({'drift': drift, 'statistics': stats.get_counters()})
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """获取响应缓存命中统计"""
+    error = admin_required()
+    if error:
+        return error
+    
+    return jsonify(cache.stats())
+
+@admin_bp.route('/db/pool', methods=['GET'])
+@jwt_required()
+def get_pool_stats():
+    """获取当前工作进程的数据库连接池统计"""
+    error = admin_required()
+    if error:
+        return error
+    
+    return jsonify(pool_stats(db.engine))
+
+@admin_bp.route('/db/slow-queries', methods=['GET'])
+@jwt_required()
+def get_slow_queries():
+    """获取当前工作进程最近的慢查询（语句、耗时、端点与调用位置）"""
+    error = admin_required()
+    if error:
+        return error
     
+    registry = current_app.extensions.get('metrics')
     return jsonify({
-        'total_users': total_users,
-        'total_articles': total_articles,
-        'published_articles': published_articles,
-        'draft_articles': draft_articles,
-        'total_comments': total_comments
-    })
\ No newline at end of file
+        'threshold_ms': current_app.config.get('SLOW_QUERY_MS'),
+        'queries': registry.recent_slow_queries() if registry else []
+    })
@@ -1,74 +1,217 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.models import Article, ArticleStatus, User
-from app import db
-import json
+from sqlalchemy import func
+from sqlalchemy.orm import defer, joinedload, load_only, selectinload
+from app.models import Article, ArticleStatus, User, Tag, Category, Comment
+from app.utils.users import user_summary, expand_fields
+from app.serializers import articles as article_serializer, comments as comment_serializer, ARTICLE_SUMMARY_FIELDS
+from app.utils.pagination import cursor_requested, keyset_paginate
+from app.utils.content import make_excerpt
+from app.utils.conditional import conditional, version_etag, as_utc, not_modified
+from app.utils.search import search_articles, make_snippet
+from app.utils import taxonomy, rendering, realtime
+from app.utils.markdown import RENDERER_VERSION
+from app.utils.replica import replica_read
+from app import db, cache
 
 articles_bp = Blueprint('articles', __name__)
 
+# 文章详情的正文格式：markdown 返回原文，html 以渲染后的HTML、目录与阅读时间代替原文
+CONTENT_FORMATS = ('markdown', 'html')
+
+def requested_article_fields():
+    """
+    解析 fields / view 参数，返回需要输出的字段
+    
+    Raises:
+        ValueError: fields 中包含未知字段
+    """
+    fields = request.args.get('fields')
+    if fields:
+        requested = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+        unknown = article_serializer.unknown(requested)
+        if unknown:
+            raise ValueError(f'未知字段: {", ".join(unknown)}')
+        return requested if 'id' in requested else ('id',) + requested
+    if request.args.get('view') == 'summary':
+        return ARTICLE_SUMMARY_FIELDS
+    return article_serializer.names
+
 @articles_bp.route('/', methods=['GET'], strict_slashes=False)
+@cache.cached(tags=['articles', 'users'])
+@conditional
+@replica_read
 def get_articles():
     """获取文章列表"""
     # 获取查询参数
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     status = request.args.get('status', 'published')
+    tag = request.args.get('tag')
+    category = request.args.get('category')
+    expand_author = 'author' in expand_fields()
+    try:
+        fields = requested_article_fields()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    # 构建查询
-    query = Article.query
+    # 构建查询：只加载需要输出的列，created_at 用于排序和游标，始终加载
+    columns = article_serializer.columns(fields)
+    columns.append(Article.created_at)
+    if expand_author:
+        columns.append(Article.author_id)
+    query = Article.query.options(load_only(*columns))
+    if 'tags' in fields:
+        query = query.options(selectinload(Article.tags))
+    if expand_author:
+        query = query.options(joinedload(Article.author))
     if status:
         query = query.filter_by(status=status)
+    if tag:
+        query = query.join(Article.tags).filter(Tag.name == tag)
+    if category:
+        query = query.filter(Article.category == category)
     
-    # 分页查询
-    pagination = query.order_by(Article.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    # 分页查询：传入 cursor 参数时使用游标分页，否则使用页码分页
+    if cursor_requested():
+        try:
+            items, page_meta = keyset_paginate(query, Article, f'articles:status={status}:tag={tag}:category={category}')
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+    else:
+        pagination = query.order_by(Article.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False, count=False)
+        # 单独统计总数，避免计数子查询引用未加载的正文列
+        pagination.total = query.with_entities(func.count(Article.id)).order_by(None).scalar()
+        items = pagination.items
+        page_meta = {
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'current_page': pagination.page
+        }
     
     # 构建响应
-    articles = []
-    for article in pagination.items:
-        articles.append({
-            'id': article.id,
-            'title': article.title,
-            'content': article.content,
-            'author_id': article.author_id,
-            'status': article.status.value,
-            'category': article.category,
-            'tags': json.loads(article.tags) if article.tags else [],
-            'created_at': article.created_at.isoformat(),
-            'updated_at': article.updated_at.isoformat() if article.updated_at else None
-        })
+    articles = article_serializer.dump_many(items, fields)
+    if expand_author:
+        for article_data, article in zip(articles, items):
+            article_data['author'] = user_summary(article.author)
+    
+    return jsonify({'articles': articles, **page_meta})
+
+@articles_bp.route('/tags', methods=['GET'])
+@cache.cached(tags=['articles'])
+@conditional
+@replica_read
+def get_tags():
+    """获取标签云（按已发布文章数排序）"""
+    limit = min(200, max(1, request.args.get('limit', 50, type=int)))
+    tags = Tag.query.filter(Tag.article_count > 0) \
+        .order_by(Tag.article_count.desc(), Tag.name).limit(limit).all()
+    return jsonify({'tags': [{'name': tag.name, 'count': tag.article_count} for tag in tags]})
+
+@articles_bp.route('/categories', methods=['GET'])
+@cache.cached(tags=['articles'])
+@conditional
+@replica_read
+def get_categories():
+    """获取分类及其已发布文章数"""
+    categories = Category.query.filter(Category.article_count > 0) \
+        .order_by(Category.article_count.desc(), Category.name).all()
+    return jsonify({'categories': [{'name': category.name, 'count': category.article_count} for category in categories]})
+
+@articles_bp.route('/search', methods=['GET'])
+@cache.cached(tags=['articles'])
+@conditional
+@replica_read
+def search():
+    """全文检索已发布文章，按相关度排序并返回命中片段"""
+    q = request.args.get('q', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(50, max(1, request.args.get('per_page', 10, type=int)))
+    if not q:
+        return jsonify({'message': '检索词不能为空'}), 400
+    
+    # 多取一条用于判断是否还有下一页
+    hits, terms = search_articles(q, limit=per_page + 1, offset=(page - 1) * per_page)
+    has_more = len(hits) > per_page
+    hits = hits[:per_page]
+    
+    # 按ID批量加载命中文章，并保持相关度顺序
+    articles = {}
+    if hits:
+        rows = Article.query.options(load_only(
+            Article.id, Article.title, Article.content, Article.author_id, Article.category, Article.created_at
+        )).filter(Article.id.in_([article_id for article_id, _ in hits])).all()
+        articles = {article.id: article for article in rows}
+    
+    results = []
+    plan = article_serializer.plan(('id', 'title', 'author_id', 'category', 'created_at'))
+    for article_id, score in hits:
+        article = articles.get(article_id)
+        if article is None:
+            continue
+        result = plan(article)
+        result['snippet'] = make_snippet(article.content, terms)
+        result['score'] = score
+        results.append(result)
     
     return jsonify({
-        'articles': articles,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page
+        'results': results,
+        'page': page,
+        'per_page': per_page,
+        'has_more': has_more
     })
 
 @articles_bp.route('/<int:article_id>', methods=['GET'])
+@cache.cached(tags=lambda article_id: [f'article:{article_id}', 'users'])
+@conditional
+@replica_read
 def get_article(article_id):
     """获取单篇文章"""
-    article = Article.query.get_or_404(article_id)
+    expand_author = 'author' in expand_fields()
+    content_format = request.args.get('format', 'markdown')
+    if content_format not in CONTENT_FORMATS:
+        return jsonify({'message': f'format 必须是 {" 或 ".join(CONTENT_FORMATS)}'}), 400
+    
+    # 先只查询版本信息，客户端缓存仍然有效时无需加载正文
+    meta_query = db.select(Article.status, Article.author_id, Article.version, Article.updated_at).where(Article.id == article_id)
+    if expand_author:
+        meta_query = meta_query.add_columns(User.username, User.role).outerjoin(User, User.id == Article.author_id)
+    meta = db.session.execute(meta_query).first()
+    if meta is None:
+        abort(404)
     
     # 检查权限（只有已发布的文章或自己的草稿才能查看）
-    if article.status == ArticleStatus.draft:
+    if meta.status == ArticleStatus.draft:
         try:
             current_user_id = get_jwt_identity()
-            if article.author_id != current_user_id:
+            if meta.author_id != current_user_id:
                 return jsonify({'message': '无权访问此文章'}), 403
         except:
             return jsonify({'message': '无权访问此文章'}), 403
     
-    return jsonify({
-        'id': article.id,
-        'title': article.title,
-        'content': article.content,
-        'author_id': article.author_id,
-        'status': article.status.value,
-        'category': article.category,
-        'tags': json.loads(article.tags) if article.tags else [],
-        'created_at': article.created_at.isoformat(),
-        'updated_at': article.updated_at.isoformat() if article.updated_at else None
-    })
+    # 渲染器版本变化后HTML随之变化
+    renderer = (RENDERER_VERSION,) if content_format == 'html' else ()
+    etag = version_etag(f'article-{article_id}', *meta[2:], *renderer)
+    last_modified = as_utc(meta.updated_at)
+    unchanged = not_modified(etag, last_modified)
+    if unchanged is not None:
+        return unchanged
+    
+    if content_format == 'html':
+        # 渲染结果已保存时无需读取正文
+        article = Article.query.options(defer(Article.content)).get_or_404(article_id)
+        article_data = article_serializer.dump(article, ARTICLE_SUMMARY_FIELDS)
+        article_data.update(rendering.rendered_content(article))
+    else:
+        article = Article.query.get_or_404(article_id)
+        article_data = article_serializer.dump(article)
+    if expand_author:
+        article_data['author'] = user_summary(article.author)
+    
+    response = jsonify(article_data)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
 
 @articles_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -77,17 +220,26 @@ def create_article():
     current_user_id = get_jwt_identity()
     data = request.get_json()
     
+    try:
+        tag_names = taxonomy.normalize_tag_names(data.get('tags', []))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
     new_article = Article(
         title=data['title'],
         content=data['content'],
+        excerpt=make_excerpt(data['content']),
         author_id=current_user_id,
         status=ArticleStatus(data.get('status', 'draft')),
-        category=data.get('category'),
-        tags=json.dumps(data.get('tags', []))
+        category=data.get('category') or None,
+        tags=taxonomy.get_or_create_tags(tag_names)
     )
     
     db.session.add(new_article)
+    # 在同一事务中更新标签与分类计数
+    taxonomy.apply_counter_delta(taxonomy.EMPTY_SNAPSHOT, taxonomy.snapshot(new_article))
     db.session.commit()
+    cache.invalidate('articles')
     
     return jsonify({'message': '文章创建成功', 'article_id': new_article.id}), 201
 
@@ -106,20 +258,30 @@ def update_article(article_id):
         return jsonify({'message': '无权修改此文章'}), 403
     
     data = request.get_json()
+    before = taxonomy.snapshot(article)
     
     # 更新字段
     if 'title' in data:
         article.title = data['title']
     if 'content' in data:
         article.content = data['content']
+        article.excerpt = make_excerpt(data['content'])
     if 'status' in data:
         article.status = ArticleStatus(data['status'])
     if 'category' in data:
-        article.category = data['category']
+        article.category = data['category'] or None
     if 'tags' in data:
-        article.tags = json.dumps(data['tags'])
+        try:
+            article.tags = taxonomy.get_or_create_tags(taxonomy.normalize_tag_names(data['tags']))
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'message': str(e)}), 400
+    article.version = (article.version or 0) + 1
     
+    # 在同一事务中更新标签与分类计数
+    taxonomy.apply_counter_delta(before, taxonomy.snapshot(article))
     db.session.commit()
+    cache.invalidate('articles', f'article:{article_id}')
     
     return jsonify({'message': '文章更新成功'})
 
@@ -137,8 +299,10 @@ def delete_article(article_id):
     if article.author_id != current_user_id and current_role != 'admin':
         return jsonify({'message': '无权删除此文章'}), 403
     
+    taxonomy.apply_counter_delta(taxonomy.snapshot(article), taxonomy.EMPTY_SNAPSHOT)
     db.session.delete(article)
     db.session.commit()
+    cache.invalidate('articles', f'article:{article_id}', 'comments', f'comments:article:{article_id}')
     
     return jsonify({'message': '文章删除成功'})
 
@@ -152,9 +316,6 @@ def add_comment(article_id):
     # 验证文章是否存在
     article = Article.query.get_or_404(article_id)
     
-    # 导入Comment模型避免循环导入
-    from app.models import Comment
-    
     new_comment = Comment(
         article_id=article_id,
         user_id=current_user_id,
@@ -163,5 +324,59 @@ def add_comment(article_id):
     
     db.session.add(new_comment)
     db.session.commit()
+    cache.invalidate('comments', f'comments:article:{article_id}')
+    realtime.publish_comment_created(new_comment)
+    
+    return jsonify({'message': '评论添加成功', 'comment_id': new_comment.id}), 201
+
+@articles_bp.route('/<int:article_id>/comments/stream', methods=['GET'])
+def stream_comments(article_id):
+    """订阅文章的评论事件（Server-Sent Events）"""
+    meta = db.session.execute(
+        db.select(Article.status, Article.author_id).where(Article.id == article_id)
+    ).first()
+    if meta is None:
+        abort(404)
+    if meta.status == ArticleStatus.draft:
+        try:
+            if meta.author_id != get_jwt_identity():
+                return jsonify({'message': '无权访问此文章'}), 403
+        except:
+            return jsonify({'message': '无权访问此文章'}), 403
     
-    return jsonify({'message': '评论添加成功', 'comment_id': new_comment.id}), 201
\ No newline at end of file
+    config = current_app.config
+    subscription = realtime.broker().try_subscribe(realtime.comments_channel(article_id),
+                                                   config['SSE_MAX_CONNECTIONS'])
+    if subscription is None:
+        response = jsonify({'message': '实时连接数已满，请稍后重试'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    # 断线重连时补发错过的新评论，过多时要求客户端重新拉取列表
+    initial = []
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is not None:
+        limit = config['SSE_REPLAY_LIMIT']
+        missed = Comment.query.options(joinedload(Comment.author)) \
+            .filter(Comment.article_id == article_id, Comment.id > last_id) \
+            .order_by(Comment.id).limit(limit + 1).all()
+        if len(missed) > limit:
+            initial.append(realtime.format_event('resync', '{}'))
+        else:
+            initial.extend(
+                realtime.format_event('comment', current_app.json.dumps(comment_serializer.dump(comment)), comment.id)
+                for comment in missed
+            )
+    
+    # 连接期间不持有数据库连接：响应体在视图返回、请求上下文清理之后才开始生成
+    stream = realtime.stream(
+        subscription, initial,
+        heartbeat=config['SSE_HEARTBEAT_SECONDS'],
+        max_duration=config['SSE_MAX_DURATION'],
+    )
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 关闭nginx的响应缓冲
+    # 客户端在响应体开始生成前断开时生成器不会执行，由响应关闭回调取消订阅
+    response.call_on_close(subscription.close)
+    return response
\ No newline at end of file
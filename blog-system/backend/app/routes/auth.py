@@ -1,11 +1,25 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import logging
+
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, current_user
+from sqlalchemy.orm import selectinload
 from app.models import User, UserRole, Article, ArticleStatus
-from app.utils.auth import hash_password, verify_password, create_token
-from app import db
-import json
+from app.utils.auth import (
+    hash_password, verify_password, password_needs_rehash, create_token,
+    check_rate_limit, busy_response, HashingBusyError, RateLimitExceeded
+)
+from app.utils.users import parse_id_list, load_user_summaries
+from app.utils.pagination import cursor_requested, keyset_paginate
+from app.utils.replica import replica_read
+from app.serializers import (
+    users as user_serializer, articles as article_serializer,
+    USER_PUBLIC_FIELDS, USER_PROFILE_FIELDS, ARTICLE_OWNER_FIELDS
+)
+from app import db, cache, jwt
 
 auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -36,6 +50,8 @@ def register():
         # 保存到数据库
         db.session.add(new_user)
         db.session.commit()
+        # 清除可能缓存的“用户不存在”状态（SQLite可能复用已删除用户的ID）
+        jwt.invalidate_user(new_user.id)
         
         # 为新注册用户生成token，以便直接登录
         token = create_token(new_user.id, new_user.role)
@@ -47,26 +63,48 @@ def register():
             'username': new_user.username,
             'role': new_user.role.value
         }), 201
+    except HashingBusyError as e:
+        db.session.rollback()
+        return busy_response(e)
     except Exception as e:
         # 发生错误时回滚数据库操作
         db.session.rollback()
-        print(f"注册错误: {str(e)}")
+        logger.exception('注册错误')
         return jsonify({'message': f'注册失败: {str(e)}'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """用户登录"""
+    # 按客户端IP限制登录频率，防止暴力破解及哈希计算耗尽CPU
+    try:
+        check_rate_limit('login', request.remote_addr,
+                         current_app.config.get('LOGIN_RATE_LIMIT', 10),
+                         current_app.config.get('LOGIN_RATE_WINDOW', 60))
+    except RateLimitExceeded as e:
+        response = jsonify({'message': '登录尝试过于频繁，请稍后再试'})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    
     data = request.get_json()
     
     # 查找用户
     user = User.query.filter_by(username=data['username']).first()
     
     # 验证用户和密码
-    if not user or not verify_password(data['password'], user.password_hash):
-        return jsonify({'message': '用户名或密码错误'}), 401
+    try:
+        if not user or not verify_password(data['password'], user.password_hash):
+            return jsonify({'message': '用户名或密码错误'}), 401
+        
+        # 哈希参数调整后，在用户下次登录时用新参数重新计算并保存
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = hash_password(data['password'])
+            db.session.commit()
+    except HashingBusyError as e:
+        db.session.rollback()
+        return busy_response(e)
     
     # 创建token
-    token = create_token(user.id, user.role)
+    token = create_token(user.id, user.role, user.token_version)
     
     return jsonify({
         'token': token,
@@ -75,20 +113,34 @@ def login():
         'role': user.role.value
     }), 200
 
+@auth_bp.route('/users', methods=['GET'])
+@replica_read
+def get_users_info():
+    """批量获取用户基本信息（公开API），例如 /users?ids=1,2,3"""
+    try:
+        ids = parse_id_list(request.args.get('ids', ''))
+    except ValueError as e:
+        return jsonify({'message': f'用户ID参数错误: {str(e)}'}), 400
+    
+    summaries = load_user_summaries(ids)
+    
+    # 返回 id -> 公开信息 的映射，以及不存在的用户ID
+    return jsonify({
+        'users': {str(user_id): summary for user_id, summary in summaries.items()},
+        'missing': [user_id for user_id in ids if user_id not in summaries]
+    }), 200
+
 @auth_bp.route('/users/<int:user_id>', methods=['GET'])
+@replica_read
 def get_user_info(user_id):
     """获取用户基本信息（公开API）"""
     try:
         user = User.query.get_or_404(user_id)
         
         # 只返回公开信息，不包含敏感数据
-        return jsonify({
-            'id': user.id,
-            'username': user.username,
-            'role': user.role.value
-        }), 200
+        return jsonify(user_serializer.dump(user, USER_PUBLIC_FIELDS)), 200
     except Exception as e:
-        print(f"获取用户信息错误: {str(e)}")
+        logger.exception('获取用户信息错误')
         return jsonify({'message': '获取用户信息失败'}), 500
 
 
@@ -97,19 +149,16 @@ def get_user_info(user_id):
 def get_current_user_profile():
     """获取当前用户的个人资料"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get_or_404(current_user_id)
-        
-        # 返回完整的用户信息（不包含敏感数据）
+        # 当前用户信息来自认证时加载的缓存状态，无需再次查询数据库
         return jsonify({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': user.role.value,
-            'created_at': user.created_at.isoformat()
+            'id': current_user['id'],
+            'username': current_user['username'],
+            'email': current_user['email'],
+            'role': current_user['role'],
+            'created_at': current_user['created_at']
         }), 200
     except Exception as e:
-        print(f"获取用户资料错误: {str(e)}")
+        logger.exception('获取用户资料错误')
         return jsonify({'message': '获取用户资料失败'}), 500
 
 
@@ -125,37 +174,34 @@ def get_current_user_articles():
         per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')  # 可选：published, draft
         
-        # 构建查询
-        query = Article.query.filter_by(author_id=current_user_id)
+        # 构建查询（批量加载标签）
+        query = Article.query.options(selectinload(Article.tags)).filter_by(author_id=current_user_id)
         
         # 如果指定了状态，则过滤
         if status:
             query = query.filter_by(status=status)
         
-        # 分页查询
-        pagination = query.order_by(Article.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        # 分页查询：传入 cursor 参数时使用游标分页，否则使用页码分页
+        if cursor_requested():
+            try:
+                items, page_meta = keyset_paginate(query, Article, f'profile_articles:author_id={current_user_id}:status={status}')
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        else:
+            pagination = query.order_by(Article.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+            items = pagination.items
+            page_meta = {
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'current_page': pagination.page
+            }
         
         # 构建响应
-        articles = []
-        for article in pagination.items:
-            articles.append({
-                'id': article.id,
-                'title': article.title,
-                'status': article.status.value,
-                'category': article.category,
-                'tags': json.loads(article.tags) if article.tags else [],
-                'created_at': article.created_at.isoformat(),
-                'updated_at': article.updated_at.isoformat() if article.updated_at else None
-            })
+        articles = article_serializer.dump_many(items, ARTICLE_OWNER_FIELDS)
         
-        return jsonify({
-            'articles': articles,
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': pagination.page
-        }), 200
+        return jsonify({'articles': articles, **page_meta}), 200
     except Exception as e:
-        print(f"获取用户文章错误: {str(e)}")
+        logger.exception('获取用户文章错误')
         return jsonify({'message': '获取用户文章失败'}), 500
 
 
@@ -184,17 +230,33 @@ def update_current_user_profile():
         
         # 保存到数据库
         db.session.commit()
+        cache.invalidate('users')
+        jwt.invalidate_user(current_user_id)
         
         return jsonify({
             'message': '个人资料更新成功',
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role.value
-            }
+            'user': user_serializer.dump(user, USER_PROFILE_FIELDS)
         }), 200
     except Exception as e:
-        print(f"更新用户资料错误: {str(e)}")
+        logger.exception('更新用户资料错误')
         db.session.rollback()
-        return jsonify({'message': '更新用户资料失败'}), 500
\ No newline at end of file
+        return jsonify({'message': '更新用户资料失败'}), 500
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """
+    退出登录，吊销当前令牌
+    
+    请求体为 {"all": true} 时递增令牌版本号，该用户在所有设备上的令牌全部失效
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get('all'):
+        User.query.filter_by(id=int(get_jwt_identity())).update({User.token_version: User.token_version + 1})
+        db.session.commit()
+        jwt.invalidate_user(get_jwt_identity())
+    else:
+        jwt.revoke_token(get_jwt())
+    
+    return jsonify({'message': '已退出登录'}), 200
@@ -1,44 +1,62 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.models import Comment, Article, User
-from app import db
+from sqlalchemy.orm import joinedload
+from app.models import Comment, Article
+from app.utils.users import user_summary, expand_fields
+from app.serializers import comments as comment_serializer
+from app.utils.pagination import cursor_requested, keyset_paginate
+from app.utils.conditional import conditional
+from app.utils.replica import replica_read
+from app.utils import realtime
+from app import db, cache
 
 comments_bp = Blueprint('comments', __name__)
 
+
+def comment_list_tags():
+    """评论列表的缓存标签：按文章过滤时只依赖该文章的评论"""
+    article_id = request.args.get('article_id', type=int)
+    return [f'comments:article:{article_id}' if article_id else 'comments', 'users']
+
+
 @comments_bp.route('/', methods=['GET'])
+@cache.cached(tags=comment_list_tags)
+@conditional
+@replica_read
 def get_comments():
     """获取评论列表（可按文章过滤）"""
     article_id = request.args.get('article_id', type=int)
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    expand_author = 'author' in expand_fields()
     
-    # 构建查询
-    query = Comment.query
+    # 构建查询（联表加载评论作者，避免逐条查询用户）
+    query = Comment.query.options(joinedload(Comment.author))
     if article_id:
         query = query.filter_by(article_id=article_id)
     
-    # 分页查询
-    pagination = query.order_by(Comment.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    # 分页查询：传入 cursor 参数时使用游标分页，否则使用页码分页
+    if cursor_requested():
+        try:
+            items, page_meta = keyset_paginate(query, Comment, f'comments:article_id={article_id}')
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+    else:
+        pagination = query.order_by(Comment.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        items = pagination.items
+        page_meta = {
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'current_page': pagination.page
+        }
     
     # 构建响应
-    comments = []
-    for comment in pagination.items:
-        user = User.query.get(comment.user_id)
-        comments.append({
-            'id': comment.id,
-            'article_id': comment.article_id,
-            'user_id': comment.user_id,
-            'username': user.username,
-            'content': comment.content,
-            'created_at': comment.created_at.isoformat()
-        })
-    
-    return jsonify({
-        'comments': comments,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page
-    })
+    comments = comment_serializer.dump_many(items)
+    if expand_author:
+        for comment_data, comment in zip(comments, items):
+            comment_data['author'] = user_summary(comment.author)
+    
+    return jsonify({'comments': comments, **page_meta})
 
 @comments_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -68,18 +86,10 @@ def create_comment():
     
     db.session.add(comment)
     db.session.commit()
+    cache.invalidate('comments', f'comments:article:{comment.article_id}')
+    realtime.publish_comment_created(comment)
     
-    # 获取评论作者信息
-    user = User.query.get(current_user_id)
-    
-    return jsonify({
-        'id': comment.id,
-        'article_id': comment.article_id,
-        'user_id': comment.user_id,
-        'username': user.username,
-        'content': comment.content,
-        'created_at': comment.created_at.isoformat()
-    }), 201
+    return jsonify(comment_serializer.dump(comment)), 201
 
 @comments_bp.route('/<int:comment_id>', methods=['DELETE'])
 @jwt_required()
@@ -102,7 +112,10 @@ def delete_comment(comment_id):
     if not (is_comment_owner or is_article_owner or is_admin):
         return jsonify({'message': '无权删除此评论'}), 403
     
+    article_id = comment.article_id
     db.session.delete(comment)
     db.session.commit()
+    cache.invalidate('comments', f'comments:article:{article_id}')
+    realtime.publish_comment_deleted(article_id, comment_id)
     
     return jsonify({'message': '评论删除成功'})
\ No newline at end of file
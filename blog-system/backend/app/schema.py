@@ -0,0 +1,147 @@
+"""
+数据库结构升级模块
+==================
+db.create_all() 只会创建缺失的表，不会为已有表添加新列和索引。
+本模块在应用启动时补齐已有数据库中缺失的列和索引，并回填历史数据。
+"""
+
+import json
+
+from sqlalchemy import inspect, text
+from app import db
+
+
+def _add_missing_columns(table, column_names):
+    """
+    为已存在的表添加缺失的列
+    
+    Args:
+        table: SQLAlchemy Table对象
+        column_names: 需要检查的列名列表
+    
+    Returns:
+        list: 本次新增的列名
+    """
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    added = []
+    with db.engine.begin() as conn:
+        for name in column_names:
+            if name in existing:
+                continue
+            column = table.columns[name]
+            ddl = f'{name} {column.type.compile(dialect=db.engine.dialect)}'
+            if column.server_default is not None:
+                ddl += f" NOT NULL DEFAULT '{column.server_default.arg}'" if not column.nullable \
+                    else f" DEFAULT '{column.server_default.arg}'"
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+            added.append(name)
+    return added
+
+
+def _create_missing_indexes(table):
+    """创建模型中声明但数据库中不存在的索引"""
+    for index in table.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+
+
+def _drop_indexes(table_name, index_names):
+    """删除已被组合索引取代的旧索引（如 init.sql 早期版本创建的单列索引）"""
+    existing = {index['name'] for index in inspect(db.engine).get_indexes(table_name)}
+    with db.engine.begin() as conn:
+        for name in index_names:
+            if name not in existing:
+                continue
+            if db.engine.dialect.name in ('mysql', 'mariadb'):
+                conn.execute(text(f'DROP INDEX {name} ON {table_name}'))
+            else:
+                conn.execute(text(f'DROP INDEX {name}'))
+
+
+def _backfill_legacy_tags():
+    """
+    将旧版 articles.tags 列中的JSON标签迁移到 tags / article_tags 表
+    
+    迁移完成的文章会把旧列置空，因此重复执行是安全的；
+    之后通过旧脚本（如 sample_data.sql）写入的文章也会在下次启动时被迁移
+    
+    Returns:
+        bool: 是否迁移了数据
+    """
+    from app.models import article_tags
+    from app.utils.taxonomy import get_or_create_tags, normalize_tag_names
+    
+    if 'tags' not in {column['name'] for column in inspect(db.engine).get_columns('articles')}:
+        return False
+    rows = db.session.execute(
+        text("SELECT id, tags FROM articles WHERE tags IS NOT NULL AND tags != ''")
+    ).all()
+    for article_id, raw in rows:
+        try:
+            names = normalize_tag_names(json.loads(raw))
+        except ValueError:
+            names = []
+        tags = get_or_create_tags(names)
+        db.session.flush()
+        tag_ids = {tag.id for tag in tags}
+        linked = {tag_id for (tag_id,) in db.session.execute(
+            db.select(article_tags.c.tag_id).where(article_tags.c.article_id == article_id)
+        )}
+        for tag_id in tag_ids - linked:
+            db.session.execute(article_tags.insert().values(article_id=article_id, tag_id=tag_id))
+        db.session.execute(text('UPDATE articles SET tags = NULL WHERE id = :id'), {'id': article_id})
+    db.session.commit()
+    return bool(rows)
+
+
+def _backfill_excerpts():
+    """为缺少摘要的文章（新增摘要列之前的历史数据或直接用SQL导入的数据）生成摘要"""
+    from app.models import Article
+    from app.utils.content import make_excerpt
+    
+    rows = db.session.execute(
+        db.select(Article.id, Article.content).where(Article.excerpt.is_(None))
+    ).all()
+    for article_id, content in rows:
+        db.session.execute(
+            db.update(Article).where(Article.id == article_id).values(excerpt=make_excerpt(content))
+        )
+    db.session.commit()
+
+
+def _backfill_content_hashes():
+    """为缺少 content_hash 的文章（历史数据或直接用SQL导入的数据）计算正文哈希，渲染结果在首次读取时生成"""
+    from app.models import Article
+    from app.utils.rendering import content_hash
+    
+    rows = db.session.execute(
+        db.select(Article.id, Article.content).where(Article.content_hash.is_(None))
+    ).all()
+    for article_id, content in rows:
+        db.session.execute(
+            db.update(Article).where(Article.id == article_id).values(content_hash=content_hash(content))
+        )
+    db.session.commit()
+
+
+def upgrade_schema():
+    """补齐缺失的列和索引并回填数据，需要在应用上下文中调用"""
+    from app.models import User, Article, Comment, Category
+    from app.utils.taxonomy import recount
+    
+    _add_missing_columns(User.__table__, ['token_version'])
+    _create_missing_indexes(User.__table__)
+    _add_missing_columns(Article.__table__, ['excerpt', 'version', 'content_hash'])
+    _backfill_excerpts()
+    _backfill_content_hashes()
+    # 先建组合索引再删旧索引，MySQL的外键列始终有可用索引
+    _create_missing_indexes(Article.__table__)
+    _create_missing_indexes(Comment.__table__)
+    _drop_indexes('articles', ['idx_articles_status', 'idx_articles_author_id'])
+    _drop_indexes('comments', ['idx_comments_article_id'])
+    
+    # 迁移旧版JSON标签；分类计数表为空但已有分类数据时同样需要初始化计数
+    migrated = _backfill_legacy_tags()
+    if migrated or (Category.query.first() is None
+                    and Article.query.filter(Article.category.isnot(None)).first() is not None):
+        recount()
+        db.session.commit()
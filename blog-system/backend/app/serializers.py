@@ -0,0 +1,127 @@
+"""
+模型序列化模块
+==================
+User、Article、Comment 输出字段的唯一定义处，各路由通过这里的序列化器构造响应数据。
+
+每个序列化器按字段组合预先构建“字段计划”并缓存：计划是 (字段名, 取值函数) 列表上的闭包，
+普通列使用 operator.attrgetter 读取属性，标签、作者名等计算字段调用各自的取值函数。datetime 与枚举原样保留，
+由应用的JSON提供器（app/utils/fastjson.py）编码为ISO 8601字符串和枚举值。
+"""
+
+from operator import attrgetter
+
+from app.models import User, Article, Comment
+
+
+class Field:
+    """
+    输出字段
+
+    Args:
+        column: 对应的模型列，用于 load_only 等只加载需要的列；计算字段为 None
+        getter: 计算字段的取值函数，普通列不需要
+    """
+
+    __slots__ = ('column', 'getter')
+
+    def __init__(self, column=None, getter=None):
+        self.column = column
+        self.getter = getter
+
+
+class ModelSerializer:
+    """按字段计划把模型实例转换为字典"""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.names = tuple(fields)
+        self._plans = {}
+
+    def unknown(self, names):
+        """names 中不存在的字段"""
+        return [name for name in names if name not in self.fields]
+
+    def columns(self, names=None):
+        """输出这些字段需要加载的列"""
+        return [self.fields[name].column for name in names or self.names if self.fields[name].column is not None]
+
+    def plan(self, names=None):
+        """
+        获取（并缓存）字段组合对应的转换函数
+
+        Args:
+            names: 字段名元组，默认为全部字段
+        """
+        names = tuple(names) if names is not None else self.names
+        plan = self._plans.get(names)
+        if plan is None:
+            plan = self._plans[names] = self._build(names)
+        return plan
+
+    def _build(self, names):
+        # 取值函数在构建计划时确定，转换时不再按字段名查找 Field
+        items = []
+        for name in names:
+            field = self.fields[name]
+            items.append((name, attrgetter(field.column.key) if field.getter is None else field.getter))
+        items = tuple(items)
+
+        def plan(obj):
+            return {name: get(obj) for name, get in items}
+        return plan
+
+    def dump(self, obj, names=None):
+        """转换单个实例"""
+        return self.plan(names)(obj)
+
+    def dump_many(self, objs, names=None):
+        """转换多个实例，字段计划只查找一次"""
+        plan = self.plan(names)
+        return [plan(obj) for obj in objs]
+
+
+def _tag_names(article):
+    return [tag.name for tag in article.tags]
+
+
+def _author_name(comment):
+    return comment.author.username if comment.author else None
+
+
+users = ModelSerializer({
+    'id': Field(User.id),
+    'username': Field(User.username),
+    'email': Field(User.email),
+    'role': Field(User.role),
+    'created_at': Field(User.created_at),
+})
+
+articles = ModelSerializer({
+    'id': Field(Article.id),
+    'title': Field(Article.title),
+    'content': Field(Article.content),
+    'excerpt': Field(Article.excerpt),
+    'author_id': Field(Article.author_id),
+    'status': Field(Article.status),
+    'category': Field(Article.category),
+    'tags': Field(getter=_tag_names),  # 通过关联表批量加载，没有对应的列
+    'created_at': Field(Article.created_at),
+    'updated_at': Field(Article.updated_at),
+})
+
+comments = ModelSerializer({
+    'id': Field(Comment.id),
+    'article_id': Field(Comment.article_id),
+    'user_id': Field(Comment.user_id),
+    'username': Field(getter=_author_name),
+    'content': Field(Comment.content),
+    'created_at': Field(Comment.created_at),
+})
+
+# 常用字段组合
+USER_PUBLIC_FIELDS = ('id', 'username', 'role')
+USER_PROFILE_FIELDS = ('id', 'username', 'email', 'role')
+USER_ADMIN_FIELDS = ('id', 'username', 'email', 'role', 'created_at')
+ARTICLE_SUMMARY_FIELDS = ('id', 'title', 'excerpt', 'author_id', 'status', 'category', 'tags', 'created_at', 'updated_at')
+ARTICLE_ADMIN_FIELDS = ('id', 'title', 'author_id', 'status', 'category', 'tags', 'created_at', 'updated_at')
+ARTICLE_OWNER_FIELDS = ('id', 'title', 'status', 'category', 'tags', 'created_at', 'updated_at')
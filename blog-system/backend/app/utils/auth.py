@@ -1,19 +1,154 @@
+"""
+认证工具模块
+==================
+密码哈希、令牌创建以及登录频率限制。
+
+密码哈希与校验是CPU密集操作，在每个进程独立的有界线程池中执行（hashlib 计算期间释放GIL）：
+同时计算的数量不超过 PASSWORD_HASH_WORKERS，排队数量超过 PASSWORD_HASH_QUEUE_SIZE 时
+立即抛出 HashingBusyError，由接口返回503，避免登录洪峰拖慢同一进程的其他请求。
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+
+from flask import current_app, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, decode_token
 
+
+class HashingBusyError(RuntimeError):
+    """密码哈希线程池已满或等待超时"""
+
+
+class RateLimitExceeded(RuntimeError):
+    """请求频率超过限制"""
+
+    def __init__(self, retry_after):
+        super().__init__('请求过于频繁')
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------------------------------
+# 密码哈希
+# ---------------------------------------------------------------------------
+
+_executor = None
+_executor_key = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """获取当前进程的哈希线程池（fork后的子进程或配置变化时重新创建）"""
+    global _executor, _executor_key, _slots
+    workers = current_app.config.get('PASSWORD_HASH_WORKERS', 2)
+    queue_size = current_app.config.get('PASSWORD_HASH_QUEUE_SIZE', 16)
+    key = (os.getpid(), workers, queue_size)
+    with _executor_lock:
+        if _executor_key != key:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash') if workers else None
+            _slots = threading.BoundedSemaphore(workers + queue_size)
+            _executor_key = key
+        return _executor, _slots
+
+
+def _run_hashing(func, *args):
+    executor, slots = _get_executor()
+    if executor is None:  # PASSWORD_HASH_WORKERS=0 时在请求线程中直接计算
+        return func(*args)
+    if not slots.acquire(blocking=False):
+        raise HashingBusyError('服务繁忙，请稍后重试')
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # 任务结束（或被取消）后才归还名额，等待超时的任务仍计入并发数
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=current_app.config.get('PASSWORD_HASH_TIMEOUT', 10))
+    except FutureTimeoutError as e:
+        future.cancel()
+        raise HashingBusyError('服务繁忙，请稍后重试') from e
+
+
+def busy_response(error):
+    """哈希线程池繁忙时的503响应"""
+    response = jsonify({'message': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 def hash_password(password):
-    """对密码进行哈希处理"""
-    return generate_password_hash(password)
+    """对密码进行哈希处理，算法与参数由 PASSWORD_HASH_METHOD 配置"""
+    return _run_hashing(generate_password_hash, password, current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2'))
+
 
 def verify_password(password, password_hash):
     """验证密码是否正确"""
-    return check_password_hash(password_hash, password)
+    return _run_hashing(check_password_hash, password_hash, password)
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method):
+    """配置的哈希方法对应的完整参数前缀，例如 pbkdf2 -> pbkdf2:sha256:600000"""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+def password_needs_rehash(password_hash):
+    """已存储的哈希是否使用了与当前配置不同的算法或参数"""
+    method = current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2')
+    return password_hash.split('$', 1)[0] != _method_prefix(method)
+
+
+# ---------------------------------------------------------------------------
+# 登录频率限制
+# ---------------------------------------------------------------------------
 
-def create_token(user_id, role):
-    """创建JWT token"""
-    additional_claims = {"role": role.value}
+def _incr(key, ttl):
+    """
+    计数加一：使用 cache.state（Redis后端时多进程共享，否则为进程内不淘汰的存储），
+    计数不能放在响应缓存的LRU中，否则攻击者可以用大量不同的缓存请求把自己的计数挤出
+    """
+    from app import cache
+    return cache.state.incr(key, ttl)
+
+
+def check_rate_limit(scope, client_id, limit, window):
+    """
+    固定窗口频率限制
+
+    Args:
+        scope: 限制类别，例如 'login'
+        client_id: 客户端标识（如IP）
+        limit: 窗口内允许的次数，0 表示不限制
+        window: 窗口长度（秒）
+
+    Raises:
+        RateLimitExceeded: 超过限制
+    """
+    if not limit:
+        return
+    now = time.time()
+    window_index = int(now // window)
+    count = _incr(f'ratelimit:{scope}:{client_id}:{window_index}', window)
+    if count > limit:
+        raise RateLimitExceeded(max(1, int((window_index + 1) * window - now)))
+
+
+# ---------------------------------------------------------------------------
+# 令牌
+# ---------------------------------------------------------------------------
+
+def create_token(user_id, role, token_version=0):
+    """创建JWT token，ver 声明为签发时用户的令牌版本号"""
+    additional_claims = {"role": role.value, "ver": token_version}
     return create_access_token(identity=str(user_id), additional_claims=additional_claims)
 
+
 def decode_jwt(token):
     """解码JWT token"""
-    return decode_token(token)
\ No newline at end of file
+    return decode_token(token)
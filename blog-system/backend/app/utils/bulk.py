@@ -0,0 +1,282 @@
+"""
+批量写入模块
+==================
+管理端批量导入文章和评论：先逐条校验（引用的用户和文章各用一次IN查询确认存在），
+再把通过校验的条目按 BULK_CHUNK_SIZE 分块，每块一个事务、一次 executemany 写入。
+
+文章需要取回新ID：支持 INSERT ... RETURNING 的数据库按提交顺序返回；MySQL 用一条多行 INSERT 写入整块，
+由 LAST_INSERT_ID()（第一行的ID）与行数推算，这要求 innodb_autoinc_lock_mode 为 0 或 1，
+使一条语句分配的自增ID连续（MySQL 8.0 默认的 2 在并发插入时可能交错，此时退回逐行插入）。
+
+批量插入不经过ORM的单条写入流程，不会触发映射器事件，因此每块在同一事务中显式维护：
+
+- 文章：标签关联（一次 executemany）、站点计数（stats.apply_deltas）、
+  标签与分类计数（taxonomy.apply_bulk_delta）、SQLite全文索引（search.index_articles）、
+  正文渲染任务（rendering.enqueue_contents）
+- 评论：站点计数
+
+校验失败或所在分块写入失败的条目在结果中逐条报告，不影响其他条目。
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import Article, ArticleStatus, Comment, User, article_tags
+from app.utils import rendering, stats, taxonomy
+from app.utils.content import make_excerpt
+from app.utils.search import index_articles
+
+logger = logging.getLogger(__name__)
+
+# 数据库地址 -> MySQL 一条多行 INSERT 分配的自增ID间隔，ID不保证连续时为 None
+_autoinc_steps = {}
+
+# 字段长度限制（与模型定义一致）
+MAX_TITLE_LENGTH = 200
+MAX_CATEGORY_LENGTH = 50
+
+
+class BulkResult:
+    """批量写入结果：成功写入的条目与逐条错误"""
+
+    def __init__(self):
+        self.created = []  # [(条目序号, 新记录ID或None)]
+        self.errors = []  # [{'index': 条目序号, 'message': 错误信息}]
+
+    def fail(self, index, message):
+        self.errors.append({'index': index, 'message': message})
+
+    def status_code(self):
+        """全部成功为201，部分成功为207，全部失败为400"""
+        if not self.errors:
+            return 201
+        return 207 if self.created else 400
+
+    def to_dict(self):
+        self.errors.sort(key=lambda error: error['index'])
+        return {'created': len(self.created), 'failed': len(self.errors), 'errors': self.errors}
+
+
+def chunked(items, size):
+    """按固定大小切分列表"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _existing_ids(model, ids):
+    if not ids:
+        return set()
+    return {row_id for (row_id,) in db.session.execute(db.select(model.id).where(model.id.in_(ids)))}
+
+
+def _write_chunks(rows, chunk_size, write_chunk, result):
+    """逐块写入并提交，某一块失败时回滚该块并把其中的条目记为失败"""
+    for chunk in chunked(rows, chunk_size):
+        try:
+            ids = write_chunk(chunk)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.exception('批量写入失败，跳过 %d 条', len(chunk))
+            for index, _ in chunk:
+                result.fail(index, '写入数据库失败')
+            continue
+        result.created.extend(zip((index for index, _ in chunk), ids))
+
+
+# ---------------------------------------------------------------------------
+# 文章
+# ---------------------------------------------------------------------------
+
+def _validate_article(item):
+    """校验单篇文章，返回待写入的行；author_id 是否存在由调用方统一检查"""
+    if not isinstance(item, dict):
+        raise ValueError('条目必须是对象')
+    title = item.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('标题不能为空')
+    if len(title) > MAX_TITLE_LENGTH:
+        raise ValueError(f'标题长度不能超过{MAX_TITLE_LENGTH}个字符')
+    content = item.get('content')
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError('内容不能为空')
+    if not _is_id(item.get('author_id')):
+        raise ValueError('author_id 必须是正整数')
+    try:
+        status = ArticleStatus(item.get('status', 'draft'))
+    except ValueError as e:
+        raise ValueError('status 必须是 draft 或 published') from e
+    category = item.get('category') or None
+    if category is not None and (not isinstance(category, str) or len(category) > MAX_CATEGORY_LENGTH):
+        raise ValueError(f'分类必须是不超过{MAX_CATEGORY_LENGTH}个字符的字符串')
+    return {
+        'title': title,
+        'content': content,
+        'excerpt': make_excerpt(content),
+        'content_hash': rendering.content_hash(content),
+        'author_id': item['author_id'],
+        'status': status,
+        'category': category,
+        'tags': taxonomy.normalize_tag_names(item.get('tags')),
+    }
+
+
+def _autoinc_step():
+    """
+    MySQL 一条多行 INSERT 分配的自增ID之间的间隔（auto_increment_increment）；
+    innodb_autoinc_lock_mode 为 2 时同一语句的ID可能不连续，返回 None
+    """
+    url = str(db.engine.url)
+    if url not in _autoinc_steps:
+        mode, step = db.session.execute(
+            text('SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment')
+        ).one()
+        _autoinc_steps[url] = int(step) if int(mode) <= 1 else None
+        if _autoinc_steps[url] is None:
+            logger.warning('innodb_autoinc_lock_mode=%s，批量创建文章退回逐行插入', mode)
+    return _autoinc_steps[url]
+
+
+def _insert_articles(mappings):
+    """插入一块文章，按 mappings 的顺序返回新ID"""
+    dialect = db.engine.dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        return db.session.scalars(
+            insert(Article).returning(Article.id, sort_by_parameter_order=True), mappings
+        ).all()
+    step = _autoinc_step() if dialect.name in ('mysql', 'mariadb') else None
+    if step is not None:
+        # 一条多行 INSERT：LAST_INSERT_ID() 为第一行的ID，其余按 auto_increment_increment 递增
+        result = db.session.execute(insert(Article).values(mappings))
+        first = result.lastrowid
+        return [first + step * offset for offset in range(len(mappings))]
+    # 无法推算ID时逐行插入（仍在同一事务中）
+    return [db.session.execute(insert(Article).values(**mapping)).inserted_primary_key[0] for mapping in mappings]
+
+
+def _write_article_chunk(chunk):
+    tag_names = list(dict.fromkeys(name for _, row in chunk for name in row['tags']))
+    tags = taxonomy.get_or_create_tags(tag_names)
+    db.session.flush()
+    tag_ids = {tag.name: tag.id for tag in tags}
+
+    article_ids = _insert_articles([{key: value for key, value in row.items() if key != 'tags'} for _, row in chunk])
+
+    links = [{'article_id': article_id, 'tag_id': tag_ids[name]}
+             for article_id, (_, row) in zip(article_ids, chunk) for name in row['tags']]
+    if links:
+        db.session.execute(article_tags.insert(), links)
+
+    stats.apply_deltas(stats.article_deltas([row['status'] for _, row in chunk]))
+    taxonomy.apply_bulk_delta([
+        taxonomy.TermSnapshot(row['status'] == ArticleStatus.published, row['category'], frozenset(row['tags']))
+        for _, row in chunk
+    ])
+    index_articles(article_ids)
+    rendering.enqueue_contents(row['content'] for _, row in chunk)
+    return article_ids
+
+
+def bulk_create_articles(items, chunk_size):
+    """
+    批量创建文章
+
+    Args:
+        items: 客户端提交的文章列表
+        chunk_size: 每个事务写入的文章数
+
+    Returns:
+        BulkResult: created 中为 (序号, 文章ID)
+    """
+    result = BulkResult()
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append((index, _validate_article(item)))
+        except ValueError as e:
+            result.fail(index, str(e))
+
+    authors = _existing_ids(User, {row['author_id'] for _, row in rows})
+    valid = []
+    for index, row in rows:
+        if row['author_id'] in authors:
+            valid.append((index, row))
+        else:
+            result.fail(index, f'作者 {row["author_id"]} 不存在')
+
+    _write_chunks(valid, chunk_size, _write_article_chunk, result)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 评论
+# ---------------------------------------------------------------------------
+
+def _validate_comment(item):
+    """校验单条评论，返回待写入的行；article_id 与 user_id 是否存在由调用方统一检查"""
+    if not isinstance(item, dict):
+        raise ValueError('条目必须是对象')
+    content = item.get('content')
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError('评论内容不能为空')
+    if not _is_id(item.get('article_id')):
+        raise ValueError('article_id 必须是正整数')
+    if not _is_id(item.get('user_id')):
+        raise ValueError('user_id 必须是正整数')
+    row = {'article_id': item['article_id'], 'user_id': item['user_id'], 'content': content}
+    created_at = item.get('created_at')
+    if created_at is not None:
+        # 导入历史评论时保留原始时间，未提供时使用数据库默认值
+        try:
+            row['created_at'] = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError) as e:
+            raise ValueError('created_at 必须是ISO格式的时间') from e
+    return row
+
+
+def _write_comment_chunk(chunk):
+    # 带与不带 created_at 的行分别 executemany（同一语句的参数必须包含相同的列）
+    for has_time in (False, True):
+        rows = [row for _, row in chunk if ('created_at' in row) == has_time]
+        if rows:
+            db.session.execute(insert(Comment), rows)
+    stats.apply_deltas({stats.COMMENTS: len(chunk)})
+    return [None] * len(chunk)
+
+
+def bulk_create_comments(items, chunk_size):
+    """
+    批量导入评论
+
+    Returns:
+        BulkResult: created 中为 (序号, None)，executemany 不返回新评论ID
+    """
+    result = BulkResult()
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append((index, _validate_comment(item)))
+        except ValueError as e:
+            result.fail(index, str(e))
+
+    articles = _existing_ids(Article, {row['article_id'] for _, row in rows})
+    users = _existing_ids(User, {row['user_id'] for _, row in rows})
+    valid = []
+    for index, row in rows:
+        if row['article_id'] not in articles:
+            result.fail(index, f'文章 {row["article_id"]} 不存在')
+        elif row['user_id'] not in users:
+            result.fail(index, f'用户 {row["user_id"]} 不存在')
+        else:
+            valid.append((index, row))
+
+    _write_chunks(valid, chunk_size, _write_comment_chunk, result)
+    return result
@@ -0,0 +1,358 @@
+"""
+响应缓存模块
+==================
+缓存公开只读接口序列化后的JSON响应，支持进程内LRU和Redis两种存储后端。
+
+缓存键由请求路径、排序后的查询参数以及若干“标签”的当前版本号组成。
+写操作提交成功后调用 invalidate() 为相关标签生成新版本号，
+旧版本的缓存键不会再被命中，随后按LRU或过期时间自然淘汰。
+
+登录频率计数、读己之写记录等不能被淘汰的短期状态保存在 cache.state 中：使用 redis 后端时为
+同一个Redis（多进程共享），否则为进程内的 TTLStore，只按过期时间清除，不会被缓存条目挤出。
+"""
+
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, g, request, make_response
+
+from app.utils.compression import apply_variant, precompress
+
+
+class LRUBackend:
+    """
+    进程内LRU缓存后端
+
+    缓存条目按最近使用顺序淘汰；标签版本号单独保存，同样按最近使用淘汰（最多 max_versions 个）。
+    被淘汰的标签下次读取时生成新的版本号，只会让引用它的缓存条目不再命中，不会返回过期数据
+    """
+
+    name = 'lru'
+
+    def __init__(self, max_entries=2048, max_versions=None):
+        self.max_entries = max_entries
+        self.max_versions = max_versions or max_entries * 4
+        self._entries = OrderedDict()  # key -> (过期时间戳, 值)
+        self._versions = OrderedDict()  # 标签 -> 版本号
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key, ttl):
+        """计数加一并返回新值，计数在首次创建 ttl 秒后过期"""
+        with self._lock:
+            item = self._entries.get(key)
+            now = time.monotonic()
+            if item is None or item[0] < now:
+                item = (now + ttl, 0)
+            item = (item[0], item[1] + 1)
+            self._entries[key] = item
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return item[1]
+
+    def get_versions(self, tags):
+        """获取标签版本号，不存在的标签会生成新的版本号"""
+        with self._lock:
+            versions = []
+            for tag in tags:
+                version = self._versions.get(tag)
+                if version is None:
+                    version = self._versions[tag] = uuid.uuid4().hex[:12]
+                else:
+                    self._versions.move_to_end(tag)
+                versions.append(version)
+            self._trim_versions()
+            return versions
+
+    def bump_versions(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = uuid.uuid4().hex[:12]
+                self._versions.move_to_end(tag)
+            self._trim_versions()
+
+    def _trim_versions(self):
+        # 标签按文章、评论列表、用户创建，数量随访问过的ID增长，需要与缓存条目一样限制
+        while len(self._versions) > self.max_versions:
+            self._versions.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class TTLStore:
+    """
+    进程内带过期时间的键值存储
+
+    不限制条目数、不按最近使用淘汰，条目只在过期后清除，
+    用于频率限制计数等不能被大量缓存请求挤出的状态
+    """
+
+    name = 'local'
+
+    # 条目数超过该值后写入时顺带清理过期条目，之后阈值随存活条目数翻倍
+    PURGE_THRESHOLD = 1024
+
+    def __init__(self):
+        self._entries = {}  # key -> (过期时间戳, 值)
+        self._lock = threading.Lock()
+        self._purge_at = self.PURGE_THRESHOLD
+
+    def _purge(self, now):
+        if len(self._entries) < self._purge_at:
+            return
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        self._purge_at = max(self.PURGE_THRESHOLD, len(self._entries) * 2)
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] < time.monotonic():
+                return None
+            return item[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            self._entries[key] = (now + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key, ttl):
+        """计数加一并返回新值，计数在首次创建 ttl 秒后过期"""
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            item = self._entries.get(key)
+            if item is None or item[0] < now:
+                item = (now + ttl, 0)
+            item = (item[0], item[1] + 1)
+            self._entries[key] = item
+            return item[1]
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Redis缓存后端
+
+    多个工作进程共享缓存与标签版本号，写操作在任一进程中触发的失效对所有进程生效
+    """
+
+    name = 'redis'
+
+    def __init__(self, url=None, prefix='blog:cache:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError('使用Redis缓存后端需要安装 redis 包') from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key, ttl):
+        count = self.client.incr(self.prefix + key)
+        if count == 1:
+            self.client.expire(self.prefix + key, max(1, int(ttl)))
+        return count
+
+    def get_versions(self, tags):
+        keys = [f'{self.prefix}tag:{tag}' for tag in tags]
+        versions = self.client.mget(keys)
+        result = []
+        for key, version in zip(keys, versions):
+            if version is None:
+                # 不存在时写入新版本号；若其他进程已抢先写入则以其为准
+                candidate = uuid.uuid4().hex[:12]
+                self.client.set(key, candidate, nx=True)
+                version = self.client.get(key) or candidate
+            result.append(version.decode() if isinstance(version, bytes) else version)
+        return result
+
+    def bump_versions(self, tags):
+        for tag in tags:
+            self.client.set(f'{self.prefix}tag:{tag}', uuid.uuid4().hex[:12])
+
+    def clear(self):
+        for key in self.client.scan_iter(f'{self.prefix}*'):
+            self.client.delete(key)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """
+    响应缓存扩展
+
+    用法与其他Flask扩展一致：先创建实例，再在 create_app 中调用 init_app
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.state = TTLStore()  # 不能被淘汰的短期状态（频率限制计数、读己之写记录）
+        self.default_ttl = 60
+        self._stats = {}  # 端点 -> {'hits': 命中次数, 'misses': 未命中次数}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """根据配置创建缓存后端"""
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'lru')
+        self.default_ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        if backend == 'lru':
+            self.backend = LRUBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 2048),
+                                      app.config.get('RESPONSE_CACHE_MAX_TAGS'))
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config.get('RESPONSE_CACHE_REDIS_URL'))
+        elif backend in (None, '', 'none'):
+            self.backend = None
+        else:
+            raise ValueError(f'未知的缓存后端: {backend}')
+        # Redis本身按过期时间清除，可直接共享；进程内LRU会淘汰条目，短期状态另存
+        self.state = self.backend if isinstance(self.backend, RedisBackend) else TTLStore()
+        self.reset_stats()
+        app.extensions['response_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def make_key(self, tags):
+        """根据请求路径、查询参数和标签版本号生成缓存键"""
+        query = urlencode(sorted(request.args.items(multi=True)))
+        versions = self.backend.get_versions(tags)
+        tag_part = ','.join(f'{tag}={version}' for tag, version in zip(tags, versions))
+        return f'{request.path}?{query}|{tag_part}'
+
+    def invalidate(self, *tags):
+        """使带有指定标签的缓存失效，应在写操作提交成功后调用"""
+        if self.enabled and tags:
+            self.backend.bump_versions(tags)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def _record(self, endpoint, outcome):
+        with self._stats_lock:
+            counters = self._stats.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    def stats(self):
+        """返回命中/未命中统计，用于调整缓存时间"""
+        with self._stats_lock:
+            endpoints = {endpoint: dict(counters) for endpoint, counters in self._stats.items()}
+        hits = sum(counters['hits'] for counters in endpoints.values())
+        misses = sum(counters['misses'] for counters in endpoints.values())
+        return {
+            'backend': self.backend.name if self.enabled else None,
+            'ttl': self.default_ttl,
+            'entries': self.backend.size() if self.enabled else 0,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+            'endpoints': endpoints
+        }
+
+    def cached(self, tags, ttl=None):
+        """
+        缓存视图函数响应的装饰器
+
+        Args:
+            tags: 标签列表，或接收视图参数并返回标签列表的函数
+            ttl: 缓存时间（秒），默认使用 RESPONSE_CACHE_TTL
+
+        只缓存状态码为200且未声明 Cache-Control: private/no-store 的响应；
+        视图执行期间设置 g.skip_response_cache 时本次响应不写入缓存
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                view_tags = tags(**kwargs) if callable(tags) else tags
+                key = self.make_key(list(view_tags))
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self._record(request.endpoint, 'hits')
+                    body, status, headers, *rest = entry
+                    response = current_app.response_class(body, status=status, headers=headers)
+                    apply_variant(response, rest[0] if rest else None)
+                    response.headers['X-Cache'] = 'HIT'
+                    # 缓存的响应带有 ETag / Last-Modified 时，直接处理条件请求
+                    return response.make_conditional(request)
+
+                self._record(request.endpoint, 'misses')
+                response = make_response(view(*args, **kwargs))
+                cache_control = response.headers.get('Cache-Control', '')
+                if (response.status_code == 200 and not response.direct_passthrough
+                        and not g.get('skip_response_cache')
+                        and 'private' not in cache_control and 'no-store' not in cache_control):
+                    headers = [(name, value) for name, value in response.headers.items()
+                               if name.lower() not in ('content-length', 'set-cookie')]
+                    # 同时保存各编码的压缩结果，命中时无需再次压缩
+                    variants = precompress(response)
+                    self.backend.set(key, (response.get_data(), response.status_code, headers, variants),
+                                     ttl or current_app.config.get('RESPONSE_CACHE_TTL', self.default_ttl))
+                    apply_variant(response, variants)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
@@ -0,0 +1,153 @@
+"""
+响应压缩模块
+==================
+根据请求头 Accept-Encoding 协商 br（需安装 brotli 包）或 gzip 压缩响应体：
+
+- 普通响应：体积达到 COMPRESSION_MIN_SIZE 且类型可压缩时压缩
+- 缓存响应：写入响应缓存时一次性生成各编码的压缩结果与原始响应一起保存，
+  缓存命中时直接返回与客户端协商一致的压缩结果，热门文章只压缩一次
+- 流式响应（导出接口）：逐块压缩输出，内存占用不随数据量增长；text/event-stream 不压缩
+
+压缩后的响应带有 Vary: Accept-Encoding，强 ETag 转为弱 ETag（与 nginx 的处理一致），
+If-None-Match 使用弱比较，压缩与未压缩的表示共享同一个校验器。
+"""
+
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 未安装 brotli 时只支持 gzip
+    brotli = None
+
+# 默认可压缩的响应类型
+DEFAULT_MIMETYPES = (
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html',
+    'text/css', 'application/javascript', 'image/svg+xml',
+)
+
+
+def available_encodings():
+    """当前环境支持的编码，按优先顺序排列"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate():
+    """根据 Accept-Encoding 选择编码，质量值相同时优先 br；客户端不接受压缩时返回 None"""
+    accept = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding):
+    """按配置的压缩级别压缩整段数据"""
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.get('COMPRESSION_BROTLI_QUALITY', 5))
+    compressor = zlib.compressobj(config.get('COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _stream_compressor(encoding):
+    """返回 (压缩一块, 结束) 两个函数"""
+    config = current_app.config
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=config.get('COMPRESSION_BROTLI_QUALITY', 5))
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(config.get('COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compressible(response):
+    """响应类型与状态是否适合压缩（不检查大小）"""
+    if not current_app.config.get('COMPRESSION_ENABLED', True):
+        return False
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return False
+    if 'no-transform' in response.headers.get('Cache-Control', ''):
+        return False
+    mimetypes = current_app.config.get('COMPRESSION_MIMETYPES') or DEFAULT_MIMETYPES
+    return response.mimetype in mimetypes
+
+
+def precompress(response):
+    """
+    为将要写入缓存的响应生成各编码的压缩结果
+
+    Returns:
+        dict: {编码: 压缩后的字节}，响应过小或不可压缩时为空
+    """
+    if not compressible(response) or response.is_streamed:
+        return {}
+    body = response.get_data()
+    if len(body) < current_app.config.get('COMPRESSION_MIN_SIZE', 1024):
+        return {}
+    return {encoding: compress(body, encoding) for encoding in available_encodings()}
+
+
+def _mark_encoded(response, encoding):
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def apply_variant(response, variants):
+    """缓存的压缩结果中有客户端接受的编码时，用它替换响应体"""
+    if variants:
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate()
+        if encoding in variants:
+            response.set_data(variants[encoding])
+            _mark_encoded(response, encoding)
+    return response
+
+
+def _compress_stream(chunks, process, finish):
+    # 生成器在请求上下文结束后才开始执行，压缩器需在请求期间创建
+    try:
+        for chunk in chunks:
+            data = process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # 客户端提前断开时关闭原始生成器，释放其持有的请求上下文和数据库游标
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """after_request 钩子：压缩尚未压缩的响应"""
+    if request.method == 'HEAD' or not compressible(response):
+        return response
+    if response.is_streamed:
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate()
+        if encoding is None:
+            return response
+        response.response = _compress_stream(response.response, *_stream_compressor(encoding))
+        response.headers.pop('Content-Length', None)
+        _mark_encoded(response, encoding)
+        return response
+    if response.direct_passthrough:
+        return response
+    body = response.get_data()
+    if len(body) < current_app.config.get('COMPRESSION_MIN_SIZE', 1024):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate()
+    if encoding is not None:
+        response.set_data(compress(body, encoding))
+        _mark_encoded(response, encoding)
+    return response
+
+
+def init_compression(app):
+    """注册压缩钩子"""
+    app.after_request(compress_response)
@@ -0,0 +1,69 @@
+"""
+条件请求工具模块
+==================
+为只读接口的响应添加 ETag / Last-Modified 校验器，
+并在请求携带 If-None-Match / If-Modified-Since 且资源未变化时返回304。
+"""
+
+import hashlib
+from datetime import timezone
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+
+
+def conditional(view):
+    """
+    条件请求装饰器
+    
+    视图未设置 ETag 时，以序列化后响应体的哈希作为强 ETag
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.direct_passthrough:
+            if 'ETag' not in response.headers:
+                response.add_etag()
+            response.make_conditional(request)
+        return response
+    return wrapper
+
+
+def version_etag(resource, *parts):
+    """
+    根据资源版本信息和查询参数生成 ETag，无需序列化响应体
+    
+    Args:
+        resource: 资源名称，例如 article-1
+        parts: 影响响应内容的版本信息
+    """
+    query = urlencode(sorted(request.args.items(multi=True)))
+    digest = hashlib.sha1('|'.join([resource, query, *map(str, parts)]).encode('utf-8')).hexdigest()
+    return f'{resource}-{digest[:16]}'
+
+
+def as_utc(value):
+    """将数据库读取的时间转换为UTC时间（无时区信息的时间按UTC处理）"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def not_modified(etag, last_modified=None):
+    """
+    判断客户端缓存的资源是否仍然有效
+    
+    Returns:
+        Response | None: 资源未变化时返回304响应，否则返回None
+    """
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        return response
+    return None
@@ -0,0 +1,47 @@
+"""
+文章内容工具模块
+==================
+提供从Markdown正文提取纯文本、生成摘要等内容处理函数
+"""
+
+import re
+
+# 摘要的最大字符数
+EXCERPT_LENGTH = 200
+
+_CODE_FENCE_RE = re.compile(r'```.*?```', re.S)
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_MARKUP_RE = re.compile(r'[#*`>\[\]_~|]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def plain_text(content):
+    """
+    去除Markdown标记（代码块整体去除），返回压缩空白后的纯文本
+    
+    Args:
+        content: Markdown格式的文章正文
+    """
+    if not content:
+        return ''
+    text = _CODE_FENCE_RE.sub(' ', content)
+    text = _IMAGE_RE.sub(r'\1', text)
+    text = _LINK_RE.sub(r'\1', text)
+    text = _MARKUP_RE.sub(' ', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """
+    从Markdown正文生成纯文本摘要
+    
+    Args:
+        content: Markdown格式的文章正文
+        length: 摘要最大字符数，超出部分以省略号结尾
+    
+    Returns:
+        str: 去除Markdown标记并压缩空白后的摘要
+    """
+    text = plain_text(content)
+    return text[:length] + '...' if len(text) > length else text
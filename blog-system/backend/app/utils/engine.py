@@ -0,0 +1,148 @@
+"""
+数据库引擎配置模块
+==================
+根据配置生成 SQLAlchemy 引擎参数，并提供连接池监控：
+
+- MySQL / PostgreSQL：连接池大小、溢出数、获取超时、回收时间、连接前检测以及语句超时
+- SQLite 文件数据库：每个连接建立时执行 SQLITE_PRAGMAS（默认开启WAL，读写互不阻塞）
+- 连接池统计：获取连接次数、等待时间、超时次数与当前占用数，用于按工作进程数和线程数调整连接池大小
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# 只适用于 QueuePool 的参数
+_QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录获取连接等待时间的连接池"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return connection
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._checkouts = 0
+            self._timeouts = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+
+    def stats(self):
+        with self._stats_lock:
+            checkouts, timeouts = self._checkouts, self._timeouts
+            wait_total, wait_max = self._wait_total, self._wait_max
+        return {
+            'pool_class': type(self).__name__,
+            'size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_out': self.checkedout(),
+            'idle': self.checkedin(),
+            'overflow': max(0, self.overflow()),
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_avg_ms': round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+            'wait_max_ms': round(wait_max * 1000, 3),
+        }
+
+
+def _is_memory_sqlite(url):
+    return url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    根据应用配置生成 SQLALCHEMY_ENGINE_OPTIONS
+
+    Args:
+        config: Flask 应用配置
+
+    Returns:
+        dict: 引擎参数
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    # SQLite内存数据库使用 StaticPool，连接池参数不适用
+    if _is_memory_sqlite(url):
+        for name in _QUEUE_POOL_OPTIONS + ('pool_recycle', 'pool_pre_ping'):
+            options.pop(name, None)
+        return options
+
+    options.setdefault('poolclass', InstrumentedQueuePool)
+
+    timeout_ms = config.get('DB_STATEMENT_TIMEOUT_MS') or 0
+    if timeout_ms:
+        connect_args = dict(options.get('connect_args') or {})
+        if url.drivername.startswith('mysql'):
+            # 只限制 SELECT 语句的执行时间（MySQL 5.7.8+）
+            connect_args.setdefault('init_command', f'SET SESSION max_execution_time = {int(timeout_ms)}')
+        elif url.drivername.startswith('postgresql'):
+            connect_args.setdefault('options', f'-c statement_timeout={int(timeout_ms)}')
+        options['connect_args'] = connect_args
+    return options
+
+
+def _parse_pragmas(value):
+    """将 'journal_mode=WAL,synchronous=NORMAL' 解析为 [(名称, 值)]"""
+    pragmas = []
+    for item in (value or '').split(','):
+        name, _, pragma_value = item.strip().partition('=')
+        if name and pragma_value:
+            if not (name.isidentifier() and pragma_value.replace('-', '').isalnum()):
+                raise ValueError(f'无效的SQLite PRAGMA配置: {item}')
+            pragmas.append((name, pragma_value))
+    return pragmas
+
+
+def init_engine(app, engine):
+    """为引擎注册连接初始化事件，需要在首次连接数据库前调用"""
+    # SQLAlchemy 按“模块名.类名”为连接池创建日志记录器，子类因此落在 app 日志记录器之下；
+    # 与 SQLAlchemy 默认行为保持一致，只输出警告及以上的日志（已显式设置级别时不覆盖）
+    pool_logger = logging.getLogger(__name__)
+    if pool_logger.level == logging.NOTSET:
+        pool_logger.setLevel(logging.WARNING)
+
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = _parse_pragmas(app.config.get('SQLITE_PRAGMAS'))
+    if not pragmas or _is_memory_sqlite(engine.url):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+
+def pool_stats(engine):
+    """返回连接池统计；未使用可监控的连接池时只返回连接池类型"""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {'pool_class': type(pool).__name__}
@@ -0,0 +1,112 @@
+"""
+JSON编码模块
+==================
+应用统一使用的JSON编码：安装了 orjson 时使用 orjson，否则回退到标准库 json。
+
+- datetime / date / time 编码为 ISO 8601 字符串（与 isoformat() 相同），枚举编码为其值
+- 中文等非ASCII字符直接以UTF-8输出，不转义为 \\uXXXX
+- FastJSONProvider 注册为Flask的JSON提供器后，jsonify() 与 request.get_json() 均使用这里的实现
+"""
+
+import datetime
+import decimal
+import enum
+import json
+import uuid
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时使用标准库
+    orjson = None
+
+
+def default(value):
+    """编码JSON原生不支持的类型"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def to_text(value):
+    """非JSON场景（如CSV）中把单个值转换为与JSON编码一致的文本"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return default(value)
+
+
+def _stdlib_dumps(obj, sort_keys=False, indent=None):
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=indent, separators=separators)
+
+
+def dumps_bytes(obj, sort_keys=False, indent=False):
+    """编码为UTF-8字节串"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # 超出64位的整数等 orjson 不支持的值交给标准库处理（仍不支持时抛出同样的异常）
+            pass
+    return _stdlib_dumps(obj, sort_keys, 2 if indent else None).encode('utf-8')
+
+
+def dumps(obj, sort_keys=False, indent=False):
+    """编码为字符串"""
+    if orjson is None:
+        return _stdlib_dumps(obj, sort_keys, 2 if indent else None)
+    return dumps_bytes(obj, sort_keys, indent).decode('utf-8')
+
+
+def loads(data):
+    """解码JSON字符串或字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON提供器
+
+    sort_keys 默认为 True 以保持与Flask默认输出相同的键顺序（响应体与ETag稳定），
+    可通过 JSON_SORT_KEYS 配置关闭
+    """
+
+    sort_keys = True
+    compact = None
+    mimetype = 'application/json'
+    default = staticmethod(default)  # flask_jwt_extended 通过该属性编码令牌中的自定义类型
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # 调用方指定了编码参数时使用标准库以保证参数生效
+            kwargs.setdefault('default', default)
+            kwargs.setdefault('ensure_ascii', False)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,110 @@
+"""
+幂等请求模块
+==================
+写接口使用 @idempotent 装饰后，客户端可以携带 Idempotency-Key 请求头安全地重试：
+
+- 首次请求在处理前登记该键（提交后其他进程可见），处理完成后保存响应状态码与响应体
+- 相同的键与相同的请求体再次到达时直接返回保存的响应，并带有 Idempotent-Replayed: true
+- 相同的键用于不同的请求体时返回 422；前一个请求仍在处理中时返回 409
+- 5xx 响应和处理过程中的异常不保存结果并释放该键，客户端可以用同一个键重试
+
+键按端点和当前用户划分作用域，保留 IDEMPOTENCY_KEY_TTL 秒后过期。
+未携带请求头的请求按原方式处理。需要放在 @jwt_required() 和权限检查之后，
+未通过认证或权限检查的请求不登记幂等键，否则之后用正确凭据重试会重放 401/403。
+"""
+
+import hashlib
+import re
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+_KEY_PATTERN = re.compile(r'^[A-Za-z0-9._:-]{1,100}$')
+
+
+def _fingerprint():
+    digest = hashlib.sha256(request.method.encode())
+    digest.update(request.full_path.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(record):
+    response = current_app.response_class(record.response_body, status=record.status_code,
+                                          mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _reserve(scope, key, fingerprint):
+    """
+    登记幂等键
+
+    Returns:
+        IdempotencyKey: 已存在且未过期的记录；登记成功时返回 None
+    """
+    now = datetime.utcnow()
+    # 顺带清理过期的键（expires_at 上有索引）
+    db.session.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= now).delete(synchronize_session=False)
+    record = db.session.get(IdempotencyKey, (scope, key))
+    if record is not None:
+        db.session.commit()
+        return record
+    ttl = current_app.config.get('IDEMPOTENCY_KEY_TTL', 86400)
+    db.session.add(IdempotencyKey(scope=scope, key=key, fingerprint=fingerprint,
+                                  expires_at=now + timedelta(seconds=ttl)))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # 另一个请求同时登记了同一个键
+        db.session.rollback()
+        return db.session.get(IdempotencyKey, (scope, key))
+    return None
+
+
+def _finish(scope, key, response):
+    db.session.rollback()  # 丢弃视图未提交的改动
+    query = db.session.query(IdempotencyKey).filter_by(scope=scope, key=key)
+    if response is None or response.status_code >= 500 or response.is_streamed:
+        query.delete()
+    else:
+        query.update({'status_code': response.status_code,
+                      'response_body': response.get_data(as_text=True)})
+    db.session.commit()
+
+
+def idempotent(view):
+    """按 Idempotency-Key 请求头去重写请求的装饰器"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not _KEY_PATTERN.match(key):
+            return jsonify({'message': f'{HEADER} 必须是1到100个字母、数字或 ._:- 字符'}), 400
+
+        scope = f'{request.endpoint}:{get_jwt_identity()}'
+        fingerprint = _fingerprint()
+        record = _reserve(scope, key, fingerprint)
+        if record is not None:
+            if record.fingerprint != fingerprint:
+                return jsonify({'message': f'{HEADER} 已用于不同的请求'}), 422
+            if record.status_code is None:
+                return jsonify({'message': '相同幂等键的请求正在处理中'}), 409
+            return _replay(record)
+
+        response = None
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            _finish(scope, key, response)
+        return response
+    return wrapper
+
@@ -0,0 +1,324 @@
+"""
+后台任务队列模块
+==================
+写操作附带的耗时工作（如正文渲染）作为任务保存在 jobs 表中，由后台工作线程或独立的工作进程执行，
+不再占用写请求的响应时间：
+
+- enqueue() 在当前事务中插入任务，与业务数据一同提交或回滚：已提交的任务不会因进程退出而丢失，
+  回滚的写入也不会留下任务；会话提交后唤醒本进程的工作线程立即处理，否则每 JOB_POLL_SECONDS 秒轮询一次
+- 工作线程以条件更新（UPDATE ... WHERE status = 'pending'）认领任务，多个线程、进程同时轮询时
+  同一任务只会被一个执行者认领；执行者崩溃后，认领超过 JOB_LOCK_TIMEOUT 秒的任务可以重新认领
+- 任务成功后删除；失败后按指数退避（JOB_RETRY_BASE_SECONDS * 2^(已执行次数-1)，最长 JOB_RETRY_MAX_SECONDS）
+  重试，执行 JOB_MAX_ATTEMPTS 次仍失败时标记为 failed 保留在表中
+- 每个进程 JOB_WORKERS 个工作线程，在Gunicorn工作进程启动（post_fork）、进程首次处理请求或提交任务时启动
+  （预加载应用时主进程不启动，fork 出的工作进程各自启动）；设为0时只由独立进程执行：flask --app run jobs-worker
+
+处理函数用 @handler('任务名称') 注册，以入队时的参数作为关键字参数调用，在应用上下文中执行，
+返回后提交 db.session。处理函数需要幂等：重试或认领超时后同一任务可能执行多次。
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import and_, delete, event, func, insert, or_, select, update
+
+from app import db
+from app.utils.replica import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+FAILED = 'failed'
+
+# 会话中有新任务的标记，提交后唤醒工作线程
+_SESSION_FLAG = 'jobs_enqueued'
+
+_handlers = {}
+_events_registered = False
+
+
+def handler(name):
+    """注册任务处理函数"""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def _table():
+    from app.models import Job
+    return Job.__table__
+
+
+def enqueue(name, payload=None, connection=None, delay=0, max_attempts=None):
+    """
+    在当前事务中加入任务，事务提交后任务才可被执行
+
+    Args:
+        name: 任务名称，需已用 @handler 注册
+        payload: 处理函数的关键字参数，需可JSON序列化
+        connection: 执行插入的连接，映射器事件中传入 flush 使用的连接；默认使用 db.session 的连接
+        delay: 推迟执行的秒数
+        max_attempts: 最多执行次数，默认 JOB_MAX_ATTEMPTS
+    """
+    if name not in _handlers:
+        raise ValueError(f'未注册的任务: {name}')
+    if max_attempts is None:
+        max_attempts = current_app.config.get('JOB_MAX_ATTEMPTS', 5)
+    (connection or db.session.connection()).execute(insert(_table()), {
+        'name': name,
+        'payload': json.dumps(payload or {}, ensure_ascii=False),
+        'status': PENDING,
+        'attempts': 0,
+        'max_attempts': max_attempts,
+        'run_at': datetime.utcnow() + timedelta(seconds=delay),
+    })
+    db.session.info[_SESSION_FLAG] = True
+
+
+def retry_delay(attempts, base, maximum):
+    """第 attempts 次执行失败后的重试间隔（秒）"""
+    return min(base * 2 ** (attempts - 1), maximum)
+
+
+def _claimable(table, now, lock_timeout):
+    return or_(
+        and_(table.c.status == PENDING, table.c.run_at <= now),
+        and_(table.c.status == RUNNING, table.c.locked_at <= now - timedelta(seconds=lock_timeout)),
+    )
+
+
+def _claim(worker_id):
+    """认领一个到期的任务，没有可执行的任务时返回 None"""
+    table = _table()
+    now = datetime.utcnow()
+    claimable = _claimable(table, now, current_app.config.get('JOB_LOCK_TIMEOUT', 300))
+    with db.engine.connect() as connection:
+        candidates = connection.execute(
+            select(table.c.id).where(claimable).order_by(table.c.run_at).limit(10)
+        ).scalars().all()
+        connection.commit()
+        for job_id in candidates:
+            # 每次认领是一个只含条件更新的短事务（SQLite中读事务升级为写事务容易遇到锁冲突），
+            # 更新失败说明已被其他执行者认领
+            claimed = connection.execute(
+                update(table).where(table.c.id == job_id, claimable)
+                .values(status=RUNNING, locked_by=worker_id, locked_at=now, attempts=table.c.attempts + 1)
+            ).rowcount
+            connection.commit()
+            if claimed:
+                return connection.execute(select(table).where(table.c.id == job_id)).one()
+    return None
+
+
+def _finish(job, worker_id, error=None):
+    """记录执行结果：成功时删除任务，失败时安排重试或标记为 failed"""
+    table = _table()
+    # 认领超时后任务可能已被其他执行者重新认领，此时由对方记录结果
+    mine = and_(table.c.id == job.id, table.c.locked_by == worker_id)
+    with db.engine.begin() as connection:
+        if error is None:
+            connection.execute(delete(table).where(mine))
+            return
+        values = {'locked_by': None, 'locked_at': None, 'last_error': f'{type(error).__name__}: {error}'[:2000]}
+        if job.attempts >= job.max_attempts:
+            values['status'] = FAILED
+        else:
+            config = current_app.config
+            delay = retry_delay(job.attempts, config.get('JOB_RETRY_BASE_SECONDS', 10),
+                                config.get('JOB_RETRY_MAX_SECONDS', 3600))
+            values.update(status=PENDING, run_at=datetime.utcnow() + timedelta(seconds=delay))
+        connection.execute(update(table).where(mine).values(**values))
+
+
+def _execute(job, worker_id):
+    try:
+        func = _handlers.get(job.name)
+        if func is None:
+            raise LookupError(f'未注册的任务: {job.name}')
+        func(**json.loads(job.payload))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('后台任务执行失败', extra={'job_id': job.id, 'job': job.name, 'attempts': job.attempts})
+        _finish(job, worker_id, e)
+        return False
+    _finish(job, worker_id)
+    return True
+
+
+def _worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'[:150]
+
+
+def run_pending(limit=None, stop=None):
+    """
+    在当前线程中执行到期的任务，需要在应用上下文中调用
+
+    Args:
+        limit: 最多执行的任务数，默认执行到没有到期任务为止
+        stop: threading.Event，设置后执行完当前任务即返回
+
+    Returns:
+        int: 执行的任务数（包括失败的任务）
+    """
+    worker_id = _worker_id()
+    count = 0
+    while (limit is None or count < limit) and not (stop is not None and stop.is_set()):
+        job = _claim(worker_id)
+        if job is None:
+            break
+        _execute(job, worker_id)
+        count += 1
+    return count
+
+
+def job_counts():
+    """各状态的任务数"""
+    table = _table()
+    rows = db.session.execute(select(table.c.status, func.count()).group_by(table.c.status)).all()
+    return {status: count for status, count in rows}
+
+
+def retry_failed():
+    """把失败的任务重新排队，返回任务数"""
+    table = _table()
+    result = db.session.execute(
+        update(table).where(table.c.status == FAILED)
+        .values(status=PENDING, attempts=0, run_at=datetime.utcnow(), last_error=None)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+class JobRunner:
+    """每进程的后台工作线程"""
+
+    def __init__(self, app, workers=1, poll_seconds=5):
+        self.app = app
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._pid = None
+        self._lock = threading.Lock()
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def ensure_started(self):
+        """在当前进程中启动工作线程（fork 出的子进程不会继承父进程的线程）"""
+        if self.workers <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._wakeup = threading.Event()
+            self._stopping = threading.Event()
+            self._threads = [
+                threading.Thread(target=self._loop, name=f'job-worker-{index}', daemon=True)
+                for index in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def wake(self):
+        """有新任务提交，唤醒工作线程"""
+        self.ensure_started()
+        self._wakeup.set()
+
+    def stop(self, wait=True):
+        """
+        执行完当前任务后停止工作线程，之后本进程不再启动；
+        销毁应用前（如测试夹具清理、删除数据库之前）调用，避免线程继续轮询已不存在的数据库
+        """
+        with self._lock:
+            self._pid = os.getpid()
+        self._stopping.set()
+        self._wakeup.set()
+        if wait:
+            self.join()
+
+    def join(self):
+        for thread in self._threads:
+            # 分段等待，主线程仍能及时响应 Ctrl+C
+            while thread.is_alive():
+                thread.join(1)
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                with self.app.app_context():
+                    processed = run_pending(stop=self._stopping)
+            except Exception:
+                # 数据库不可用等情况，稍后重试
+                logger.exception('后台任务轮询失败')
+                processed = 0
+            if not processed:
+                self._wakeup.wait(self.poll_seconds)
+
+
+def _after_commit(session):
+    if session.info.pop(_SESSION_FLAG, False) and has_app_context():
+        runner = current_app.extensions.get('jobs')
+        if runner is not None:
+            runner.wake()
+
+
+def _after_rollback(session):
+    session.info.pop(_SESSION_FLAG, None)
+
+
+def init_jobs(app):
+    """创建本进程的工作线程管理器，注册提交后唤醒的会话事件与命令行命令"""
+    global _events_registered
+
+    app.extensions['jobs'] = runner = JobRunner(
+        app, app.config.get('JOB_WORKERS', 1), app.config.get('JOB_POLL_SECONDS', 5)
+    )
+    # 首次处理请求时启动工作线程（预加载应用时在工作进程中启动）
+    app.before_request(runner.ensure_started)
+
+    if not _events_registered:
+        event.listen(RoutingSession, 'after_commit', _after_commit)
+        event.listen(RoutingSession, 'after_rollback', _after_rollback)
+        _events_registered = True
+
+    @app.cli.command('jobs-worker')
+    @click.option('--threads', default=1, show_default=True, help='工作线程数')
+    @click.option('--once', is_flag=True, help='执行完当前到期的任务后退出')
+    def jobs_worker_command(threads, once):
+        """运行独立的后台任务工作进程"""
+        if once:
+            print(f'已执行 {run_pending()} 个任务')
+            return
+        worker = JobRunner(app, threads, app.config.get('JOB_POLL_SECONDS', 5))
+        app.extensions['jobs'] = worker
+        signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop(wait=False))
+        worker.ensure_started()
+        print(f'后台任务工作进程已启动（{threads} 个线程），按 Ctrl+C 退出')
+        try:
+            worker.join()
+        except KeyboardInterrupt:
+            print('等待执行中的任务完成...')
+            worker.stop()
+
+    @app.cli.command('jobs-status')
+    def jobs_status_command():
+        """输出各状态的任务数"""
+        counts = job_counts()
+        for status in (PENDING, RUNNING, FAILED):
+            print(f'{status}: {counts.get(status, 0)}')
+
+    @app.cli.command('jobs-retry')
+    def jobs_retry_command():
+        """把失败的任务重新排队"""
+        print(f'已重新排队 {retry_failed()} 个任务')
@@ -0,0 +1,222 @@
+"""
+结构化日志模块
+==================
+应用日志（app.* 日志记录器）经 QueueHandler 放入有界队列，由后台 QueueListener 线程
+格式化后写入标准错误，请求线程不会因为标准输出加锁或写入缓慢而阻塞；队列已满时丢弃日志并计数。
+
+- 格式：LOG_FORMAT=json 时每行一个JSON对象，text 时为便于本地阅读的单行文本
+- 请求ID：优先使用请求头 X-Request-ID，否则生成新的ID，写入每条日志并在响应头中返回
+- 采样：DEBUG 日志按请求ID采样（LOG_DEBUG_SAMPLE_RATE），同一请求的调试日志要么全部保留要么全部丢弃
+- 级别：LOG_LEVEL 为应用默认级别，LOG_BLUEPRINT_LEVELS 按蓝图单独设置，例如 admin=DEBUG,auth=WARNING
+
+使用方式与标准库相同：模块内 logger = logging.getLogger(__name__)。
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# 应用日志记录器的根名称
+APP_LOGGER = 'app'
+
+# 请求头中可接受的请求ID
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+# LogRecord 的标准属性，其余属性视为 extra 字段输出
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+_CONTEXT_ATTRS = ('request_id', 'method', 'path', 'endpoint')
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        for key in _CONTEXT_ATTRS:
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key not in _CONTEXT_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exc_info'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """在产生日志的线程中附加请求上下文，并按请求对DEBUG日志采样"""
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        request_id = None
+        if has_request_context():
+            request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+            record.endpoint = request.endpoint
+        record.request_id = request_id or '-'
+        if record.levelno <= logging.DEBUG and self.sample_rate < 1:
+            key = request_id or uuid.uuid4().hex
+            return zlib.crc32(key.encode()) % 10000 < self.sample_rate * 10000
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    非阻塞队列处理器
+
+    队列已满时丢弃日志；fork 后的子进程首次写日志时重新创建队列和后台线程
+    （gunicorn 预加载应用时监听线程只存在于主进程）
+    """
+
+    def __init__(self, queue_size, target):
+        self.queue_size = queue_size
+        self.target = target
+        self.dropped = 0
+        self._pid = None
+        self._lock_start = threading.Lock()
+        self.listener = None
+        super().__init__(queue.Queue(queue_size))
+        self._start()
+
+    def _start(self):
+        self.queue = queue.Queue(self.queue_size)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        self._pid = os.getpid()
+
+    def stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+        self.listener = None
+
+    def prepare(self, record):
+        # 在请求线程中完成消息格式化，异常堆栈转为文本，避免在后台线程中访问请求期间的对象
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            with self._lock_start:
+                if self._pid != os.getpid():
+                    self._start()
+        super().emit(record)
+
+
+_queue_handler = None
+
+
+def _shutdown():
+    if _queue_handler is not None:
+        _queue_handler.stop()
+
+
+atexit.register(_shutdown)
+
+
+def _parse_levels(value):
+    """将 'admin=DEBUG,auth=WARNING' 解析为 {蓝图名: 级别}"""
+    if isinstance(value, dict):
+        return dict(value)
+    levels = {}
+    for item in (value or '').split(','):
+        name, _, level = item.strip().partition('=')
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _assign_request_id():
+    request_id = request.headers.get('X-Request-ID', '')
+    g.request_id = request_id if _REQUEST_ID_PATTERN.match(request_id) else uuid.uuid4().hex
+
+
+def _return_request_id(response):
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    return response
+
+
+def init_logging(app, stream=None):
+    """
+    配置应用日志记录器并注册请求ID钩子，需要在注册蓝图之后调用
+
+    Args:
+        app: Flask应用
+        stream: 日志输出流，默认为标准错误
+
+    Returns:
+        NonBlockingQueueHandler: 队列处理器（handler.target 为实际输出的处理器）
+    """
+    global _queue_handler
+    config = app.config
+
+    target = logging.StreamHandler(stream or sys.stderr)
+    if config.get('LOG_FORMAT', 'json') == 'json':
+        target.setFormatter(JsonFormatter())
+    else:
+        target.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'))
+
+    handler = NonBlockingQueueHandler(config.get('LOG_QUEUE_SIZE', 10000), target)
+    handler.addFilter(RequestContextFilter(config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)))
+
+    # 同一进程中重复创建应用（如测试）时替换之前的处理器
+    logger = logging.getLogger(APP_LOGGER)
+    if _queue_handler is not None:
+        logger.removeHandler(_queue_handler)
+        _queue_handler.stop()
+    _queue_handler = handler
+    logger.addHandler(handler)
+    logger.setLevel(config.get('LOG_LEVEL', 'INFO'))
+    logger.propagate = config.get('LOG_PROPAGATE', False)
+
+    for blueprint in app.blueprints.values():
+        logging.getLogger(blueprint.import_name).setLevel(logging.NOTSET)
+    for name, level in _parse_levels(config.get('LOG_BLUEPRINT_LEVELS')).items():
+        blueprint = app.blueprints.get(name)
+        if blueprint is None:
+            raise ValueError(f'LOG_BLUEPRINT_LEVELS 中的蓝图不存在: {name}')
+        logging.getLogger(blueprint.import_name).setLevel(level)
+
+    app.before_request_funcs.setdefault(None, []).insert(0, _assign_request_id)
+    app.after_request(_return_request_id)
+    app.extensions['logging'] = handler
+    return handler
@@ -0,0 +1,174 @@
+"""
+Markdown渲染模块
+==================
+把文章正文渲染为HTML，同时生成目录与阅读时间。
+
+- 解析与渲染使用 markdown-it-py（CommonMark，另启用GFM表格与删除线）；正文中的原始HTML一律转义为文本
+- 两个后处理规则：为标题生成锚点并收集目录；链接和图片只允许 http/https/mailto 与相对地址，
+  其他地址（javascript: 等）的链接只保留文字、图片只保留替代文字；图片添加 loading="lazy"
+- 渲染结果最后经 nh3 按白名单清洗（只保留渲染器会生成的标签与属性），输出可以直接插入页面
+"""
+
+import math
+import re
+from collections import namedtuple
+from urllib.parse import unquote
+
+import nh3
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+
+from app.utils.content import plain_text
+
+# 渲染器版本，渲染规则变化时递增，已保存的渲染结果会在读取时重新生成
+RENDERER_VERSION = 3
+
+# 阅读速度：中日韩文字每分钟字数、其他文字每分钟词数
+CJK_CHARS_PER_MINUTE = 400
+WORDS_PER_MINUTE = 200
+
+Rendered = namedtuple('Rendered', ['html', 'toc', 'word_count', 'reading_minutes'])
+
+_SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+_SAFE_SCHEMES = frozenset({'http', 'https', 'mailto'})
+# 浏览器解析URL时会忽略其中的制表符、换行等控制字符（java\tscript: 仍按 javascript: 执行）
+_URL_CONTROL_RE = re.compile('[\x00-\x1f\x7f]')
+
+# HTML清洗白名单：渲染器生成的标签与属性
+_ALLOWED_TAGS = frozenset({
+    'a', 'blockquote', 'br', 'code', 'em', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'img',
+    'li', 'ol', 'p', 'pre', 's', 'strong', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+})
+_ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'loading'},
+    'code': {'class'},
+    'ol': {'start'},
+    'th': {'style'},
+    'td': {'style'},
+    **{f'h{level}': {'id'} for level in range(1, 7)},
+}
+_SLUG_STRIP_RE = re.compile(r'[^\w\- ]')
+_CJK_RE = re.compile('[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]')
+_WORD_RE = re.compile(r'[A-Za-z0-9]+(?:[\'’-][A-Za-z0-9]+)*')
+
+
+def render_markdown(source):
+    """
+    渲染Markdown正文
+
+    Args:
+        source: Markdown格式的文章正文
+
+    Returns:
+        Rendered: (html, toc, word_count, reading_minutes)，
+        toc 为 [{'level': 标题级别, 'text': 标题文字, 'id': 锚点}]
+    """
+    env = {'toc': [], 'slugs': {}}
+    body = sanitize(_md.render(source or '', env)).rstrip('\n')
+    word_count, minutes = reading_time(source)
+    return Rendered(body, env['toc'], word_count, minutes)
+
+
+def reading_time(source):
+    """
+    统计字数并估算阅读时间（代码块不计入）
+
+    Returns:
+        tuple: (字数, 阅读分钟数)，字数为中日韩文字数加其他文字的词数
+    """
+    text = plain_text(source)
+    cjk = len(_CJK_RE.findall(text))
+    words = len(_WORD_RE.findall(text))
+    minutes = math.ceil(cjk / CJK_CHARS_PER_MINUTE + words / WORDS_PER_MINUTE)
+    return cjk + words, max(1, minutes)
+
+
+def sanitize(html_):
+    """按白名单清洗HTML：只保留渲染器生成的标签与属性，链接只允许 http/https/mailto 与相对地址"""
+    return nh3.clean(
+        html_,
+        tags=_ALLOWED_TAGS,
+        attributes=_ALLOWED_ATTRIBUTES,
+        url_schemes=_SAFE_SCHEMES,
+        link_rel='nofollow noopener',
+        filter_style_properties={'text-align'},
+    )
+
+
+def safe_url(url):
+    """只允许 http/https/mailto 与相对地址，其余（javascript: 等）以及含控制字符的地址返回 None"""
+    url = url.strip(' ')
+    if _URL_CONTROL_RE.search(url):
+        return None
+    match = _SCHEME_RE.match(url)
+    if match and match.group(1).lower() not in _SAFE_SCHEMES:
+        return None
+    return url
+
+
+def _text(tokens):
+    """行内记号的纯文本（标题锚点、图片替代文字）"""
+    parts = []
+    for token in tokens or ():
+        if token.type in ('text', 'code_inline'):
+            parts.append(token.content)
+        elif token.type == 'image':
+            parts.append(_text(token.children))
+        elif token.type in ('softbreak', 'hardbreak'):
+            parts.append(' ')
+    return ''.join(parts)
+
+
+def _slug(text, slugs):
+    base = re.sub(r'\s+', '-', _SLUG_STRIP_RE.sub('', text.lower()).strip()) or 'section'
+    count = slugs.get(base, 0)
+    slugs[base] = count + 1
+    return base if count == 0 else f'{base}-{count}'
+
+
+def _heading_anchors(state):
+    """为标题生成锚点（重复的标题追加序号）并收集目录"""
+    tokens = state.tokens
+    for index, token in enumerate(tokens):
+        if token.type != 'heading_open':
+            continue
+        text = _text(tokens[index + 1].children).strip()
+        anchor = _slug(text, state.env['slugs'])
+        token.attrSet('id', anchor)
+        state.env['toc'].append({'level': int(token.tag[1]), 'text': text, 'id': anchor})
+
+
+def _is_safe(url):
+    # 地址已被百分号编码，按解码后的形式判断（java%09script: 同样拒绝）
+    return safe_url(unquote(url)) is not None
+
+
+def _filter_links(state):
+    """不安全地址的链接只保留文字、图片只保留替代文字；图片延迟加载"""
+    for block in state.tokens:
+        if block.type != 'inline' or not block.children:
+            continue
+        children = []
+        dropping = False
+        for token in block.children:
+            if token.type == 'link_open' and not _is_safe(token.attrGet('href') or ''):
+                dropping = True
+                continue
+            if token.type == 'link_close' and dropping:
+                dropping = False
+                continue
+            if token.type == 'image':
+                if not _is_safe(token.attrGet('src') or ''):
+                    token = Token('text', '', 0, content=_text(token.children))
+                else:
+                    token.attrSet('loading', 'lazy')
+            children.append(token)
+        block.children = children
+
+
+_md = MarkdownIt('commonmark', {'html': False}).enable(['table', 'strikethrough'])
+# 地址的安全检查由 _filter_links 完成，解析阶段接受所有地址，不安全的链接仍保留文字
+_md.validateLink = lambda url: True
+_md.core.ruler.push('heading_anchors', _heading_anchors)
+_md.core.ruler.push('filter_links', _filter_links)
@@ -0,0 +1,293 @@
+"""
+请求性能指标模块
+==================
+为每个请求记录以下指标，按端点（蓝图.视图函数）汇总：
+
+- 请求耗时直方图、请求数（按方法和状态码）
+- 请求期间执行的SQL语句数与SQL总耗时（通过 SQLAlchemy 引擎事件统计）
+- 响应体大小（流式响应不计）
+
+指标通过 /metrics 以 Prometheus 文本格式输出，同时包含各数据库引擎的连接池统计。
+执行时间超过 SLOW_QUERY_MS 的SQL语句记录到 app.slow_query 日志，包含语句、耗时、
+所属端点以及发起查询的应用代码位置，最近的慢查询也可通过管理接口查看。
+
+指标保存在工作进程内，多进程部署时每个进程分别统计。
+
+/metrics 默认不开放：需要配置 METRICS_TOKEN（请求携带 Authorization: Bearer <token>）或
+METRICS_ALLOWED_IPS（允许访问的客户端IP或网段），两者都未配置时返回403。
+"""
+
+import ipaddress
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.utils.engine import pool_stats
+
+logger = logging.getLogger('app.slow_query')
+
+# 直方图分桶
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SQL_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# 应用代码目录，用于定位慢查询的调用位置
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+class Histogram:
+    """累积分桶直方图（非线程安全，由 MetricsRegistry 加锁）"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative(self):
+        """[(上界, 累计次数)]，最后一项为 +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append(('+Inf', self.count))
+        return result
+
+
+class MetricsRegistry:
+    """进程内请求指标"""
+
+    def __init__(self, slow_query_history=50):
+        self._lock = threading.Lock()
+        self.slow_queries = deque(maxlen=slow_query_history)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}  # (端点, 方法, 状态码) -> 次数
+            self.latency = {}  # 端点 -> Histogram
+            self.sql_count = {}
+            self.sql_time = {}
+            self.response_size = {}
+            self.slow_query_total = 0
+            self.slow_queries.clear()
+
+    def observe_request(self, endpoint, method, status, seconds, sql_count, sql_seconds, size):
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            _histogram(self.latency, endpoint, LATENCY_BUCKETS).observe(seconds)
+            _histogram(self.sql_count, endpoint, SQL_COUNT_BUCKETS).observe(sql_count)
+            _histogram(self.sql_time, endpoint, SQL_TIME_BUCKETS).observe(sql_seconds)
+            if size is not None:
+                _histogram(self.response_size, endpoint, SIZE_BUCKETS).observe(size)
+
+    def record_slow_query(self, entry):
+        with self._lock:
+            self.slow_query_total += 1
+            self.slow_queries.append(entry)
+
+    def recent_slow_queries(self):
+        with self._lock:
+            return list(reversed(self.slow_queries))
+
+    def render(self, pools):
+        """
+        输出 Prometheus 文本格式
+
+        Args:
+            pools: {绑定名: pool_stats() 结果}
+        """
+        lines = []
+        with self._lock:
+            lines += _header('blog_http_requests_total', 'counter', '请求数')
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'blog_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+            lines += _render_histograms('blog_http_request_duration_seconds', '请求耗时（秒）', self.latency)
+            lines += _render_histograms('blog_http_request_sql_statements', '每个请求执行的SQL语句数', self.sql_count)
+            lines += _render_histograms('blog_http_request_sql_duration_seconds', '每个请求的SQL总耗时（秒）', self.sql_time)
+            lines += _render_histograms('blog_http_response_size_bytes', '响应体大小（字节）', self.response_size)
+            lines += _header('blog_sql_slow_queries_total', 'counter', '慢查询次数')
+            lines.append(f'blog_sql_slow_queries_total {self.slow_query_total}')
+
+        gauges = {
+            'checked_out': '已借出的连接数',
+            'idle': '空闲连接数',
+            'overflow': '溢出连接数',
+            'checkouts': '获取连接次数',
+            'timeouts': '获取连接超时次数',
+            'wait_avg_ms': '获取连接平均等待时间（毫秒）',
+            'wait_max_ms': '获取连接最大等待时间（毫秒）',
+        }
+        for name, help_text in gauges.items():
+            values = [(bind, stats[name]) for bind, stats in sorted(pools.items()) if name in stats]
+            if not values:
+                continue
+            metric = f'blog_db_pool_{name}'
+            lines += _header(metric, 'gauge', help_text)
+            lines += [f'{metric}{_labels(bind=bind)} {value}' for bind, value in values]
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram(table, endpoint, buckets):
+    histogram = table.get(endpoint)
+    if histogram is None:
+        histogram = table[endpoint] = Histogram(buckets)
+    return histogram
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _header(name, metric_type, help_text):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+
+
+def _render_histograms(name, help_text, histograms):
+    lines = _header(name, 'histogram', help_text)
+    for endpoint, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{_labels(endpoint=endpoint, le=bound)} {count}')
+        lines.append(f'{name}_sum{_labels(endpoint=endpoint)} {round(histogram.sum, 6)}')
+        lines.append(f'{name}_count{_labels(endpoint=endpoint)} {histogram.count}')
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# 请求与SQL计时
+# ---------------------------------------------------------------------------
+
+def _call_site():
+    """发起查询的应用代码位置（跳过 SQLAlchemy 与本模块的栈帧）"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+            return f'{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 同一连接上的语句依次执行，执行失败的语句不会触发 after 事件，由下一条语句覆盖
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _make_after_cursor_execute(app, registry):
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        in_request = has_request_context() and 'metrics_started' in g
+        if in_request:
+            g.metrics_sql_count += 1
+            g.metrics_sql_seconds += elapsed
+
+        threshold_ms = app.config.get('SLOW_QUERY_MS', 200)
+        if threshold_ms and elapsed * 1000 >= threshold_ms:
+            entry = {
+                'duration_ms': round(elapsed * 1000, 3),
+                'statement': statement[:2000],
+                'endpoint': request.endpoint if in_request else None,
+                'call_site': _call_site(),
+                'at': time.time(),
+            }
+            registry.record_slow_query(entry)
+            logger.warning('慢查询 %.1fms endpoint=%s call_site=%s\n%s', entry['duration_ms'],
+                           entry['endpoint'], entry['call_site'], entry['statement'])
+    return _after_cursor_execute
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_sql_seconds = 0.0
+
+
+def _make_finish_request(registry):
+    def _finish_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+        size = None if response.is_streamed else response.calculate_content_length()
+        registry.observe_request(
+            request.endpoint or 'unmatched', request.method, response.status_code,
+            time.perf_counter() - started, g.metrics_sql_count, g.metrics_sql_seconds, size
+        )
+        return response
+    return _finish_request
+
+
+@lru_cache(maxsize=8)
+def _allowed_networks(value):
+    """解析 METRICS_ALLOWED_IPS：逗号分隔的IP或网段"""
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(',') if item.strip())
+
+
+def _ip_allowed(value):
+    if not value or not request.remote_addr:
+        return False
+    try:
+        address = ipaddress.ip_address(request.remote_addr)
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks(value))
+
+
+def metrics_view():
+    """Prometheus 指标接口；需要携带 METRICS_TOKEN 或来自 METRICS_ALLOWED_IPS 中的地址"""
+    token = current_app.config.get('METRICS_TOKEN')
+    allowed_ips = current_app.config.get('METRICS_ALLOWED_IPS')
+    if not (token and request.headers.get('Authorization') == f'Bearer {token}') and not _ip_allowed(allowed_ips):
+        if token:
+            return {'message': '未授权'}, 401
+        return {'message': '指标接口未开放，请配置 METRICS_TOKEN 或 METRICS_ALLOWED_IPS'}, 403
+    from app import db
+    pools = {bind or 'primary': pool_stats(engine) for bind, engine in db.engines.items()}
+    body = get_registry().render(pools)
+    return body, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def get_registry(app=None):
+    return (app or current_app).extensions['metrics']
+
+
+def init_metrics(app, engines):
+    """注册请求钩子、SQL计时事件和 /metrics 接口；METRICS_ENABLED 为假时不做任何事"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    registry = app.extensions['metrics'] = MetricsRegistry()
+    # 请求开始钩子放在最前面、结束钩子最后执行，使计时和响应大小包含其他钩子的处理
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request_funcs.setdefault(None, []).insert(0, _make_finish_request(registry))
+    after_cursor_execute = _make_after_cursor_execute(app, registry)
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,136 @@
+"""
+分页工具模块
+==================
+提供基于 (created_at, id) 的游标（keyset）分页，以及带过期时间的总数缓存
+
+游标模式通过 ?cursor=<游标>&limit=N 开启（首页传空游标 ?cursor=），
+每页只按索引定位到上一页末尾继续读取，不再执行 OFFSET 扫描和 COUNT(*)，
+因此深层页面与第一页的代价相同。需要总数时传 ?with_total=1，总数会被缓存。
+"""
+
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_, select, func
+
+# 游标模式下每页的默认与最大数量
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# 总数缓存：{key: (过期时间戳, 数量)}
+_count_cache = {}
+_count_lock = threading.Lock()
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def cursor_requested():
+    """当前请求是否使用游标分页模式"""
+    return 'cursor' in request.args
+
+
+def encode_cursor(created_at, row_id):
+    """将 (created_at, id) 编码为不透明的游标字符串"""
+    payload = json.dumps({'ts': created_at.isoformat() if created_at else None, 'id': row_id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    解码游标字符串
+
+    Returns:
+        tuple: (created_at, id)，空游标返回 None
+
+    Raises:
+        ValueError: 游标格式错误
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(payload['ts']) if payload['ts'] else None
+        return created_at, int(payload['id'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError('无效的分页游标') from e
+
+
+def cached_count(key, query):
+    """
+    获取查询结果总数，结果按 COUNT_CACHE_TTL 秒缓存
+
+    Args:
+        key: 缓存键，需要唯一标识查询条件
+        query: SQLAlchemy查询对象
+    """
+    ttl = current_app.config.get('COUNT_CACHE_TTL', 60)
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    total = query.order_by(None).count()
+
+    with _count_lock:
+        if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+        _count_cache[key] = (now + ttl, total)
+    return total
+
+
+def clear_count_cache():
+    """清空总数缓存"""
+    with _count_lock:
+        _count_cache.clear()
+
+
+def keyset_paginate(query, model, count_key):
+    """
+    对查询执行游标分页，按 (created_at, id) 倒序
+
+    Args:
+        query: 已添加过滤条件、尚未排序的查询对象
+        model: 查询的模型类，需要包含 id 和 created_at 列
+        count_key: 总数缓存键
+
+    Returns:
+        tuple: (当前页对象列表, 分页元数据字典)
+
+    Raises:
+        ValueError: 游标或 limit 参数错误
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError as e:
+        raise ValueError('limit 必须是整数') from e
+    limit = min(MAX_LIMIT, max(1, limit))
+    cursor = decode_cursor(request.args.get('cursor', ''))
+
+    page_query = query
+    if cursor:
+        cursor_created_at, cursor_id = cursor
+        # 以游标所在行的实际存储值作为比较基准，避免时间格式差异导致的漏行或重复；
+        # 若该行已被删除，则退回到游标中记录的时间
+        anchor = select(model.created_at).where(model.id == cursor_id).scalar_subquery()
+        anchor_created_at = func.coalesce(anchor, cursor_created_at)
+        page_query = page_query.filter(or_(
+            model.created_at < anchor_created_at,
+            and_(model.created_at == anchor_created_at, model.id < cursor_id)
+        ))
+
+    # 多取一条用于判断是否还有下一页
+    rows = page_query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    items = rows[:limit]
+
+    meta = {
+        'limit': limit,
+        'next_cursor': encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > limit else None
+    }
+    if request.args.get('with_total', type=int):
+        meta['total'] = cached_count(count_key, query)
+    return items, meta
@@ -0,0 +1,103 @@
+"""
+查询计划检查模块
+==================
+对SQL语句执行 EXPLAIN，找出全表扫描和额外排序（filesort），用于在测试中防止热点查询的索引失效：
+
+- SQLite：EXPLAIN QUERY PLAN，未使用索引的 "SCAN 表" 为全表扫描，"USE TEMP B-TREE FOR ORDER BY" 为额外排序
+- MySQL：EXPLAIN，type 为 ALL 为全表扫描，Extra 含 "Using filesort" 为额外排序
+
+capture_queries() 记录一段代码（如一次测试客户端请求）执行的SELECT语句及参数，
+find_problems() 逐条执行 EXPLAIN 并返回发现的问题。按索引顺序扫描（SCAN ... USING INDEX）不视为问题。
+"""
+
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import db
+
+# 行数很少、全表扫描可以接受的表
+SMALL_TABLES = frozenset({'tags', 'categories', 'site_counters'})
+
+_SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+_SQLITE_TABLE_RE = re.compile(r'^(?:SCAN|SEARCH) (\w+)')
+_SQLITE_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF |LAST TERM OF )?ORDER BY')
+
+
+@contextmanager
+def capture_queries(engine=None):
+    """记录代码块内执行的SELECT语句，产出 [(语句, 参数)]"""
+    engine = engine or db.engine
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
+
+
+def explain(connection, statement, parameters):
+    """
+    执行 EXPLAIN
+
+    Returns:
+        list: SQLite 为计划步骤的说明文字，MySQL 为 EXPLAIN 结果行（dict）
+    """
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+        return [row[-1] for row in rows]
+    if connection.dialect.name in ('mysql', 'mariadb'):
+        return [dict(row._mapping) for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+    raise NotImplementedError(f'不支持分析 {connection.dialect.name} 的查询计划')
+
+
+def plan_problems(dialect_name, plan, tables, small_tables=SMALL_TABLES):
+    """从查询计划中找出全表扫描与额外排序"""
+    problems = []
+    if dialect_name == 'sqlite':
+        # SQLite 的排序步骤不标明表，语句涉及的表都是小表时忽略排序
+        touched = {match.group(1) for match in map(_SQLITE_TABLE_RE.match, plan) if match}
+        for step in plan:
+            match = _SQLITE_SCAN_RE.match(step)
+            # 子查询结果（anon_1 等）不是数据表
+            if match and match.group(1) in tables and match.group(1) not in small_tables:
+                problems.append(f'全表扫描 {match.group(1)}')
+            if _SQLITE_SORT_RE.search(step) and (touched & tables) - small_tables:
+                problems.append('额外排序')
+        return problems
+    for step in plan:
+        table = step.get('table')
+        if table in small_tables:
+            continue
+        if step.get('type') == 'ALL' and table in tables:
+            problems.append(f'全表扫描 {table}')
+        if 'Using filesort' in (step.get('Extra') or ''):
+            problems.append('额外排序')
+    return problems
+
+
+def find_problems(statements, small_tables=SMALL_TABLES):
+    """
+    分析语句的查询计划
+
+    Args:
+        statements: capture_queries() 记录的 [(语句, 参数)]
+
+    Returns:
+        list: [(语句, 问题列表, 查询计划)]，只包含存在问题的语句
+    """
+    tables = set(db.metadata.tables)
+    results = []
+    with db.engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = explain(connection, statement, parameters)
+            problems = plan_problems(connection.dialect.name, plan, tables, small_tables)
+            if problems:
+                results.append((statement, problems, plan))
+    return results
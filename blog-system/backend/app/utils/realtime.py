@@ -0,0 +1,251 @@
+"""
+实时推送模块
+==================
+基于发布/订阅的 Server-Sent Events（SSE）推送，用于在文章页实时显示新评论：
+
+- 写接口提交事务后调用 publish()，事件在发布时格式化为一帧SSE文本，
+  之后原样写给每个订阅者，因此无论多少读者，每次写入只序列化、发布一次
+- 订阅者各自持有一个有界队列；读者消费过慢导致队列已满时，向其发送 resync 事件并结束连接，
+  客户端重新拉取列表后再订阅，不会因个别慢读者阻塞发布方
+- 后端 local：进程内分发，只有同一进程的订阅者能收到事件（单进程或开发环境）
+- 后端 redis：事件经Redis频道广播，每个工作进程用一个后台线程订阅并分发给本进程的订阅者，
+  多进程部署时所有读者都能收到事件（线程在首次订阅时启动，fork出的工作进程各自启动）
+
+每个SSE连接在连接期间占用一个工作线程，因此每进程的连接数受 SSE_MAX_CONNECTIONS 限制，
+超出时返回503，客户端退回到定时拉取。
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Redis订阅线程断线后的重连间隔（秒）
+REDIS_RECONNECT_SECONDS = 1
+
+
+def comments_channel(article_id):
+    """文章评论事件的频道名"""
+    return f'article:{article_id}:comments'
+
+
+def format_event(event, data, event_id=None):
+    """
+    生成一帧SSE文本
+
+    Args:
+        event: 事件名
+        data: 已序列化的JSON字符串
+        event_id: 事件ID，客户端重连时通过 Last-Event-ID 请求头带回
+    """
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """一个订阅者：有界队列与溢出标记"""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, frame):
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """等待下一帧，超时返回 None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """取消订阅，可重复调用"""
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """进程内发布/订阅"""
+
+    name = 'local'
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    @property
+    def subscribers(self):
+        """当前进程的订阅者数"""
+        return self._count
+
+    def subscribe(self, channel):
+        return self.try_subscribe(channel)
+
+    def try_subscribe(self, channel, limit=None):
+        """
+        订阅频道；当前进程的订阅者数已达到 limit 时返回 None
+
+        检查与计数在同一把锁内完成，并发的连接不会同时通过检查而超出上限
+        """
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            if limit is not None and self._count >= limit:
+                return None
+            self._channels[channel].add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._channels[subscription.channel]
+
+    def publish(self, channel, frame):
+        self._deliver(channel, frame)
+
+    def _deliver(self, channel, frame):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(frame)
+
+
+class RedisBroker(LocalBroker):
+    """经Redis频道在多个工作进程之间广播，进程内仍按频道分发给本地订阅者"""
+
+    name = 'redis'
+
+    def __init__(self, url=None, queue_size=100, prefix='blog:events:', client=None):
+        super().__init__(queue_size)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError('使用Redis推送后端需要安装 redis 包') from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    def try_subscribe(self, channel, limit=None):
+        self._ensure_listener()
+        return super().try_subscribe(channel, limit)
+
+    def publish(self, channel, frame):
+        self.client.publish(self.prefix + channel, frame)
+
+    def _ensure_listener(self):
+        """在当前进程中启动订阅线程（预加载应用时主进程的线程不会带到工作进程）"""
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            threading.Thread(target=self._listen, name='realtime-redis', daemon=True).start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.prefix + '*')
+                for message in pubsub.listen():
+                    channel = message['channel']
+                    data = message['data']
+                    channel = channel.decode() if isinstance(channel, bytes) else channel
+                    data = data.decode() if isinstance(data, bytes) else data
+                    self._deliver(channel[len(self.prefix):], data)
+            except Exception:
+                logger.exception('Redis推送订阅中断，稍后重连')
+                time.sleep(REDIS_RECONNECT_SECONDS)
+
+
+def init_realtime(app):
+    """根据配置创建推送后端"""
+    backend = app.config.get('REALTIME_BACKEND', 'local')
+    queue_size = app.config.get('SSE_QUEUE_SIZE', 100)
+    if backend == 'local':
+        broker = LocalBroker(queue_size)
+    elif backend == 'redis':
+        broker = RedisBroker(app.config.get('REALTIME_REDIS_URL'), queue_size)
+    else:
+        raise ValueError(f'未知的推送后端: {backend}')
+    app.extensions['realtime'] = broker
+
+
+def broker():
+    return current_app.extensions['realtime']
+
+
+def publish(channel, event, data, event_id=None):
+    """
+    发布事件，需在写入事务提交之后调用；发布失败只记录日志，不影响写接口
+
+    Args:
+        channel: 频道名
+        event: 事件名
+        data: 可JSON序列化的数据（使用应用的JSON提供器）
+        event_id: 事件ID
+    """
+    try:
+        broker().publish(channel, format_event(event, current_app.json.dumps(data), event_id))
+    except Exception:
+        logger.exception('发布实时事件失败', extra={'channel': channel, 'event': event})
+
+
+def publish_comment_created(comment):
+    """发布新评论事件，事件ID为评论ID"""
+    from app.serializers import comments as comment_serializer
+    publish(comments_channel(comment.article_id), 'comment', comment_serializer.dump(comment), comment.id)
+
+
+def publish_comment_deleted(article_id, comment_id):
+    """发布评论删除事件"""
+    publish(comments_channel(article_id), 'comment_deleted', {'id': comment_id})
+
+
+def stream(subscription, initial=(), heartbeat=15, max_duration=300, retry_ms=3000):
+    """
+    生成SSE响应体
+
+    Args:
+        subscription: 已建立的订阅，生成器结束（包括客户端断开）时取消订阅
+        initial: 订阅后先发送的帧（如断线期间错过的事件）
+        heartbeat: 没有事件时发送注释行的间隔（秒），用于保持连接并及时发现客户端断开
+        max_duration: 连接的最长时间（秒），到时结束，客户端按 retry 间隔自动重连
+        retry_ms: 建议客户端重连的间隔（毫秒）
+    """
+    try:
+        yield f'retry: {retry_ms}\n\n'
+        yield from initial
+        deadline = time.monotonic() + max_duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            frame = subscription.get(timeout=min(heartbeat, remaining))
+            if subscription.overflowed:
+                yield format_event('resync', '{}')
+                break
+            yield frame if frame is not None else ': keep-alive\n\n'
+    finally:
+        subscription.close()
@@ -0,0 +1,151 @@
+"""
+正文渲染缓存模块
+==================
+文章正文由 app.utils.markdown 渲染为HTML、目录与阅读时间，结果保存在 rendered_contents 表中，
+以正文的SHA-256（articles.content_hash）为键，每个正文版本只渲染一次：
+
+- 文章创建或正文变化时，映射器事件在同一事务内更新 content_hash 并加入渲染任务（app.utils.jobs），
+  由后台工作线程在提交后渲染，写接口不再等待渲染；只修改标题、状态等字段不会重新渲染，
+  正文相同的文章共享一条渲染结果
+- 正文变化或文章删除后，不再被任何文章引用的渲染结果随之删除
+- 读取时缺少渲染结果（渲染任务尚未执行、绕过ORM写入的数据）或渲染器版本已更新，则当场渲染并写回主库
+"""
+
+import hashlib
+import json
+
+from sqlalchemy import delete, event, exists, insert, select, update
+from sqlalchemy.orm.attributes import get_history
+
+from app import db
+from app.utils import jobs
+from app.utils.markdown import RENDERER_VERSION, render_markdown
+
+# 渲染任务名称
+RENDER_JOB = 'render_content'
+
+_events_registered = False
+
+
+def content_hash(content):
+    """计算正文的SHA-256"""
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+def _values(rendered):
+    return {
+        'renderer_version': RENDERER_VERSION,
+        'html': rendered.html,
+        'toc': json.dumps(rendered.toc, ensure_ascii=False),
+        'word_count': rendered.word_count,
+        'reading_minutes': rendered.reading_minutes,
+    }
+
+
+def _save(connection, digest, rendered, existing):
+    """写入渲染结果，existing 表示已有旧版本渲染器生成的记录"""
+    from app.models import RenderedContent
+    table = RenderedContent.__table__
+    if existing:
+        connection.execute(update(table).where(table.c.content_hash == digest).values(**_values(rendered)))
+    else:
+        # 并发写入相同正文时忽略主键冲突
+        connection.execute(
+            insert(table).prefix_with('OR IGNORE', dialect='sqlite').prefix_with('IGNORE', dialect='mysql'),
+            {'content_hash': digest, **_values(rendered)}
+        )
+
+
+def store(connection, digest, content):
+    """确保正文的渲染结果存在且由当前版本的渲染器生成，已存在时不重新渲染"""
+    from app.models import RenderedContent
+    table = RenderedContent.__table__
+    version = connection.execute(
+        select(table.c.renderer_version).where(table.c.content_hash == digest)
+    ).scalar()
+    if version != RENDERER_VERSION:
+        _save(connection, digest, render_markdown(content), existing=version is not None)
+
+
+def enqueue_contents(contents, connection=None):
+    """为每个不同的正文加入渲染任务，在当前事务中执行（也用于绕过ORM的批量写入）"""
+    for digest in {content_hash(content) for content in contents}:
+        jobs.enqueue(RENDER_JOB, {'content_hash': digest}, connection)
+
+
+@jobs.handler(RENDER_JOB)
+def render_job(content_hash):
+    """渲染任务：正文在入队后又被修改或文章已删除时不再渲染"""
+    from app.models import Article
+    content = db.session.execute(
+        select(Article.content).where(Article.content_hash == content_hash).limit(1)
+    ).scalar()
+    if content is not None:
+        store(db.session.connection(), content_hash, content)
+
+
+def drop_unused(connection, digests):
+    """删除不再被任何文章引用的渲染结果"""
+    from app.models import Article, RenderedContent
+    table = RenderedContent.__table__
+    digests = {digest for digest in digests if digest}
+    if digests:
+        connection.execute(delete(table).where(
+            table.c.content_hash.in_(digests),
+            ~exists().where(Article.__table__.c.content_hash == table.c.content_hash)
+        ))
+
+
+def rendered_content(article):
+    """
+    获取文章正文的渲染结果
+
+    Returns:
+        dict: html、toc、word_count、reading_minutes
+    """
+    from app.models import RenderedContent
+    digest = article.content_hash or content_hash(article.content)
+    row = db.session.get(RenderedContent, digest)
+    if row is not None and row.renderer_version == RENDERER_VERSION:
+        return {
+            'html': row.html,
+            'toc': json.loads(row.toc),
+            'word_count': row.word_count,
+            'reading_minutes': row.reading_minutes,
+        }
+    rendered = render_markdown(article.content)
+    # 读接口可能路由到只读库，在主库的独立事务中写回
+    with db.engine.begin() as connection:
+        _save(connection, digest, rendered, existing=row is not None)
+    return rendered._asdict()
+
+
+def _before_write(mapper, connection, target):
+    if target.content_hash is None or get_history(target, 'content').has_changes():
+        target.content_hash = content_hash(target.content)
+
+
+def _after_write(mapper, connection, target):
+    history = get_history(target, 'content_hash')
+    if history.added:
+        jobs.enqueue(RENDER_JOB, {'content_hash': target.content_hash}, connection)
+    if history.deleted:
+        drop_unused(connection, history.deleted)
+
+
+def _after_delete(mapper, connection, target):
+    drop_unused(connection, [target.content_hash])
+
+
+def init_rendering(app):
+    """注册维护渲染结果的映射器事件"""
+    global _events_registered
+    from app.models import Article
+
+    if not _events_registered:
+        event.listen(Article, 'before_insert', _before_write)
+        event.listen(Article, 'before_update', _before_write)
+        event.listen(Article, 'after_insert', _after_write)
+        event.listen(Article, 'after_update', _after_write)
+        event.listen(Article, 'after_delete', _after_delete)
+        _events_registered = True
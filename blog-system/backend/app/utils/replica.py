@@ -0,0 +1,102 @@
+"""
+读写分离模块
+==================
+配置 DATABASE_READ_URL 后，使用 @replica_read 装饰的只读接口在请求期间把查询路由到只读库，
+其余接口和所有写入（flush）仍使用主库。未配置只读库时装饰器不产生任何影响。
+
+读己之写：用户（按JWT身份，未登录时按IP）成功执行写请求后，
+READ_YOUR_WRITES_SECONDS 秒内的读请求仍走主库，避免读到复制延迟前的旧数据。
+该时间窗口内只读库产生的响应不写入响应缓存，防止把旧数据缓存到写入方的失效之后。
+固定记录保存在 cache.state 中（使用 redis 缓存后端时对所有工作进程生效），
+不放在响应缓存的LRU中，不会因缓存条目淘汰而提前失效。
+"""
+
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+
+# 只读库在 SQLALCHEMY_BINDS 中的键名
+REPLICA_BIND_KEY = 'replica'
+
+# 最近一次写请求的全局记录键
+_LAST_WRITE_KEY = '__last_write__'
+
+class RoutingSession(Session):
+    """只读请求中把非flush查询路由到只读库的会话"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get('db_use_replica'):
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_enabled():
+    return REPLICA_BIND_KEY in (current_app.config.get('SQLALCHEMY_BINDS') or {})
+
+
+# ---------------------------------------------------------------------------
+# 读己之写记录
+# ---------------------------------------------------------------------------
+
+def _pin_key(name):
+    return f'db_pin:{name}'
+
+
+def _set_pin(name, seconds):
+    from app import cache
+    cache.state.set(_pin_key(name), time.time() + seconds, seconds)
+
+
+def _has_pin(name):
+    from app import cache
+    expires_at = cache.state.get(_pin_key(name))
+    return expires_at is not None and expires_at > time.time()
+
+
+def _client_key():
+    """请求方标识：已登录用户为JWT身份，否则为客户端IP"""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:  # 令牌无效或过期时按匿名请求处理
+        identity = None
+    return f'user:{identity}' if identity is not None else f'ip:{request.remote_addr}'
+
+
+def _record_write(response):
+    """写请求成功后固定请求方到主库"""
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or response.status_code >= 400:
+        return response
+    seconds = current_app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+    if seconds > 0:
+        _set_pin(_client_key(), seconds)
+        _set_pin(_LAST_WRITE_KEY, seconds)
+    return response
+
+
+def replica_read(view):
+    """
+    只读接口装饰器：请求期间的查询使用只读库
+
+    请求方处于读己之写窗口内时仍使用主库
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # 显式赋值：同一应用上下文中处理多个请求时（如测试客户端）不沿用上一个请求的选择
+        g.db_use_replica = replica_enabled() and not _has_pin(_client_key())
+        if g.db_use_replica and _has_pin(_LAST_WRITE_KEY):
+            # 只读库可能尚未同步最近的写入，本次响应不写入缓存
+            g.skip_response_cache = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_replica(app):
+    """注册写请求记录钩子"""
+    if REPLICA_BIND_KEY in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        app.after_request(_record_write)
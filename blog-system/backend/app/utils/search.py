@@ -0,0 +1,245 @@
+"""
+文章全文检索模块
+==================
+根据数据库类型选择检索实现：
+
+- SQLite：使用 FTS5 虚拟表 articles_fts（rowid 即文章ID）。unicode61 分词器会把连续的
+  中日韩文字当作一个词，因此写入索引前在每个CJK字符两侧插入空格，查询时把检索词
+  转换为相邻字符的短语查询，从而支持任意长度的中文检索
+- MySQL：在 articles(title, content) 上建立 ngram 解析器的 FULLTEXT 索引，由数据库自动维护
+- 其他数据库：退化为 LIKE 查询
+
+SQLite 索引通过 Article 的映射器事件在同一事务内同步，文章创建、更新和删除后立即生效。
+"""
+
+import html
+import re
+
+from flask import current_app
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm.attributes import get_history
+
+from app import db
+from app.utils.content import plain_text
+
+# 中日韩文字范围
+_CJK_RANGES = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_CJK_RUN_RE = re.compile(f'[{_CJK_RANGES}]+')
+# 检索词中允许的字符（其余字符视为分隔符，避免注入FTS查询语法）
+_TERM_SPLIT_RE = re.compile(rf'[^\w{_CJK_RANGES}]+')
+
+# 检索词数量上限
+MAX_TERMS = 8
+# 摘要片段在命中位置前后保留的字符数
+SNIPPET_BEFORE = 30
+SNIPPET_AFTER = 90
+
+_events_registered = False
+
+
+def segment(value):
+    """在每个CJK字符两侧插入空格，使 unicode61 分词器按字切分"""
+    # 按连续的CJK片段替换，比逐字符展开替换模板快数倍（索引长文章时是主要开销）
+    return _CJK_RUN_RE.sub(lambda match: ' ' + ' '.join(match.group()) + ' ', value or '')
+
+
+def parse_terms(query):
+    """将用户输入拆分为检索词列表"""
+    terms = [term for term in _TERM_SPLIT_RE.split(query or '') if term]
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def _fts5_query(terms):
+    """构造FTS5查询：每个检索词是一个短语，多个检索词之间为AND关系"""
+    phrases = []
+    for term in terms:
+        tokens = segment(term).split()
+        phrases.append('"' + ' '.join(tokens) + '"')
+    return ' AND '.join(phrases)
+
+
+def _mysql_query(terms):
+    """构造MySQL布尔模式查询：每个检索词都必须出现"""
+    return ' '.join(f'+"{term}"' for term in terms)
+
+
+def backend_name():
+    """当前应用使用的检索实现"""
+    return current_app.extensions.get('search_backend', 'like')
+
+
+# ---------------------------------------------------------------------------
+# 索引维护
+# ---------------------------------------------------------------------------
+
+def _index_row(connection, article_id, title, content):
+    connection.execute(
+        text('INSERT OR REPLACE INTO articles_fts (rowid, title, body) VALUES (:id, :title, :body)'),
+        {'id': article_id, 'title': segment(title), 'body': segment(content)}
+    )
+
+
+def _after_insert(mapper, connection, target):
+    if backend_name() == 'fts5':
+        _index_row(connection, target.id, target.title, target.content)
+
+
+def _after_update(mapper, connection, target):
+    if backend_name() != 'fts5':
+        return
+    if get_history(target, 'title').has_changes() or get_history(target, 'content').has_changes():
+        _index_row(connection, target.id, target.title, target.content)
+
+
+def _after_delete(mapper, connection, target):
+    if backend_name() == 'fts5':
+        connection.execute(text('DELETE FROM articles_fts WHERE rowid = :id'), {'id': target.id})
+
+
+def remove_from_index(article_ids):
+    """从索引中移除文章（用于绕过ORM的批量删除），在当前会话的事务中执行"""
+    if article_ids and backend_name() == 'fts5':
+        for article_id in article_ids:
+            db.session.execute(text('DELETE FROM articles_fts WHERE rowid = :id'), {'id': article_id})
+
+
+def index_articles(article_ids):
+    """将指定文章写入索引（用于绕过ORM的批量写入），在当前会话的事务中执行"""
+    if not article_ids or backend_name() != 'fts5':
+        return
+    from app.models import Article
+    rows = db.session.execute(
+        db.select(Article.id, Article.title, Article.content).where(Article.id.in_(article_ids))
+    ).all()
+    connection = db.session.connection()
+    for article_id, title, content in rows:
+        _index_row(connection, article_id, title, content)
+
+
+def rebuild_index():
+    """重新构建SQLite全文索引"""
+    if backend_name() != 'fts5':
+        return
+    from app.models import Article
+    connection = db.session.connection()
+    connection.execute(text('DELETE FROM articles_fts'))
+    result = db.session.execute(db.select(Article.id, Article.title, Article.content)).yield_per(500)
+    for article_id, title, content in result:
+        _index_row(connection, article_id, title, content)
+    db.session.commit()
+
+
+def init_search(app):
+    """
+    创建检索所需的索引结构并注册同步事件，需要在应用上下文中调用
+
+    SQLite 首次创建 FTS5 表时会为已有文章建立索引
+    """
+    global _events_registered
+    from app.models import Article
+
+    dialect = db.engine.dialect.name
+    backend = 'like'
+    needs_rebuild = False
+    if dialect == 'sqlite':
+        existing = inspect(db.engine).get_table_names()
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                    "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+                ))
+            backend = 'fts5'
+        except Exception as e:  # SQLite未编译FTS5扩展
+            app.logger.warning(f'SQLite不支持FTS5，文章检索退化为LIKE查询: {e}')
+        needs_rebuild = backend == 'fts5' and 'articles_fts' not in existing
+    elif dialect == 'mysql':
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('articles')}
+        if 'ft_articles_title_content' not in indexes:
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    'CREATE FULLTEXT INDEX ft_articles_title_content ON articles (title, content) WITH PARSER ngram'
+                ))
+        backend = 'mysql'
+    app.extensions['search_backend'] = backend
+    if needs_rebuild:
+        rebuild_index()
+
+    if not _events_registered:
+        event.listen(Article, 'after_insert', _after_insert)
+        event.listen(Article, 'after_update', _after_update)
+        event.listen(Article, 'after_delete', _after_delete)
+        _events_registered = True
+
+
+# ---------------------------------------------------------------------------
+# 检索
+# ---------------------------------------------------------------------------
+
+def search_articles(query, limit, offset=0):
+    """
+    检索已发布文章
+
+    Args:
+        query: 用户输入的检索词
+        limit: 返回数量
+        offset: 跳过数量
+
+    Returns:
+        tuple: ([(文章ID, 相关度得分)], 检索词列表)，按相关度从高到低排列
+    """
+    from app.models import Article, ArticleStatus
+
+    terms = parse_terms(query)
+    if not terms:
+        return [], terms
+
+    backend = backend_name()
+    params = {'limit': limit, 'offset': offset, 'status': ArticleStatus.published.name}
+    if backend == 'fts5':
+        # bm25 得分越小越相关，标题的权重高于正文
+        sql = text(
+            'SELECT a.id, -bm25(articles_fts, 10.0, 1.0) AS score '
+            'FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid '
+            'WHERE articles_fts MATCH :match AND a.status = :status '
+            'ORDER BY bm25(articles_fts, 10.0, 1.0) LIMIT :limit OFFSET :offset'
+        )
+        params['match'] = _fts5_query(terms)
+    elif backend == 'mysql':
+        sql = text(
+            'SELECT id, MATCH(title, content) AGAINST (:match IN BOOLEAN MODE) AS score '
+            'FROM articles WHERE status = :status AND MATCH(title, content) AGAINST (:match IN BOOLEAN MODE) '
+            'ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset'
+        )
+        params['match'] = _mysql_query(terms)
+    else:
+        conditions = []
+        for index, term in enumerate(terms):
+            params[f'term{index}'] = f'%{term}%'
+            conditions.append(f'(title LIKE :term{index} OR content LIKE :term{index})')
+        sql = text(
+            'SELECT id, 0 AS score FROM articles WHERE status = :status AND ' + ' AND '.join(conditions) +
+            ' ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset'
+        )
+
+    rows = db.session.execute(sql, params).all()
+    return [(row[0], float(row[1] or 0)) for row in rows], terms
+
+
+def make_snippet(content, terms):
+    """
+    从正文中截取包含检索词的片段，命中部分用 <mark> 标记
+
+    正文先经 plain_text 去除Markdown标记（与文章摘要相同），片段中的其余内容已做HTML转义，可直接渲染
+    """
+    plain = plain_text(content)
+    lowered = plain.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    start = max(0, min(positions) - SNIPPET_BEFORE) if positions else 0
+    end = min(len(plain), start + SNIPPET_BEFORE + SNIPPET_AFTER)
+    fragment = html.escape(plain[start:end])
+    # 较长的检索词优先匹配，一次替换避免标记嵌套
+    pattern = '|'.join(re.escape(html.escape(term)) for term in sorted(terms, key=len, reverse=True))
+    fragment = re.sub(pattern, lambda match: f'<mark>{match.group(0)}</mark>', fragment, flags=re.I)
+    return ('...' if start > 0 else '') + fragment + ('...' if end < len(plain) else '')
@@ -0,0 +1,180 @@
+"""
+站点统计模块
+==================
+用户数、文章数、评论数等统计值保存在 site_counters 表中，管理后台读取统计时
+只需一次主键查询，不再对各表执行 COUNT(*)。
+
+计数通过 User / Article / Comment 的映射器事件在 flush 时以 UPDATE value = value ± 1
+的方式更新，与业务写入处于同一事务，回滚时计数一并回滚。
+绕过ORM的批量删除需要调用 apply_deltas() 显式更新计数。
+reconcile() 从数据表重新统计全部计数，报告并修正偏差。
+"""
+
+from collections import Counter
+
+from sqlalchemy import event, func
+from sqlalchemy.orm.attributes import get_history
+
+from app import db
+
+# 计数器名称
+USERS = 'total_users'
+ARTICLES = 'total_articles'
+PUBLISHED_ARTICLES = 'published_articles'
+DRAFT_ARTICLES = 'draft_articles'
+COMMENTS = 'total_comments'
+COUNTER_NAMES = (USERS, ARTICLES, PUBLISHED_ARTICLES, DRAFT_ARTICLES, COMMENTS)
+
+_events_registered = False
+
+
+def _status_counter(status):
+    """文章状态对应的计数器名称"""
+    from app.models import ArticleStatus
+    return {ArticleStatus.published: PUBLISHED_ARTICLES, ArticleStatus.draft: DRAFT_ARTICLES}.get(status)
+
+
+def _execute_deltas(connection, deltas):
+    from app.models import SiteCounter
+    table = SiteCounter.__table__
+    for name, delta in deltas.items():
+        if name and delta:
+            connection.execute(
+                table.update().where(table.c.name == name).values(value=table.c.value + delta)
+            )
+
+
+def apply_deltas(deltas):
+    """
+    在当前会话的事务中更新计数（用于绕过ORM的批量写入）
+
+    Args:
+        deltas: {计数器名称: 增量}
+    """
+    _execute_deltas(db.session.connection(), deltas)
+
+
+def article_deltas(statuses, sign=1):
+    """根据文章状态列表生成计数增量，sign 为 -1 时表示删除"""
+    deltas = Counter()
+    for status in statuses:
+        deltas[ARTICLES] += sign
+        deltas[_status_counter(status)] += sign
+    return deltas
+
+
+# ---------------------------------------------------------------------------
+# 映射器事件
+# ---------------------------------------------------------------------------
+
+def _user_inserted(mapper, connection, target):
+    _execute_deltas(connection, {USERS: 1})
+
+
+def _user_deleted(mapper, connection, target):
+    _execute_deltas(connection, {USERS: -1})
+
+
+def _article_inserted(mapper, connection, target):
+    _execute_deltas(connection, article_deltas([target.status]))
+
+
+def _article_updated(mapper, connection, target):
+    history = get_history(target, 'status')
+    if history.has_changes() and history.deleted:
+        _execute_deltas(connection, {
+            _status_counter(history.deleted[0]): -1,
+            _status_counter(target.status): 1
+        })
+
+
+def _article_deleted(mapper, connection, target):
+    _execute_deltas(connection, article_deltas([target.status], sign=-1))
+
+
+def _comment_inserted(mapper, connection, target):
+    _execute_deltas(connection, {COMMENTS: 1})
+
+
+def _comment_deleted(mapper, connection, target):
+    _execute_deltas(connection, {COMMENTS: -1})
+
+
+# ---------------------------------------------------------------------------
+# 读取与校准
+# ---------------------------------------------------------------------------
+
+def _actual_counts():
+    """从数据表重新统计全部计数"""
+    from app.models import User, Article, Comment
+    counts = dict.fromkeys(COUNTER_NAMES, 0)
+    counts[USERS] = db.session.query(func.count(User.id)).scalar()
+    counts[COMMENTS] = db.session.query(func.count(Comment.id)).scalar()
+    for status, count in db.session.query(Article.status, func.count(Article.id)).group_by(Article.status):
+        counts[ARTICLES] += count
+        if _status_counter(status):
+            counts[_status_counter(status)] += count
+    return counts
+
+
+def get_counters():
+    """读取全部计数"""
+    from app.models import SiteCounter
+    counters = dict.fromkeys(COUNTER_NAMES, 0)
+    counters.update(db.session.query(SiteCounter.name, SiteCounter.value).all())
+    return counters
+
+
+def reconcile():
+    """
+    重新统计全部计数并修正存储值
+
+    Returns:
+        dict: 存在偏差的计数 {名称: {'stored': 存储值, 'actual': 实际值, 'drift': 偏差}}
+    """
+    from app.models import SiteCounter
+    actual = _actual_counts()
+    stored = {counter.name: counter for counter in
+              SiteCounter.query.filter(SiteCounter.name.in_(COUNTER_NAMES)).with_for_update()}
+    drift = {}
+    for name, value in actual.items():
+        counter = stored.get(name)
+        if counter is None:
+            counter = SiteCounter(name=name, value=0)
+            db.session.add(counter)
+        if counter.value != value:
+            drift[name] = {'stored': counter.value, 'actual': value, 'drift': counter.value - value}
+            counter.value = value
+    db.session.commit()
+    return drift
+
+
+def init_stats(app):
+    """
+    注册计数维护事件，并在计数器缺失时（新库或旧库首次升级）初始化计数，
+    需要在应用上下文中调用
+    """
+    global _events_registered
+    from app.models import User, Article, Comment, SiteCounter
+
+    if SiteCounter.query.count() < len(COUNTER_NAMES):
+        reconcile()
+
+    if not _events_registered:
+        event.listen(User, 'after_insert', _user_inserted)
+        event.listen(User, 'after_delete', _user_deleted)
+        event.listen(Article, 'after_insert', _article_inserted)
+        event.listen(Article, 'after_update', _article_updated)
+        event.listen(Article, 'after_delete', _article_deleted)
+        event.listen(Comment, 'after_insert', _comment_inserted)
+        event.listen(Comment, 'after_delete', _comment_deleted)
+        _events_registered = True
+
+    @app.cli.command('reconcile-stats')
+    def reconcile_stats_command():
+        """重新统计站点计数并输出偏差"""
+        drift = reconcile()
+        if not drift:
+            print('站点计数无偏差')
+        for name, item in drift.items():
+            print(f"{name}: 存储值 {item['stored']}，实际值 {item['actual']}，偏差 {item['drift']:+d}")
@@ -0,0 +1,151 @@
+"""
+标签与分类工具模块
+==================
+负责标签的规范化与创建，以及标签/分类已发布文章数的维护。
+
+计数只统计已发布文章。写文章前后分别调用 snapshot() 记录文章的
+(是否发布, 分类, 标签集合)，再调用 apply_counter_delta() 在同一事务中更新计数，
+因此发布、撤回、改分类、改标签和删除都只需要常数次UPDATE。
+"""
+
+from collections import Counter, namedtuple
+
+from sqlalchemy import func
+
+from app import db
+from app.models import Article, ArticleStatus, Category, Tag, article_tags
+
+# 单篇文章最多的标签数与标签名最大长度
+MAX_TAGS_PER_ARTICLE = 20
+MAX_NAME_LENGTH = 50
+
+# 文章在计数意义上的状态
+TermSnapshot = namedtuple('TermSnapshot', ['published', 'category', 'tags'])
+EMPTY_SNAPSHOT = TermSnapshot(False, None, frozenset())
+
+
+def normalize_tag_names(raw):
+    """
+    规范化客户端提交的标签列表
+
+    Returns:
+        list: 去除首尾空白、去重后的标签名（保持原有顺序）
+
+    Raises:
+        ValueError: 标签不是字符串列表、数量或长度超出限制
+    """
+    if raw is None:
+        return []
+    if not isinstance(raw, list) or not all(isinstance(name, str) for name in raw):
+        raise ValueError('标签必须是字符串列表')
+    names = list(dict.fromkeys(name.strip() for name in raw if name.strip()))
+    if len(names) > MAX_TAGS_PER_ARTICLE:
+        raise ValueError(f'每篇文章最多{MAX_TAGS_PER_ARTICLE}个标签')
+    if any(len(name) > MAX_NAME_LENGTH for name in names):
+        raise ValueError(f'标签长度不能超过{MAX_NAME_LENGTH}个字符')
+    return names
+
+
+def get_or_create_tags(names):
+    """批量获取标签对象，不存在的标签会被创建（一次IN查询）"""
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names)).all()}
+    tags = []
+    for name in names:
+        tag = existing.get(name)
+        if tag is None:
+            tag = Tag(name=name, article_count=0)
+            db.session.add(tag)
+            existing[name] = tag
+        tags.append(tag)
+    return tags
+
+
+def snapshot(article):
+    """记录文章当前对计数有影响的状态"""
+    return TermSnapshot(
+        article.status == ArticleStatus.published,
+        article.category or None,
+        frozenset(tag.name for tag in article.tags)
+    )
+
+
+def _contributions(state):
+    """文章状态对计数的贡献：(分类集合, 标签集合)，未发布文章不计数"""
+    if not state.published:
+        return set(), set()
+    return ({state.category} if state.category else set()), set(state.tags)
+
+
+def _bump(model, names, delta):
+    if not names:
+        return
+    if delta > 0:
+        # 分类行按需创建；标签行已由 get_or_create_tags 创建
+        existing = {name for (name,) in db.session.query(model.name).filter(model.name.in_(names))}
+        for name in set(names) - existing:
+            db.session.add(model(name=name, article_count=0))
+        db.session.flush()
+    db.session.execute(
+        db.update(model).where(model.name.in_(names)).values(article_count=model.article_count + delta)
+    )
+
+
+def apply_counter_delta(before, after):
+    """根据文章写入前后的状态更新标签与分类计数，需在提交前调用"""
+    before_categories, before_tags = _contributions(before)
+    after_categories, after_tags = _contributions(after)
+    db.session.flush()
+    _bump(Category, after_categories - before_categories, 1)
+    _bump(Category, before_categories - after_categories, -1)
+    _bump(Tag, after_tags - before_tags, 1)
+    _bump(Tag, before_tags - after_tags, -1)
+
+
+def apply_bulk_delta(snapshots, sign=1):
+    """
+    批量写入（绕过ORM）后更新标签与分类计数，需在提交前调用
+
+    多篇文章的贡献先按名称汇总，再按增量分组执行UPDATE，语句数与文章数无关
+
+    Args:
+        snapshots: 新增（sign=1）或删除（sign=-1）文章的 TermSnapshot 列表
+    """
+    category_counts, tag_counts = Counter(), Counter()
+    for state in snapshots:
+        categories, tags = _contributions(state)
+        category_counts.update(categories)
+        tag_counts.update(tags)
+    for model, counts in ((Category, category_counts), (Tag, tag_counts)):
+        by_delta = {}
+        for name, count in counts.items():
+            by_delta.setdefault(count, []).append(name)
+        for count, names in by_delta.items():
+            _bump(model, names, count * sign)
+
+
+def recount():
+    """按文章数据重新计算全部标签与分类计数（用于批量操作和数据迁移）"""
+    published = Article.status == ArticleStatus.published
+
+    tag_counts = dict(db.session.execute(
+        db.select(article_tags.c.tag_id, func.count())
+        .join(Article, Article.id == article_tags.c.article_id)
+        .where(published)
+        .group_by(article_tags.c.tag_id)
+    ).all())
+    for tag in Tag.query.all():
+        tag.article_count = tag_counts.get(tag.id, 0)
+
+    category_counts = dict(db.session.execute(
+        db.select(Article.category, func.count())
+        .where(published, Article.category.isnot(None))
+        .group_by(Article.category)
+    ).all())
+    categories = {category.name: category for category in Category.query.all()}
+    for name in category_counts.keys() - categories.keys():
+        categories[name] = Category(name=name)
+        db.session.add(categories[name])
+    for name, category in categories.items():
+        category.article_count = category_counts.get(name, 0)
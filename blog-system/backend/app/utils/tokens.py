@@ -0,0 +1,175 @@
+"""
+用户认证状态缓存与令牌吊销模块
+==================
+- 令牌由 flask_jwt_extended 按常规流程验签解码，吊销检查通过公开的 token_in_blocklist_loader 钩子完成
+- 用户认证状态缓存：用户ID -> (用户名、邮箱、角色、令牌版本号、已吊销的令牌ID)，重复请求的认证无需查询数据库
+- 吊销：令牌携带签发时的令牌版本号（ver 声明），用户被删除、角色或密码变更、退出全部设备时
+  令牌版本号递增，旧令牌全部失效；单个令牌退出登录时其 jti 写入 revoked_tokens 表，
+  随用户认证状态一起加载
+
+用户信息变更或吊销令牌后调用 invalidate_user()：处理请求的进程立即生效；其他进程中缓存的认证状态
+通过响应缓存后端的标签版本号判断是否失效，使用 redis 缓存后端时同样立即生效，
+其他后端的标签版本号只在本进程内可见，其他进程最多在 AUTH_STATE_LOCAL_TTL 秒后重新加载。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app
+from flask_jwt_extended import JWTManager
+
+
+class _LRU:
+    """带过期时间的线程安全LRU"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (过期时间戳, 值)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CachingJWTManager(JWTManager):
+    """
+    带用户认证状态缓存和吊销检查的JWT管理器
+
+    用法与 JWTManager 相同；当前用户可通过 flask_jwt_extended.current_user 获取，
+    值为 user_state() 返回的字典
+    """
+
+    def __init__(self, app=None):
+        self.user_states = _LRU(4096)
+        super().__init__(app)
+        self.token_in_blocklist_loader(self._is_revoked)
+        self.user_lookup_loader(self._load_user)
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.user_states = _LRU(app.config.get('AUTH_STATE_CACHE_SIZE', 4096))
+
+    def _is_revoked(self, jwt_header, jwt_payload):
+        cached = self._cached_state(jwt_payload.get('sub'))
+        if cached is None:
+            return True
+        state, revoked = cached
+        return jwt_payload.get('ver', 0) != state['token_version'] or jwt_payload.get('jti') in revoked
+
+    def _load_user(self, jwt_header, jwt_payload):
+        return self.user_state(jwt_payload.get('sub'))
+
+    def user_state(self, user_id):
+        """
+        获取用户认证状态
+
+        Returns:
+            dict: id、username、email、role、created_at、token_version，用户不存在时返回 None
+        """
+        cached = self._cached_state(user_id)
+        return cached[0] if cached is not None else None
+
+    def _cached_state(self, user_id):
+        """
+        Returns:
+            tuple: (认证状态, 已吊销且未过期的 jti 集合)，用户不存在时返回 None
+        """
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        version = _state_version(user_id)
+        cached = self.user_states.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        from app import db
+        from app.models import RevokedToken, User
+        row = db.session.query(
+            User.id, User.username, User.email, User.role, User.created_at, User.token_version
+        ).filter(User.id == user_id).first()
+        result = None
+        if row is not None:
+            state = {
+                'id': row.id,
+                'username': row.username,
+                'email': row.email,
+                'role': row.role.value,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'token_version': row.token_version or 0
+            }
+            revoked = frozenset(jti for jti, in db.session.query(RevokedToken.jti).filter(
+                RevokedToken.user_id == user_id, RevokedToken.expires_at > datetime.utcnow()
+            ))
+            result = (state, revoked)
+        self.user_states.set(user_id, (version, result), time.time() + _state_ttl())
+        return result
+
+    def invalidate_user(self, user_id):
+        """用户信息变更或吊销令牌提交后调用，使缓存的认证状态失效"""
+        from app import cache
+        self.user_states.delete(int(user_id))
+        cache.invalidate(_state_tag(user_id))
+
+    def revoke_token(self, jwt_payload):
+        """吊销单个令牌：写入 revoked_tokens 表（顺带清理已过期的记录）并提交"""
+        from app import db
+        from app.models import RevokedToken
+        now = datetime.utcnow()
+        expires_at = (datetime.fromtimestamp(jwt_payload['exp'], timezone.utc).replace(tzinfo=None)
+                      if 'exp' in jwt_payload else now + current_app.config['JWT_ACCESS_TOKEN_EXPIRES'])
+        db.session.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        db.session.merge(RevokedToken(jti=jwt_payload['jti'], user_id=int(jwt_payload['sub']), expires_at=expires_at))
+        db.session.commit()
+        self.invalidate_user(jwt_payload['sub'])
+
+
+def _state_tag(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _shared_backend():
+    """响应缓存后端是否在各进程间共享"""
+    from app import cache
+    return cache.enabled and cache.backend.name == 'redis'
+
+
+def _state_ttl():
+    """认证状态的缓存时间：标签版本号不能跨进程传播时缩短，限制其他进程沿用旧状态的时间"""
+    ttl = current_app.config.get('AUTH_STATE_CACHE_TTL', 60)
+    if _shared_backend():
+        return ttl
+    return min(ttl, current_app.config.get('AUTH_STATE_LOCAL_TTL', 5))
+
+
+def _state_version(user_id):
+    """用户认证状态的当前版本号；未启用响应缓存时只依赖进程内失效和过期时间"""
+    from app import cache
+    if not cache.enabled:
+        return None
+    return cache.backend.get_versions([_state_tag(user_id)])[0]
@@ -0,0 +1,60 @@
+"""
+用户信息工具模块
+==================
+提供用户公开摘要的构造、批量查询以及 expand 参数解析
+"""
+
+from flask import request
+from app.models import User
+from app.serializers import users as user_serializer, USER_PUBLIC_FIELDS
+
+# 批量查询单次允许的最大用户数
+MAX_BATCH_USERS = 100
+
+
+def user_summary(user):
+    """构造用户公开摘要（不包含敏感数据）"""
+    if user is None:
+        return None
+    return user_serializer.dump(user, USER_PUBLIC_FIELDS)
+
+
+def parse_id_list(raw, limit=MAX_BATCH_USERS):
+    """
+    解析逗号分隔的ID列表
+    
+    Args:
+        raw: 形如 "1,2,3" 的字符串
+        limit: 允许的最大数量
+    
+    Returns:
+        list: 去重后的整数ID列表（保持原有顺序）
+    
+    Raises:
+        ValueError: 存在非法ID或数量超出限制
+    """
+    ids = []
+    for part in (raw or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        user_id = int(part)
+        if user_id not in ids:
+            ids.append(user_id)
+    if len(ids) > limit:
+        raise ValueError(f'一次最多查询{limit}个用户')
+    return ids
+
+
+def load_user_summaries(ids):
+    """使用一次 IN 查询批量获取用户摘要，返回 {id: 摘要} 字典"""
+    if not ids:
+        return {}
+    users = User.query.filter(User.id.in_(ids)).all()
+    return {user.id: user_summary(user) for user in users}
+
+
+def expand_fields():
+    """解析请求中的 expand 参数，例如 ?expand=author"""
+    raw = request.args.get('expand', '')
+    return {field.strip() for field in raw.split(',') if field.strip()}
@@ -0,0 +1,317 @@
+"""
+测试数据生成脚本
+==================
+按 database/sample_data.sql 的数据形态生成任意规模的用户、文章和评论，用于性能基准测试：
+
+- 正文为中文技术文章风格的Markdown（标题、段落、列表、代码块），长度呈长尾分布
+- 少数作者贡献大部分文章，标签与分类按齐夫分布使用，评论集中在热门文章上
+- 创建时间随ID递增，分布在最近三年内
+- 相同的 --seed 与规模生成完全相同的数据，基准结果可以在不同提交之间比较
+
+数据以每批 --batch-size 行的 executemany 写入（显式指定ID），随后重建全文索引并校准
+标签、分类与站点计数。所有用户共用同一个密码哈希（密码为 bench），用户 bench（ID为1）是管理员。
+
+在 backend 目录下执行：
+
+    python benchmarks/datagen.py --database-url sqlite:///instance/bench.db --scale medium
+    python benchmarks/datagen.py --database-url mysql+pymysql://... --users 1000000 --articles 2000000 --comments 5000000
+
+目标数据库必须为空库（表可以已存在但不能有数据）。
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 预设规模：(用户数, 文章数, 评论数)
+SCALES = {
+    'tiny': (50, 500, 2000),
+    'small': (500, 5000, 20000),
+    'medium': (10000, 100000, 500000),
+    'large': (1000000, 2000000, 5000000),
+}
+
+PASSWORD = 'bench'
+DRAFT_RATIO = 0.1
+START_TIME = datetime(2022, 1, 1)
+TIME_SPAN = timedelta(days=3 * 365)
+
+CATEGORIES = ['技术', '前端', '数据库', '数据科学', 'API设计', '工具', 'DevOps', '生活', '读书', '随笔']
+BASE_TAGS = [
+    'Python', 'Flask', 'Web开发', 'Vue3', 'JavaScript', '前端开发', 'MySQL', '数据库设计', '性能优化',
+    '数据科学', 'NumPy', 'Pandas', 'RESTful', 'API', 'Git', '版本控制', '开发工具', 'Docker', '容器化',
+    'DevOps', 'Linux', 'Redis', '缓存', '算法', '机器学习', '测试', '架构', '微服务', 'TypeScript', '安全',
+]
+TOPICS = [
+    'Python', 'Flask', 'Vue3', 'MySQL', 'Redis', 'Docker', 'Git', '前端工程化', '数据库索引', '缓存设计',
+    '异步编程', '单元测试', '性能调优', '日志系统', '消息队列', '全文检索', '权限控制', '接口设计',
+]
+TITLE_PATTERNS = ['{}入门教程', '{}最佳实践', '深入理解{}', '{}踩坑记录', '{}性能优化', '从零开始学{}', '{}常见问题总结']
+WORDS = [
+    '应用', '性能', '数据', '接口', '缓存', '查询', '索引', '事务', '连接池', '并发', '线程', '进程', '请求',
+    '响应', '用户', '文章', '评论', '服务', '部署', '配置', '日志', '监控', '测试', '代码', '模块', '函数',
+    '参数', '结果', '问题', '方案', '设计', '实现', '优化', '延迟', '吞吐量', '内存', '磁盘', '网络', '框架',
+    '组件', '状态', '路由', '模板', '数据库', '表结构', '字段', '主键', '外键', '分页', '排序', '过滤',
+]
+CONNECTORS = ['的', '和', '在', '通过', '使用', '对于', '可以', '需要', '能够', '因此', '同时', '如果', '以及']
+COMMENT_TEMPLATES = [
+    '写得很清楚，学到了！', '请问{}和{}有什么区别？', '关于{}这一部分能再详细讲讲吗？', '实测{}确实提升明显。',
+    '感谢分享，{}的部分很实用。', '我在项目里也遇到过{}的问题。', '期待更多{}相关的内容。', '收藏了，{}讲得很透彻。',
+]
+
+
+def make_app(database_url, **overrides):
+    """
+    使用指定数据库创建应用（配置项可覆盖）
+
+    默认不启动后台任务线程：数据直接写入表中不产生任务，计时期间也不应有线程争用SQLite的写锁
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from app.config import Config
+
+    config = type('BenchConfig', (Config,), {'SQLALCHEMY_DATABASE_URI': database_url, 'JOB_WORKERS': 0, **overrides})
+    return create_app(config)
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """齐夫分布的累积权重（排名越靠前被选中的概率越高）"""
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def pick(rng, cum_weights):
+    """按累积权重选出一个下标"""
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+class TextGenerator:
+    """由固定词表组合句子与Markdown正文"""
+
+    def __init__(self, rng, sentence_pool=4000):
+        self.rng = rng
+        self.sentences = [self._sentence() for _ in range(sentence_pool)]
+
+    def _sentence(self):
+        words = []
+        for _ in range(self.rng.randint(4, 9)):
+            words.append(self.rng.choice(WORDS))
+            words.append(self.rng.choice(CONNECTORS))
+        words[-1] = '。'
+        return ''.join(words)
+
+    def paragraph(self, sentences):
+        return ''.join(self.rng.choice(self.sentences) for _ in range(sentences))
+
+    def article(self, topic):
+        """长度呈对数正态分布（中位数约1500字）的Markdown正文"""
+        target = int(min(20000, max(200, self.rng.lognormvariate(7.3, 0.6))))
+        parts = [self.paragraph(3)]
+        length = len(parts[0])
+        section = 1
+        while length < target:
+            block = self.rng.random()
+            if block < 0.15:
+                part = f'## {section}. {topic}{self.rng.choice(WORDS)}'
+                section += 1
+            elif block < 0.25:
+                part = '\n'.join(f'- {self.rng.choice(self.sentences)}' for _ in range(3))
+            elif block < 0.3:
+                part = f'```python\nresult = {topic.lower()}_query(page=1, per_page=10)\n```'
+            else:
+                part = self.paragraph(self.rng.randint(2, 5))
+            parts.append(part)
+            length += len(part)
+        return '\n\n'.join(parts)
+
+    def comment(self):
+        template = self.rng.choice(COMMENT_TEMPLATES)
+        return template.format(self.rng.choice(TOPICS), self.rng.choice(WORDS))
+
+
+def _timestamp(index, total, rng):
+    """随ID递增的创建时间"""
+    offset = TIME_SPAN * (index / max(total, 1))
+    return START_TIME + offset + timedelta(seconds=rng.randint(0, 3600))
+
+
+def _write(table, rows_iter, batch_size, report):
+    from app import db
+    written = 0
+    for batch in _batches(rows_iter, batch_size):
+        with db.engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        written += len(batch)
+        report(table.name, written)
+    return written
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def generate(database_url, users, articles, comments, seed=42, batch_size=5000, quiet=False):
+    """
+    生成测试数据
+
+    Returns:
+        dict: 各表写入的行数与耗时
+    """
+    app = make_app(database_url, LOG_LEVEL='WARNING', METRICS_ENABLED=False)
+    started = time.perf_counter()
+
+    progress = {'table': None}
+
+    def report(table, count):
+        if quiet:
+            return
+        if progress['table'] not in (None, table):
+            print(file=sys.stderr)
+        progress['table'] = table
+        print(f'\r{table}: {count}', end='', file=sys.stderr, flush=True)
+
+    with app.app_context():
+        from app import db
+        from app.models import User, UserRole, Article, ArticleStatus, Comment, Tag, article_tags
+        from app.utils import stats, taxonomy
+        from app.utils.auth import hash_password
+        from app.utils.content import make_excerpt
+        from app.utils.rendering import content_hash
+        from app.utils.search import rebuild_index
+
+        if db.session.query(User.id).first() is not None or db.session.query(Article.id).first() is not None:
+            raise SystemExit('目标数据库已有数据，请使用空库')
+
+        rng = random.Random(seed)
+        text = TextGenerator(rng)
+        password_hash = hash_password(PASSWORD)
+
+        # 用户：ID为1的 bench 是管理员
+        def user_rows():
+            for user_id in range(1, users + 1):
+                name = 'bench' if user_id == 1 else f'user{user_id}'
+                yield {'id': user_id, 'username': name, 'email': f'{name}@example.com',
+                       'password_hash': password_hash, 'role': UserRole.admin if user_id == 1 else UserRole.user,
+                       'token_version': 0, 'created_at': _timestamp(user_id, users, rng)}
+
+        _write(User.__table__, user_rows(), batch_size, report)
+
+        # 标签
+        tag_names = BASE_TAGS + [f'{topic}{word}' for topic in TOPICS for word in WORDS[:10]]
+        db.session.execute(Tag.__table__.insert(), [
+            {'id': tag_id, 'name': name, 'article_count': 0} for tag_id, name in enumerate(tag_names, 1)
+        ])
+        db.session.commit()
+        tag_weights = zipf_cum_weights(len(tag_names))
+        category_weights = zipf_cum_weights(len(CATEGORIES), 0.8)
+        # 约10%的用户写文章，其中少数作者贡献大部分文章
+        author_weights = zipf_cum_weights(max(1, users // 10))
+
+        published_ids = []
+        links = []
+
+        def article_rows():
+            for article_id in range(1, articles + 1):
+                topic = rng.choice(TOPICS)
+                content = text.article(topic)
+                created_at = _timestamp(article_id, articles, rng)
+                status = ArticleStatus.draft if rng.random() < DRAFT_RATIO else ArticleStatus.published
+                if status == ArticleStatus.published:
+                    published_ids.append(article_id)
+                tag_ids = {pick(rng, tag_weights) + 1 for _ in range(rng.randint(0, 5))}
+                links.extend({'article_id': article_id, 'tag_id': tag_id} for tag_id in tag_ids)
+                yield {'id': article_id, 'title': rng.choice(TITLE_PATTERNS).format(topic), 'content': content,
+                       'excerpt': make_excerpt(content), 'content_hash': content_hash(content), 'author_id': pick(rng, author_weights) + 1,
+                       'status': status, 'category': CATEGORIES[pick(rng, category_weights)],
+                       'created_at': created_at, 'updated_at': created_at, 'version': 1}
+
+        # 标签关联在生成文章时积累，每写入一批文章随后写入对应的关联
+        written_articles = written_links = 0
+        for batch in _batches(article_rows(), batch_size):
+            with db.engine.begin() as conn:
+                conn.execute(Article.__table__.insert(), batch)
+                if links:
+                    conn.execute(article_tags.insert(), links)
+            written_articles += len(batch)
+            written_links += len(links)
+            links.clear()
+            report('articles', written_articles)
+
+        # 评论：集中在热门（排名靠前的已发布）文章上
+        hot_articles = published_ids[:]
+        rng.shuffle(hot_articles)
+        comment_weights = zipf_cum_weights(len(hot_articles), 0.8) if hot_articles else None
+
+        def comment_rows():
+            if not comment_weights:
+                return
+            for comment_id in range(1, comments + 1):
+                yield {'id': comment_id, 'article_id': hot_articles[pick(rng, comment_weights)],
+                       'user_id': rng.randint(1, users), 'content': text.comment(),
+                       'created_at': _timestamp(comment_id, comments, rng)}
+
+        written_comments = _write(Comment.__table__, comment_rows(), batch_size, report)
+        if not quiet:
+            print(file=sys.stderr)
+
+        # 批量写入绕过了映射器事件，重建派生数据
+        taxonomy.recount()
+        db.session.commit()
+        stats.reconcile()
+        rebuild_index()
+
+        summary = {
+            'database': db.engine.dialect.name,
+            'seed': seed,
+            'users': users,
+            'articles': written_articles,
+            'published_articles': len(published_ids),
+            'article_tags': written_links,
+            'comments': written_comments,
+            'seconds': round(time.perf_counter() - started, 1),
+        }
+        db.session.remove()
+        return summary
+
+
+def add_scale_arguments(parser):
+    """规模参数（datagen 与基准套件共用）"""
+    parser.add_argument('--scale', choices=SCALES, default='small', help='预设规模')
+    parser.add_argument('--users', type=int, help='用户数（覆盖预设规模）')
+    parser.add_argument('--articles', type=int, help='文章数（覆盖预设规模）')
+    parser.add_argument('--comments', type=int, help='评论数（覆盖预设规模）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+
+
+def resolve_scale(args):
+    users, articles, comments = SCALES[args.scale]
+    return args.users or users, args.articles or articles, args.comments or comments
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成基准测试数据')
+    parser.add_argument('--database-url', required=True, help='目标数据库（必须为空库）')
+    parser.add_argument('--batch-size', type=int, default=5000, help='每批写入的行数')
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    users, articles, comments = resolve_scale(args)
+    summary = generate(args.database_url, users, articles, comments, args.seed, args.batch_size)
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
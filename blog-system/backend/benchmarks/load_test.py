@@ -0,0 +1,201 @@
+"""
+负载测试脚本
+==================
+用多个并发客户端持续请求指定接口，统计吞吐量（req/s）与延迟分位数。
+
+两种用法（在 backend 目录下执行）：
+
+1. 压测已运行的服务：
+
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --path "/api/articles?per_page=10"
+
+2. 对比不同工作进程数：为每个进程数启动一次 gunicorn（使用临时SQLite数据库并写入测试数据），
+   依次压测后输出对比表：
+
+    python benchmarks/load_test.py --workers 1,2,4 --threads 4 --concurrency 16 --duration 10
+
+客户端与服务端运行在同一台机器上时会争用CPU，结果只用于相对比较。
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_load(base_url, paths, concurrency, duration, method='GET', body=None):
+    """
+    并发请求接口
+
+    Args:
+        method: 请求方法
+        body: 请求体（dict），以JSON发送
+
+    Returns:
+        dict: 请求数、错误数、吞吐量和延迟分位数（毫秒）
+    """
+    target = urlsplit(base_url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    payload = json.dumps(body) if body is not None else None
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+
+    def client(index):
+        connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        local_latencies = []
+        local_errors = 0
+        request_index = index
+        while time.perf_counter() < deadline:
+            path = paths[request_index % len(paths)]
+            request_index += 1
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, payload, headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+                local_latencies.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2) if latencies else None
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / elapsed, 1),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def seed_database(database_url, articles):
+    """创建数据库并写入测试用户与文章（测试用户 bench 的密码为 bench）"""
+    os.environ['DATABASE_URL'] = database_url
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app, db
+    from app.models import User, UserRole, Article, ArticleStatus
+    from app.utils.content import make_excerpt
+    from app.utils.auth import hash_password
+
+    app = create_app()
+    with app.app_context():
+        author = User(username='bench', email='bench@example.com', password_hash=hash_password('bench'),
+                      role=UserRole.admin)
+        db.session.add(author)
+        db.session.commit()
+        content = '性能测试正文。' * 200
+        db.session.execute(Article.__table__.insert(), [
+            {'title': f'测试文章{index}', 'content': content, 'excerpt': make_excerpt(content),
+             'author_id': author.id, 'status': ArticleStatus.published, 'category': '技术'}
+            for index in range(articles)
+        ])
+        db.session.commit()
+
+
+def wait_for_server(base_url, timeout=30):
+    target = urlsplit(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(target.hostname, target.port, timeout=1)
+            connection.request('GET', '/api/articles?per_page=1')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('服务启动超时')
+
+
+def run_with_gunicorn(args, paths):
+    """为每个工作进程数启动一次 gunicorn 并压测"""
+    database_url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "bench.db")}'
+    seed_database(database_url, args.articles)
+
+    results = []
+    for workers in args.workers:
+        env = dict(os.environ, DATABASE_URL=database_url, WEB_CONCURRENCY=str(workers),
+                   GUNICORN_THREADS=str(args.threads), GUNICORN_BIND=f'127.0.0.1:{args.port}',
+                   GUNICORN_ACCESS_LOG='/dev/null', GUNICORN_LOG_LEVEL='warning',
+                   RESPONSE_CACHE_BACKEND=args.cache_backend)
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                                  cwd=BACKEND_DIR, env=env)
+        try:
+            base_url = f'http://127.0.0.1:{args.port}'
+            wait_for_server(base_url)
+            run_load(base_url, paths, args.concurrency, min(2, args.duration))  # 预热
+            result = run_load(base_url, paths, args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        result.update(workers=workers, threads=args.threads)
+        results.append(result)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='博客后端负载测试')
+    parser.add_argument('--url', help='压测已运行的服务，例如 http://127.0.0.1:5000')
+    parser.add_argument('--path', action='append', help='请求路径，可重复指定，默认为文章列表和文章详情')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发客户端数')
+    parser.add_argument('--duration', type=float, default=10, help='每轮压测时长（秒）')
+    parser.add_argument('--workers', default='1,2,4', help='启动 gunicorn 时的工作进程数列表')
+    parser.add_argument('--threads', type=int, default=4, help='每个工作进程的线程数')
+    parser.add_argument('--articles', type=int, default=1000, help='写入的测试文章数')
+    parser.add_argument('--port', type=int, default=5099, help='启动 gunicorn 时的监听端口')
+    parser.add_argument('--cache-backend', default='none', help='服务端响应缓存后端，默认关闭以测量实际处理能力')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    paths = args.path or ['/api/articles?per_page=10&view=summary', '/api/articles/1', '/api/articles/tags']
+    if args.url:
+        results = [run_load(args.url, paths, args.concurrency, args.duration)]
+        print(json.dumps(results[0], ensure_ascii=False))
+    else:
+        args.workers = [int(value) for value in args.workers.split(',')]
+        results = run_with_gunicorn(args, paths)
+        print(f"\n{'workers':>8} {'threads':>8} {'req/s':>10} {'p50(ms)':>10} {'p99(ms)':>10} {'errors':>8}")
+        for result in results:
+            print(f"{result['workers']:>8} {result['threads']:>8} {result['rps']:>10} "
+                  f"{result['p50_ms']:>10} {result['p99_ms']:>10} {result['errors']:>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'paths': paths, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
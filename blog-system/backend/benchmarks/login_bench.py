@@ -0,0 +1,102 @@
+"""
+登录压测脚本
+==================
+启动 gunicorn，在持续的登录请求压力下同时请求普通读接口，比较不同密码哈希线程数配置下
+登录接口与读接口的延迟分位数（重点关注p99）。
+
+在 backend 目录下执行：
+
+    python benchmarks/login_bench.py --hash-workers 0,2 --login-concurrency 16 --read-concurrency 4
+
+--hash-workers 0 表示在请求线程中直接计算哈希（旧行为），其余值为每进程哈希线程数。
+登录频率限制在压测期间关闭。客户端与服务端运行在同一台机器上时会争用CPU，结果只用于相对比较。
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+
+from load_test import BACKEND_DIR, run_load, seed_database, wait_for_server
+
+LOGIN_BODY = {'username': 'bench', 'password': 'bench'}
+READ_PATHS = ['/api/articles?per_page=10&view=summary', '/api/articles/1']
+
+
+def run_mixed(base_url, args):
+    """同时压测登录接口和读接口"""
+    results = {}
+
+    def login():
+        results['login'] = run_load(base_url, ['/api/auth/login'], args.login_concurrency, args.duration,
+                                    method='POST', body=LOGIN_BODY)
+
+    def read():
+        results['read'] = run_load(base_url, READ_PATHS, args.read_concurrency, args.duration)
+
+    threads = [threading.Thread(target=login), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录接口压测')
+    parser.add_argument('--hash-workers', default='0,2', help='PASSWORD_HASH_WORKERS 取值列表')
+    parser.add_argument('--hash-method', default='pbkdf2', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--queue-size', type=int, default=16, help='PASSWORD_HASH_QUEUE_SIZE')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn 工作进程数')
+    parser.add_argument('--threads', type=int, default=8, help='每个工作进程的线程数')
+    parser.add_argument('--login-concurrency', type=int, default=16, help='并发登录客户端数')
+    parser.add_argument('--read-concurrency', type=int, default=4, help='并发读接口客户端数')
+    parser.add_argument('--duration', type=float, default=10, help='每轮压测时长（秒）')
+    parser.add_argument('--port', type=int, default=5098, help='gunicorn 监听端口')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    database_url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "bench.db")}'
+    os.environ['PASSWORD_HASH_METHOD'] = args.hash_method
+    seed_database(database_url, 100)
+
+    rows = []
+    for hash_workers in [int(value) for value in args.hash_workers.split(',')]:
+        env = dict(os.environ, DATABASE_URL=database_url, WEB_CONCURRENCY=str(args.workers),
+                   GUNICORN_THREADS=str(args.threads), GUNICORN_BIND=f'127.0.0.1:{args.port}',
+                   GUNICORN_ACCESS_LOG='/dev/null', GUNICORN_LOG_LEVEL='warning',
+                   RESPONSE_CACHE_BACKEND='none', LOGIN_RATE_LIMIT='0',
+                   PASSWORD_HASH_WORKERS=str(hash_workers), PASSWORD_HASH_QUEUE_SIZE=str(args.queue_size),
+                   PASSWORD_HASH_METHOD=args.hash_method)
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                                  cwd=BACKEND_DIR, env=env)
+        try:
+            base_url = f'http://127.0.0.1:{args.port}'
+            wait_for_server(base_url)
+            result = run_mixed(base_url, args)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        row = {'hash_workers': hash_workers, **result}
+        rows.append(row)
+        print(json.dumps(row, ensure_ascii=False), flush=True)
+
+    print(f"\n{'hash_workers':>12} {'login/s':>9} {'login p50':>10} {'login p99':>10} {'503':>6} "
+          f"{'read/s':>8} {'read p50':>9} {'read p99':>9}")
+    for row in rows:
+        login, read = row['login'], row['read']
+        print(f"{row['hash_workers']:>12} {login['rps']:>9} {login['p50_ms']:>10} {login['p99_ms']:>10} "
+              f"{login['errors']:>6} {read['rps']:>8} {read['p50_ms']:>9} {read['p99_ms']:>9}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'hash_method': args.hash_method, 'results': rows},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+序列化微基准
+==================
+比较把1000篇文章（含标签）转换为JSON响应的耗时：
+
+- before：逐字段手写字典（isoformat() / .value）+ Flask默认JSON提供器（标准库 json）
+- after：app.serializers 字段计划 + FastJSONProvider（orjson）
+
+在 backend 目录下执行：
+
+    python benchmarks/serialize_bench.py --articles 1000 --repeat 50
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app.models import Article, ArticleStatus, Tag  # noqa: E402
+from app.serializers import articles as article_serializer  # noqa: E402
+from app.utils.fastjson import FastJSONProvider, orjson  # noqa: E402
+
+
+def make_articles(count):
+    tags = [Tag(name=f'标签{index}') for index in range(10)]
+    created_at = datetime.datetime(2024, 1, 1, 12, 0, 0, 123456)
+    content = '性能测试正文。' * 200
+    return [
+        Article(id=index, title=f'测试文章{index}', content=content, excerpt=content[:200], author_id=1,
+                status=ArticleStatus.published, category='技术', tags=tags[index % 10:index % 10 + 3],
+                created_at=created_at, updated_at=created_at)
+        for index in range(count)
+    ]
+
+
+def handwritten(article):
+    """改造前各路由中的写法"""
+    return {
+        'id': article.id,
+        'title': article.title,
+        'content': article.content,
+        'excerpt': article.excerpt,
+        'author_id': article.author_id,
+        'status': article.status.value,
+        'category': article.category,
+        'tags': [tag.name for tag in article.tags],
+        'created_at': article.created_at.isoformat(),
+        'updated_at': article.updated_at.isoformat() if article.updated_at else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='序列化微基准')
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_articles(args.articles)
+    before_app, after_app = Flask('before'), Flask('after')
+    before_app.json = DefaultJSONProvider(before_app)
+    after_app.json = FastJSONProvider(after_app)
+
+    def before_build():
+        return [handwritten(article) for article in rows]
+
+    def after_build():
+        return article_serializer.dump_many(rows)
+
+    before_data, after_data = before_build(), after_build()
+    with before_app.app_context():
+        before_body = before_app.json.response({'articles': before_data}).get_data()
+    with after_app.app_context():
+        after_body = after_app.json.response({'articles': after_data}).get_data()
+    assert before_app.json.loads(before_body) == after_app.json.loads(after_body), '两种实现的输出不一致'
+
+    def measure(name, func, app=None):
+        if app is not None:
+            with app.app_context():
+                seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        else:
+            seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        return name, seconds * 1000
+
+    results = [
+        measure('before: 构造字典', before_build),
+        measure('after:  构造字典', after_build),
+        measure('before: 编码', lambda: before_app.json.response({'articles': before_data}), before_app),
+        measure('after:  编码', lambda: after_app.json.response({'articles': after_data}), after_app),
+        measure('before: 合计', lambda: before_app.json.response({'articles': before_build()}), before_app),
+        measure('after:  合计', lambda: after_app.json.response({'articles': after_build()}), after_app),
+    ]
+    print(f'{args.articles} 篇文章，取 {args.repeat} 次中的最小值；orjson: {"是" if orjson else "否（标准库）"}')
+    for name, ms in results:
+        print(f'{name:<16} {ms:8.2f} ms')
+    print(f'响应体大小: before {len(before_body)} 字节，after {len(after_body)} 字节')
+
+
+if __name__ == '__main__':
+    main()
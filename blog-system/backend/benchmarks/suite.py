@@ -0,0 +1,359 @@
+"""
+性能基准套件
+==================
+在进程内用 create_app 构建应用（测试客户端直接调用WSGI应用，不经过网络），对固定场景计时，
+输出可在不同提交之间比较的JSON结果。
+
+场景（每次迭代模拟一次页面访问，可能包含多个请求）：
+
+- home：首页（文章列表摘要 + 标签 + 分类）
+- article_detail：文章详情（含作者）+ 评论列表，文章按热度分布选取
+- admin_dashboard：管理后台（站点统计 + 文章分页 + 用户分页）
+- login_burst：多个客户端同时登录
+
+每个场景报告吞吐量（次/秒）、延迟分位数（毫秒）、每次迭代的SQL语句数与SQL耗时、错误数。
+默认关闭服务端响应缓存以测量实际处理开销，可用 --cache-backend lru 测量缓存命中路径。
+
+在 backend 目录下执行：
+
+    # 在临时SQLite库中生成 small 规模数据并运行全部场景
+    python benchmarks/suite.py run --scale small --output bench-HEAD.json
+
+    # 复用 datagen.py 生成的数据库（大规模数据或MySQL）
+    python benchmarks/datagen.py --database-url sqlite:///instance/bench.db --scale medium
+    python benchmarks/suite.py run --database-url sqlite:///instance/bench.db --output bench-HEAD.json
+
+    # 比较两次结果，p50/p99 变差超过阈值、SQL语句数或错误数增加时以非零状态退出
+    python benchmarks/suite.py compare bench-base.json bench-HEAD.json --threshold 10 --p99-threshold 25
+
+相同的数据（--seed 与规模）和参数下，请求序列完全相同；计时仍受机器负载影响，
+比较前后两个提交时应在同一台机器上各运行一次。
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from datagen import BACKEND_DIR, PASSWORD, add_scale_arguments, generate, make_app, pick, resolve_scale, \
+    zipf_cum_weights
+
+# 参与比较的延迟指标
+LATENCY_KEYS = ('p50_ms', 'p99_ms')
+# 采样的文章数（文章详情场景从中按热度选取）
+SAMPLE_ARTICLES = 1000
+
+
+class Context:
+    """场景共用的数据：管理员令牌、已发布文章ID"""
+
+    def __init__(self, admin_token, article_ids):
+        self.admin_headers = {'Authorization': f'Bearer {admin_token}'}
+        self.article_ids = article_ids
+        self.article_weights = zipf_cum_weights(len(article_ids), 0.8) if article_ids else None
+
+
+def home(client, ctx, rng):
+    page = rng.randint(1, 5)
+    return [
+        client.get(f'/api/articles?page={page}&per_page=10&view=summary'),
+        client.get('/api/articles/tags'),
+        client.get('/api/articles/categories'),
+    ]
+
+
+def article_detail(client, ctx, rng):
+    article_id = ctx.article_ids[pick(rng, ctx.article_weights)]
+    return [
+        client.get(f'/api/articles/{article_id}?expand=author'),
+        client.get(f'/api/comments/?article_id={article_id}&per_page=20'),
+    ]
+
+
+def admin_dashboard(client, ctx, rng):
+    page = rng.randint(1, 5)
+    return [
+        client.get('/api/admin/statistics', headers=ctx.admin_headers),
+        client.get(f'/api/admin/articles?page={page}&per_page=20', headers=ctx.admin_headers),
+        client.get(f'/api/admin/users?page={page}&per_page=20', headers=ctx.admin_headers),
+    ]
+
+
+def login_burst(client, ctx, rng):
+    return [client.post('/api/auth/login', json={'username': 'bench', 'password': PASSWORD})]
+
+
+# 场景：(函数, 默认迭代次数, 默认并发数)
+SCENARIOS = {
+    'home': (home, 300, 1),
+    'article_detail': (article_detail, 300, 1),
+    'admin_dashboard': (admin_dashboard, 200, 1),
+    'login_burst': (login_burst, 40, 8),
+}
+
+
+class SQLRecorder:
+    """按线程统计SQL语句数与耗时"""
+
+    def __init__(self, engine):
+        self.local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self.local.started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.local.count = getattr(self.local, 'count', 0) + 1
+        self.local.seconds = getattr(self.local, 'seconds', 0.0) + time.perf_counter() - self.local.started
+
+    def take(self):
+        """返回并清零当前线程的 (语句数, 耗时秒)"""
+        result = (getattr(self.local, 'count', 0), getattr(self.local, 'seconds', 0.0))
+        self.local.count, self.local.seconds = 0, 0.0
+        return result
+
+
+def _percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_scenario(app, recorder, ctx, name, iterations, concurrency, warmup, seed):
+    """运行一个场景，迭代平均分配到各并发客户端"""
+    function = SCENARIOS[name][0]
+    samples = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(index, count, record):
+        client = app.test_client()
+        rng = random.Random(f'{seed}:{name}:{index}:{record}')
+        local = []
+        local_errors = 0
+        recorder.take()
+        for _ in range(count):
+            started = time.perf_counter()
+            responses = function(client, ctx, rng)
+            elapsed = time.perf_counter() - started
+            sql_count, sql_seconds = recorder.take()
+            local_errors += sum(1 for response in responses if response.status_code >= 400)
+            local.append((elapsed, sql_count, sql_seconds, len(responses)))
+        if record:
+            with lock:
+                samples.extend(local)
+                errors[0] += local_errors
+
+    def run(total, record):
+        threads = [threading.Thread(target=worker, args=(index, total // concurrency + (index < total % concurrency),
+                                                         record))
+                   for index in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    run(warmup, record=False)
+    gc.collect()
+    wall = run(iterations, record=True)
+
+    latencies = sorted(sample[0] for sample in samples)
+    sql_counts = [sample[1] for sample in samples]
+    return {
+        'iterations': len(samples),
+        'requests': sum(sample[3] for sample in samples),
+        'concurrency': concurrency,
+        'errors': errors[0],
+        'throughput': round(len(samples) / wall, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'sql_per_iteration': round(statistics.mean(sql_counts), 2),
+        'sql_max': max(sql_counts),
+        'sql_ms_per_iteration': round(statistics.mean(sample[2] for sample in samples) * 1000, 3),
+    }
+
+
+def _git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def _load_context(app, seed):
+    from app import db
+    from app.models import Article, ArticleStatus, User, UserRole
+    from app.utils.auth import create_token
+
+    with app.app_context():
+        admin = db.session.query(User.id, User.token_version).filter_by(username='bench', role=UserRole.admin).first()
+        if admin is None:
+            raise SystemExit('数据库中没有管理员 bench，请使用 datagen.py 生成的数据库')
+        token = create_token(admin.id, UserRole.admin, admin.token_version)
+        # 按ID取固定的一批已发布文章，打乱顺序后前面的文章更“热门”
+        article_ids = list(db.session.scalars(
+            db.select(Article.id).where(Article.status == ArticleStatus.published)
+            .order_by(Article.id).limit(SAMPLE_ARTICLES)
+        ))
+        dataset = {
+            'users': db.session.query(User.id).count(),
+            'articles': db.session.query(Article.id).count(),
+            'database': db.engine.dialect.name,
+        }
+        from app.utils.stats import get_counters
+        dataset['comments'] = get_counters()['total_comments']
+        db.session.remove()
+    random.Random(seed).shuffle(article_ids)
+    return Context(token, article_ids), dataset
+
+
+def run(args):
+    database_url = args.database_url
+    generated = None
+    if database_url is None:
+        users, articles, comments = resolve_scale(args)
+        database_url = f'sqlite:///{os.path.join(tempfile.mkdtemp(prefix="blog-bench-"), "bench.db")}'
+        print(f'生成测试数据 users={users} articles={articles} comments={comments}', file=sys.stderr)
+        generated = generate(database_url, users, articles, comments, args.seed, quiet=True)
+
+    app = make_app(database_url, LOG_LEVEL='WARNING', RESPONSE_CACHE_BACKEND=args.cache_backend,
+                   LOGIN_RATE_LIMIT=0, PASSWORD_HASH_WORKERS=args.hash_workers,
+                   JWT_SECRET_KEY='benchmark-only-secret-key-0123456789')
+    ctx, dataset = _load_context(app, args.seed)
+    if generated:
+        dataset['seed'] = generated['seed']
+    with app.app_context():
+        from app import db
+        recorder = SQLRecorder(db.engine)
+
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        _, default_iterations, default_concurrency = SCENARIOS[name]
+        iterations = max(1, int(default_iterations * args.iterations_scale))
+        concurrency = args.concurrency or default_concurrency
+        result = run_scenario(app, recorder, ctx, name, iterations, concurrency, args.warmup, args.seed)
+        results[name] = result
+        print(f"{name:<16} {result['throughput']:>9}/s  p50 {result['p50_ms']:>8}ms  p99 {result['p99_ms']:>8}ms  "
+              f"sql {result['sql_per_iteration']:>6}  errors {result['errors']}", file=sys.stderr)
+
+    import flask
+    import sqlalchemy
+    report = {
+        'meta': {
+            'revision': _git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'flask': flask.__version__,
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'cache_backend': args.cache_backend,
+            'dataset': dataset,
+        },
+        'scenarios': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+def _change(base, head):
+    if not base:
+        return None
+    return round((head - base) / base * 100, 1)
+
+
+def compare(args):
+    """逐场景比较两份结果，返回退出码"""
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.head, encoding='utf-8') as f:
+        head = json.load(f)
+
+    if base['meta'].get('dataset') != head['meta'].get('dataset'):
+        print('警告：两次运行使用的数据集不同，结果不可直接比较', file=sys.stderr)
+
+    print(f"{base['meta'].get('revision')} -> {head['meta'].get('revision')}")
+    print(f"{'scenario':<16} {'throughput':>18} {'p50(ms)':>22} {'p99(ms)':>22} {'sql':>14}")
+    regressions = []
+    for name, new in head['scenarios'].items():
+        old = base['scenarios'].get(name)
+        if old is None:
+            print(f'{name:<16} （基准中没有该场景）')
+            continue
+        cells = []
+        for key in ('throughput',) + LATENCY_KEYS:
+            change = _change(old[key], new[key])
+            cells.append(f"{old[key]}→{new[key]} ({change:+}%)" if change is not None else f'{old[key]}→{new[key]}')
+            threshold = {'p50_ms': args.threshold, 'p99_ms': args.p99_threshold}.get(key)
+            if threshold is not None and change is not None and change > threshold:
+                regressions.append(f'{name} {key} {change:+}%')
+        cells.append(f"{old['sql_per_iteration']}→{new['sql_per_iteration']}")
+        if new['sql_per_iteration'] > old['sql_per_iteration']:
+            regressions.append(f"{name} SQL语句数 {old['sql_per_iteration']}→{new['sql_per_iteration']}")
+        if new['errors'] > old['errors']:
+            regressions.append(f"{name} 错误数 {old['errors']}→{new['errors']}")
+        print(f'{name:<16} {cells[0]:>18} {cells[1]:>22} {cells[2]:>22} {cells[3]:>14}')
+
+    if regressions:
+        print('\n性能回退：')
+        for item in regressions:
+            print(f'  {item}')
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='博客后端性能基准套件')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='运行基准场景')
+    run_parser.add_argument('--database-url', help='使用 datagen.py 生成的数据库；未指定时在临时SQLite库中生成数据')
+    add_scale_arguments(run_parser)
+    run_parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='只运行指定场景，可重复指定')
+    run_parser.add_argument('--iterations-scale', type=float, default=1.0, help='各场景迭代次数的倍数')
+    run_parser.add_argument('--concurrency', type=int, help='覆盖各场景的默认并发数')
+    run_parser.add_argument('--warmup', type=int, default=10, help='每个场景的预热迭代次数')
+    run_parser.add_argument('--cache-backend', default='none', help='服务端响应缓存后端，默认关闭')
+    run_parser.add_argument('--hash-workers', type=int, default=2, help='PASSWORD_HASH_WORKERS')
+    run_parser.add_argument('--output', help='结果写入的JSON文件，默认输出到标准输出')
+
+    compare_parser = subparsers.add_parser('compare', help='比较两次运行结果')
+    compare_parser.add_argument('base', help='基准结果JSON')
+    compare_parser.add_argument('head', help='新结果JSON')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='p50 变差超过该百分比视为回退')
+    compare_parser.add_argument('--p99-threshold', type=float, default=25,
+                                help='p99 变差超过该百分比视为回退（样本较少时p99波动较大）')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Gunicorn配置模块
+==================
+生产环境启动方式（在 backend 目录下执行）：
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+所有配置项均可通过环境变量覆盖：
+
+- GUNICORN_BIND：监听地址，默认 0.0.0.0:5000
+- WEB_CONCURRENCY：工作进程数，默认 CPU核数 * 2 + 1
+- GUNICORN_THREADS：每个工作进程的线程数，默认 8
+- GUNICORN_WORKER_CLASS：工作进程类型，默认 gthread；使用 gevent 时需安装 gevent 包
+- GUNICORN_WORKER_CONNECTIONS：gevent / eventlet 工作进程的最大并发连接数，默认 1000
+- GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT：请求超时与优雅退出等待时间（秒）
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER：工作进程处理多少请求后重启，用于回收内存
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# 进程模型：多进程利用多核，进程内多线程处理等待数据库的请求
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+# 评论实时推送（SSE）的每个连接占用一个线程，需要支持大量长连接时可改用 gevent 工作进程；
+# 应用按这里的线程数/连接数估算 SSE_MAX_CONNECTIONS（见 app/config.py）
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# 在主进程中创建应用（建表、升级结构、初始化检索索引只执行一次），工作进程通过fork共享
+preload_app = True
+
+# 超时与优雅退出：收到 SIGTERM 后停止接收新请求，等待进行中的请求完成
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 工作进程回收：随机抖动避免所有进程同时重启
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# 日志输出到标准输出/标准错误
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """
+    工作进程启动后丢弃从主进程继承的数据库连接（主库与只读库），并启动本进程的后台任务线程
+
+    预加载应用时主进程已打开过连接，多个进程共用同一个连接会导致数据错乱；
+    close=False 只丢弃连接池引用，不关闭主进程仍持有的连接。
+    后台任务线程不会随fork继承，在此启动后无需等到首个请求即可处理积压的任务
+    """
+    from app import db
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    app.extensions['jobs'].ensure_started()
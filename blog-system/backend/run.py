@@ -1,5 +1,15 @@
-from app import create_app
+"""
+开发服务器启动脚本
+==================
+使用Werkzeug开发服务器运行应用，仅用于本地开发；
+生产环境请使用 gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
 import logging
+import os
+import sys
+
+from app import create_app
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -10,11 +20,9 @@ app = create_app()
 if __name__ == '__main__':
     try:
         logger.info("Starting Flask application...")
-        # 关闭调试模式以确保服务稳定运行
-        app.run(debug=False, host='0.0.0.0', port=5000)
-    except Exception as e:
-        logger.error(f"Error occurred: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        # 保持程序运行
-        input("Press Enter to exit...")
\ No newline at end of file
+        # 关闭调试模式以确保服务稳定运行；开启多线程，慢请求不会阻塞其他请求
+        app.run(debug=False, host=os.environ.get('HOST', '0.0.0.0'),
+                port=int(os.environ.get('PORT', 5000)), threaded=True)
+    except Exception:
+        logger.exception("Error occurred")
+        sys.exit(1)
@@ -0,0 +1,105 @@
+"""
+测试公共夹具
+==================
+使用临时SQLite数据库创建应用实例，并提供常用的数据构造与SQL计数工具
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.models import User, UserRole, Article, ArticleStatus, Comment  # noqa: E402
+from app.utils.auth import hash_password, create_token  # noqa: E402
+from app.utils.pagination import clear_count_cache  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """创建使用临时数据库的测试应用"""
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+        LOG_PROPAGATE = True  # 便于用 caplog 检查日志
+        JOB_WORKERS = 0  # 不启动后台任务线程，测试中用 jobs.run_pending() 显式执行
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        yield app
+        app.extensions['jobs'].stop()
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    clear_count_cache()
+
+
+@pytest.fixture
+def client(app):
+    """测试客户端"""
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """用户构造函数"""
+    def _make_user(username, role=UserRole.user, password='password'):
+        user = User(
+            username=username,
+            email=f'{username}@example.com',
+            password_hash=hash_password(password),
+            role=role
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+
+@pytest.fixture
+def make_article(app):
+    """文章构造函数"""
+    def _make_article(author, title='标题', content='内容', status=ArticleStatus.published, **kwargs):
+        article = Article(title=title, content=content, author_id=author.id, status=status, **kwargs)
+        db.session.add(article)
+        db.session.commit()
+        return article
+    return _make_article
+
+
+@pytest.fixture
+def make_comment(app):
+    """评论构造函数"""
+    def _make_comment(article, user, content='评论'):
+        comment = Comment(article_id=article.id, user_id=user.id, content=content)
+        db.session.add(comment)
+        db.session.commit()
+        return comment
+    return _make_comment
+
+
+@pytest.fixture
+def auth_header(app):
+    """生成携带JWT的请求头"""
+    def _auth_header(user):
+        return {'Authorization': f'Bearer {create_token(user.id, user.role)}'}
+    return _auth_header
+
+
+@contextmanager
+def count_queries():
+    """统计代码块内执行的SQL语句"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _record)
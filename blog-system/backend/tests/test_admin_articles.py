@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+from app.models import UserRole, ArticleStatus
+
+
+def test_paginated_admin_articles_with_filters(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    author = make_user('author')
+    make_article(admin, title='管理员草稿', status=ArticleStatus.draft)
+    for index in range(3):
+        make_article(author, title=f'作者文章{index}')
+    headers = auth_header(admin)
+
+    result = client.get('/api/admin/articles?per_page=2', headers=headers).get_json()
+    assert result['total'] == 4
+    assert result['pages'] == 2
+    assert len(result['articles']) == 2
+
+    result = client.get(f'/api/admin/articles?author_id={author.id}&status=published', headers=headers).get_json()
+    assert result['total'] == 3
+    assert {article['author_id'] for article in result['articles']} == {author.id}
+
+    result = client.get('/api/admin/articles?status=draft&search=草稿', headers=headers).get_json()
+    assert [article['title'] for article in result['articles']] == ['管理员草稿']
+
+    result = client.get('/api/admin/articles?date_to=2000-01-01', headers=headers).get_json()
+    assert result['total'] == 0
+    result = client.get('/api/admin/articles?date_from=2000-01-01&cursor=&limit=3', headers=headers).get_json()
+    assert len(result['articles']) == 3
+    assert result['next_cursor']
+
+    assert client.get('/api/admin/articles?status=unknown', headers=headers).status_code == 400
+    assert client.get('/api/admin/articles?date_from=yesterday', headers=headers).status_code == 400
+    assert client.get('/api/admin/articles', headers=auth_header(author)).status_code == 403
+
+
+def test_all_articles_is_streamed(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    for index in range(3):
+        make_article(admin, title=f'文章{index}', status=ArticleStatus.draft if index else ArticleStatus.published)
+
+    response = client.get('/api/admin/articles/all', headers=auth_header(admin))
+    assert response.is_streamed
+    articles = json.loads(response.get_data(as_text=True))['articles']
+    assert [article['title'] for article in articles] == ['文章0', '文章1', '文章2']
+
+
+def test_export_ndjson_and_csv(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    make_article(admin, title='第一篇', content='正文,带逗号\n换行')
+    make_article(admin, title='第二篇', status=ArticleStatus.draft)
+    headers = auth_header(admin)
+
+    response = client.get('/api/admin/articles/export?status=published', headers=headers)
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'attachment' in response.headers['Content-Disposition']
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['title'] for row in rows] == ['第一篇']
+    assert rows[0]['content'] == '正文,带逗号\n换行'
+
+    response = client.get('/api/admin/articles/export?format=csv', headers=headers)
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True).lstrip('\ufeff'))))
+    assert [row['title'] for row in rows] == ['第一篇', '第二篇']
+    assert rows[0]['content'] == '正文,带逗号\n换行'
+
+    # 没有数据时仍输出表头
+    response = client.get('/api/admin/articles/export?format=csv&author_id=999', headers=headers)
+    assert response.get_data(as_text=True).lstrip('\ufeff').startswith('id,title')
+
+    assert client.get('/api/admin/articles/export?format=xml', headers=headers).status_code == 400
@@ -0,0 +1,92 @@
+from app.models import UserRole
+from tests.conftest import count_queries
+
+
+def test_article_list_embeds_author_on_request(client, make_user, make_article):
+    author = make_user('author')
+    make_article(author, title='第一篇')
+
+    plain = client.get('/api/articles/').get_json()['articles'][0]
+    expanded = client.get('/api/articles/?expand=author').get_json()['articles'][0]
+
+    assert 'author' not in plain
+    assert expanded['author'] == {'id': author.id, 'username': 'author', 'role': 'user'}
+
+
+def test_article_detail_embeds_author_on_request(client, make_user, make_article):
+    author = make_user('author')
+    article = make_article(author)
+
+    data = client.get(f'/api/articles/{article.id}?expand=author').get_json()
+
+    assert data['author']['username'] == 'author'
+
+
+def test_cursor_pagination_walks_all_articles_without_duplicates(client, make_user, make_article):
+    author = make_user('author')
+    created = [make_article(author, title=f'文章{i}').id for i in range(7)]
+
+    seen = []
+    cursor = ''
+    while True:
+        data = client.get(f'/api/articles/?cursor={cursor}&limit=3').get_json()
+        assert 'pages' not in data
+        seen.extend(article['id'] for article in data['articles'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    # 同一秒内创建的文章按 id 倒序排列，且不会重复或遗漏
+    assert seen == sorted(created, reverse=True)
+
+
+def test_cursor_pagination_reports_cached_total_on_request(client, make_user, make_article):
+    author = make_user('author')
+    for i in range(3):
+        make_article(author, title=f'文章{i}')
+
+    data = client.get('/api/articles/?cursor=&limit=2&with_total=1').get_json()
+
+    assert data['total'] == 3
+    assert len(data['articles']) == 2
+
+
+def test_cursor_pagination_rejects_malformed_cursor(client):
+    assert client.get('/api/articles/?cursor=not-a-cursor').status_code == 400
+
+
+def test_summary_view_never_reads_content_column(client, make_user, auth_header):
+    author = make_user('author')
+    client.post('/api/articles/', json={
+        'title': '长文',
+        'content': '# 标题\n\n' + '正文' * 500,
+        'status': 'published'
+    }, headers=auth_header(author))
+
+    with count_queries() as statements:
+        data = client.get('/api/articles/?view=summary').get_json()
+
+    article = data['articles'][0]
+    assert 'content' not in article
+    assert article['excerpt'].startswith('标题 正文正文')
+    assert article['excerpt'].endswith('...')
+    assert not any('articles.content' in statement for statement in statements)
+
+
+def test_fields_parameter_projects_requested_columns(client, make_user, make_article):
+    author = make_user('author')
+    make_article(author, title='投影')
+
+    article = client.get('/api/articles/?fields=title,status').get_json()['articles'][0]
+
+    assert article == {'id': article['id'], 'title': '投影', 'status': 'published'}
+    assert client.get('/api/articles/?fields=title,password').status_code == 400
+
+
+def test_update_article_refreshes_excerpt(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    article = make_article(admin, content='旧内容')
+
+    client.put(f'/api/articles/{article.id}', json={'content': '**新**内容'}, headers=auth_header(admin))
+
+    assert client.get(f'/api/articles/{article.id}').get_json()['excerpt'] == '新 内容'
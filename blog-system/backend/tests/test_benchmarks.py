@@ -0,0 +1,30 @@
+import os
+import sys
+
+from app import db
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import datagen  # noqa: E402
+import suite  # noqa: E402
+
+
+def test_generated_dataset_runs_every_scenario(tmp_path):
+    database_url = f'sqlite:///{tmp_path / "bench.db"}'
+    summary = datagen.generate(database_url, users=5, articles=30, comments=60, quiet=True)
+    assert (summary['users'], summary['articles'], summary['comments']) == (5, 30, 60)
+
+    app = datagen.make_app(database_url, RESPONSE_CACHE_BACKEND='none', LOGIN_RATE_LIMIT=0)
+    ctx, dataset = suite._load_context(app, seed=1)
+    assert dataset['comments'] == 60 and ctx.article_ids
+    with app.app_context():
+        # 批量写入后派生数据与数据表一致
+        from app.utils.stats import reconcile
+        assert reconcile() == {}
+        recorder = suite.SQLRecorder(db.engine)
+        db.session.remove()
+
+    for name in suite.SCENARIOS:
+        result = suite.run_scenario(app, recorder, ctx, name, iterations=2, concurrency=1, warmup=0, seed=1)
+        assert result['errors'] == 0, name
+        assert result['iterations'] == 2 and result['sql_per_iteration'] > 0
@@ -0,0 +1,145 @@
+from app import db
+from app.models import UserRole, Article, Comment, Tag, Category, IdempotencyKey
+from tests.conftest import count_queries
+
+
+def _counts(client, kind):
+    return {item['name']: item['count'] for item in client.get(f'/api/articles/{kind}').get_json()[kind]}
+
+
+def _reconcile_drift(client, headers):
+    return client.post('/api/admin/statistics/reconcile', headers=headers).get_json()['drift']
+
+
+def test_bulk_articles_report_errors_and_keep_side_tables_consistent(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = auth_header(admin)
+    items = [
+        {'title': '批量一', 'content': '数据库批量写入', 'author_id': admin.id, 'status': 'published',
+         'category': '技术', 'tags': ['python', 'flask']},
+        {'title': '', 'content': '缺少标题', 'author_id': admin.id},
+        {'title': '批量二', 'content': '草稿内容', 'author_id': admin.id, 'tags': ['python']},
+        {'title': '批量三', 'content': '作者不存在', 'author_id': 999},
+        {'title': '批量四', 'content': '另一篇已发布', 'author_id': admin.id, 'status': 'published',
+         'category': '技术', 'tags': ['python']},
+    ]
+    # 先读取一次列表，确认写入后缓存失效
+    assert client.get('/api/articles').get_json()['total'] == 0
+
+    response = client.post('/api/admin/articles/bulk', headers=headers, json={'articles': items})
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data['created'], data['failed']) == (3, 2)
+    assert [error['index'] for error in data['errors']] == [1, 3]
+    assert [item['index'] for item in data['articles']] == [0, 2, 4]
+
+    article = db.session.get(Article, data['articles'][0]['id'])
+    assert article.title == '批量一' and [tag.name for tag in article.tags] == ['python', 'flask']
+    assert article.excerpt == '数据库批量写入' and article.version == 1
+
+    assert client.get('/api/articles').get_json()['total'] == 2
+    assert _counts(client, 'tags') == {'python': 2, 'flask': 1}
+    assert _counts(client, 'categories') == {'技术': 2}
+    results = client.get('/api/articles/search', query_string={'q': '批量写入'}).get_json()['results']
+    assert [result['title'] for result in results] == ['批量一']
+    assert _reconcile_drift(client, headers) == {}
+
+
+def test_bulk_articles_are_written_in_chunks(app, client, make_user, auth_header):
+    app.config['BULK_CHUNK_SIZE'] = 20
+    admin = make_user('admin', role=UserRole.admin)
+    items = [{'title': f'文章{i}', 'content': '正文', 'author_id': admin.id, 'status': 'published', 'tags': ['t']}
+             for i in range(50)]
+    with count_queries() as statements:
+        response = client.post('/api/admin/articles/bulk', headers=auth_header(admin), json={'articles': items})
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 50
+    # 标签关联与计数每块批量写入一次
+    assert len([s for s in statements if s.startswith('INSERT INTO article_tags')]) == 3
+    assert len([s for s in statements if s.startswith('UPDATE tags')]) == 3
+    assert db.session.query(Tag.article_count).filter_by(name='t').scalar() == 50
+
+
+def test_bulk_comment_import(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = auth_header(admin)
+    article = make_article(admin)
+    assert client.get(f'/api/comments/?article_id={article.id}').get_json()['total'] == 0
+
+    response = client.post('/api/admin/comments/bulk', headers=headers, json={'comments': [
+        {'article_id': article.id, 'user_id': admin.id, 'content': '导入一', 'created_at': '2020-01-02T03:04:05'},
+        {'article_id': 999, 'user_id': admin.id, 'content': '文章不存在'},
+        {'article_id': article.id, 'user_id': admin.id, 'content': '导入二'},
+        {'article_id': article.id, 'user_id': admin.id, 'content': '  '},
+    ]})
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data['created'], data['failed']) == (2, 2)
+    assert [error['index'] for error in data['errors']] == [1, 3]
+
+    assert client.get(f'/api/comments/?article_id={article.id}').get_json()['total'] == 2
+    imported = Comment.query.filter_by(content='导入一').one()
+    assert imported.created_at.year == 2020
+    assert client.get('/api/admin/statistics', headers=headers).get_json()['total_comments'] == 2
+    assert _reconcile_drift(client, headers) == {}
+
+
+def test_bulk_idempotency_key_replays_response(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = {**auth_header(admin), 'Idempotency-Key': 'import-1'}
+    body = {'articles': [{'title': '幂等', 'content': '正文', 'author_id': admin.id}]}
+
+    first = client.post('/api/admin/articles/bulk', headers=headers, json=body)
+    assert first.status_code == 201
+    replay = client.post('/api/admin/articles/bulk', headers=headers, json=body)
+    assert replay.status_code == 201
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert replay.get_json() == first.get_json()
+    assert Article.query.count() == 1
+
+    # 同一个键用于不同的请求体
+    other = client.post('/api/admin/articles/bulk', headers=headers,
+                        json={'articles': [{'title': '其他', 'content': '正文', 'author_id': admin.id}]})
+    assert other.status_code == 422
+    assert Article.query.count() == 1
+
+    # 没有键时每次都会写入
+    client.post('/api/admin/articles/bulk', headers=auth_header(admin), json=body)
+    assert Article.query.count() == 2
+    assert IdempotencyKey.query.count() == 1
+
+
+def test_forbidden_request_does_not_claim_idempotency_key(client, make_user, auth_header):
+    user = make_user('user')
+    body = {'articles': [{'title': '标题', 'content': '正文', 'author_id': user.id}]}
+    response = client.post('/api/admin/articles/bulk', json=body,
+                           headers={**auth_header(user), 'Idempotency-Key': 'import-2'})
+    assert response.status_code == 403
+    assert IdempotencyKey.query.count() == 0
+
+    # 权限变更后用同一个键重试，正常执行而不是重放403
+    user.role = UserRole.admin
+    db.session.commit()
+    response = client.post('/api/admin/articles/bulk', json=body,
+                           headers={**auth_header(user), 'Idempotency-Key': 'import-2'})
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_bulk_requires_admin_and_valid_batch(app, client, make_user, auth_header):
+    app.config['BULK_MAX_ITEMS'] = 2
+    admin = make_user('admin', role=UserRole.admin)
+    user = make_user('user')
+    item = {'title': '标题', 'content': '正文', 'author_id': user.id}
+
+    assert client.post('/api/admin/articles/bulk', headers=auth_header(user),
+                       json={'articles': [item]}).status_code == 403
+    assert client.post('/api/admin/articles/bulk', headers=auth_header(admin),
+                       json={'articles': []}).status_code == 400
+    assert client.post('/api/admin/articles/bulk', headers=auth_header(admin),
+                       json={'articles': [item] * 3}).status_code == 400
+    response = client.post('/api/admin/comments/bulk', headers=auth_header(admin),
+                           json={'comments': [{'article_id': 1, 'user_id': user.id, 'content': '评论'}]})
+    assert response.status_code == 400
+    assert response.get_json()['failed'] == 1
+    assert Category.query.count() == 0
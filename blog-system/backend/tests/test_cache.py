@@ -0,0 +1,131 @@
+from app import cache
+from app.models import UserRole
+from app.utils.cache import LRUBackend, RedisBackend
+from tests.conftest import count_queries
+
+
+class FakeRedis:
+    """实现测试所需命令的内存版Redis客户端"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, pattern):
+        prefix = pattern.rstrip('*')
+        return [key for key in list(self.data) if key.startswith(prefix)]
+
+
+def test_article_detail_is_served_from_cache(client, make_user, make_article):
+    article = make_article(make_user('author'))
+    url = f'/api/articles/{article.id}'
+
+    first = client.get(url)
+    with count_queries() as statements:
+        second = client.get(url)
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert statements == []
+
+
+def test_cache_key_includes_query_parameters(client, make_user, make_article):
+    make_article(make_user('author'))
+
+    client.get('/api/articles/?per_page=5')
+
+    assert client.get('/api/articles/?per_page=6').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/articles/?per_page=5').headers['X-Cache'] == 'HIT'
+
+
+def test_comment_write_invalidates_only_that_articles_comments(client, make_user, make_article, auth_header):
+    user = make_user('reader')
+    article = make_article(user, title='一')
+    other = make_article(user, title='二')
+    client.get(f'/api/comments/?article_id={article.id}')
+    client.get(f'/api/comments/?article_id={other.id}')
+
+    client.post('/api/comments/', json={'article_id': article.id, 'content': '新评论'}, headers=auth_header(user))
+
+    refreshed = client.get(f'/api/comments/?article_id={article.id}')
+    assert refreshed.headers['X-Cache'] == 'MISS'
+    assert [c['content'] for c in refreshed.get_json()['comments']] == ['新评论']
+    assert client.get(f'/api/comments/?article_id={other.id}').headers['X-Cache'] == 'HIT'
+
+
+def test_article_update_invalidates_detail_and_lists(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    article = make_article(admin, title='旧标题')
+    client.get(f'/api/articles/{article.id}')
+    client.get('/api/articles/')
+
+    client.put(f'/api/articles/{article.id}', json={'title': '新标题'}, headers=auth_header(admin))
+
+    assert client.get(f'/api/articles/{article.id}').get_json()['title'] == '新标题'
+    assert client.get('/api/articles/').get_json()['articles'][0]['title'] == '新标题'
+
+
+def test_stats_endpoint_reports_hits_and_misses(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    article = make_article(admin)
+    cache.reset_stats()
+    client.get(f'/api/articles/{article.id}')
+    client.get(f'/api/articles/{article.id}')
+
+    stats = client.get('/api/admin/cache/stats', headers=auth_header(admin)).get_json()
+
+    assert stats['backend'] == 'lru'
+    assert stats['endpoints']['articles.get_article'] == {'hits': 1, 'misses': 1}
+    assert stats['hit_ratio'] == 0.5
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUBackend(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    backend.get('a')
+    backend.set('c', 3, ttl=60)
+
+    assert backend.get('a') == 1
+    assert backend.get('b') is None
+    assert backend.get('c') == 3
+
+
+def test_lru_backend_bounds_tag_versions():
+    backend = LRUBackend(max_entries=2, max_versions=2)
+    first = backend.get_versions(['article:1', 'article:2'])
+    backend.get_versions(['article:2'])
+    backend.bump_versions(['article:3'])
+
+    assert len(backend._versions) == 2
+    # 被淘汰的标签生成新版本号，引用旧版本的缓存条目不会再命中
+    assert backend.get_versions(['article:1']) != first[:1]
+    assert backend.get_versions(['article:3']) == backend.get_versions(['article:3'])
+
+
+def test_redis_backend_shares_versions_between_instances():
+    client = FakeRedis()
+    first, second = RedisBackend(client=client), RedisBackend(client=client)
+    first.set('key', (b'body', 200, []), ttl=60)
+    before = second.get_versions(['articles'])
+
+    first.bump_versions(['articles'])
+
+    assert second.get('key') == (b'body', 200, [])
+    assert second.get_versions(['articles']) != before
+    assert first.get_versions(['articles']) == second.get_versions(['articles'])
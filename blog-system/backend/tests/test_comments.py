@@ -0,0 +1,38 @@
+from tests.conftest import count_queries
+from app import db
+
+
+def _comment_page_queries(client, article_id, per_page):
+    """请求一页评论并返回执行的SQL数量"""
+    db.session.expire_all()
+    with count_queries() as statements:
+        response = client.get(f'/api/comments/?article_id={article_id}&per_page={per_page}')
+    assert response.status_code == 200
+    assert len(response.get_json()['comments']) == per_page
+    return len(statements)
+
+
+def test_comment_listing_includes_usernames(client, make_user, make_article, make_comment):
+    author = make_user('author')
+    reader = make_user('reader')
+    article = make_article(author)
+    make_comment(article, reader, '沙发')
+
+    response = client.get(f'/api/comments/?article_id={article.id}')
+
+    comment = response.get_json()['comments'][0]
+    assert comment['username'] == 'reader'
+    assert comment['content'] == '沙发'
+
+
+def test_comment_listing_query_count_is_independent_of_page_size(client, make_user, make_article, make_comment):
+    author = make_user('author')
+    article = make_article(author)
+    users = [make_user(f'user{i}') for i in range(20)]
+    for user in users:
+        make_comment(article, user)
+
+    small_page = _comment_page_queries(client, article.id, 2)
+    large_page = _comment_page_queries(client, article.id, 20)
+
+    assert small_page == large_page
@@ -0,0 +1,71 @@
+import gzip
+import json
+from unittest import mock
+
+from app.models import UserRole
+from app.utils import compression
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+def test_large_response_is_gzipped_with_weak_etag(client, make_user, make_article):
+    article = make_article(make_user('author'), content='正文内容。' * 500)
+    url = f'/api/articles/{article.id}'
+    plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+    response = client.get(url, headers=GZIP)
+
+    assert 'Content-Encoding' not in plain.headers
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(response.get_data()) < len(plain.get_data()) / 5
+    assert json.loads(gzip.decompress(response.get_data())) == plain.get_json()
+    assert response.headers['ETag'].startswith('W/')
+
+    # 压缩表示的弱ETag同样可以用于条件请求
+    revalidated = client.get(url, headers={**GZIP, 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_cache_hits_reuse_precompressed_body(client, make_user, make_article):
+    article = make_article(make_user('author'), content='正文内容。' * 500)
+    url = f'/api/articles/{article.id}'
+    first = client.get(url, headers=GZIP)
+    with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+        second = client.get(url, headers=GZIP)
+        identity = client.get(url)
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == first.get_data()
+    assert second.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in identity.headers
+    compress.assert_not_called()
+
+
+def test_small_or_refused_responses_are_not_compressed(client, make_user, make_article):
+    article = make_article(make_user('author'), content='短')
+    assert 'Content-Encoding' not in client.get(f'/api/articles/{article.id}', headers=GZIP).headers
+
+    article = make_article(make_user('writer'), content='正文内容。' * 500)
+    response = client.get(f'/api/articles/{article.id}', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_uncached_responses_are_compressed_on_the_fly(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    for index in range(30):
+        make_article(admin, title=f'文章{index}')
+    response = client.get('/api/admin/articles?per_page=30', headers={**auth_header(admin), **GZIP})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(response.get_data()))['articles']) == 30
+
+
+def test_export_is_compressed_while_streaming(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    for index in range(50):
+        make_article(admin, title=f'文章{index}')
+    response = client.get('/api/admin/articles/export?format=csv', headers={**auth_header(admin), **GZIP})
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    text = gzip.decompress(response.get_data()).decode('utf-8')
+    assert text.startswith('\ufeffid,title')
+    assert len(text.strip().splitlines()) == 51
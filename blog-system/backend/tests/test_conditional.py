@@ -0,0 +1,50 @@
+from app import cache
+from app.models import UserRole
+from tests.conftest import count_queries
+
+
+def test_article_detail_revalidates_without_loading_content(client, make_user, make_article):
+    article = make_article(make_user('author'))
+    url = f'/api/articles/{article.id}'
+    first = client.get(url)
+    cache.clear()
+
+    with count_queries() as statements:
+        revalidated = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+
+    assert first.headers['ETag']
+    assert first.headers['Last-Modified']
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert not any('articles.content' in statement for statement in statements)
+
+
+def test_article_detail_honours_if_modified_since(client, make_user, make_article):
+    article = make_article(make_user('author'))
+    first = client.get(f'/api/articles/{article.id}')
+
+    revalidated = client.get(f'/api/articles/{article.id}', headers={'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert revalidated.status_code == 304
+
+
+def test_article_update_changes_etag(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    article = make_article(admin)
+    etag = client.get(f'/api/articles/{article.id}').headers['ETag']
+
+    client.put(f'/api/articles/{article.id}', json={'title': '新标题'}, headers=auth_header(admin))
+    response = client.get(f'/api/articles/{article.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_list_endpoints_answer_matching_etag_with_304(client, make_user, make_article):
+    article = make_article(make_user('author'))
+    for url in ('/api/articles/', f'/api/comments/?article_id={article.id}'):
+        etag = client.get(url).headers['ETag']
+
+        # 第二次请求命中响应缓存，同样返回304
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        assert client.get(url, headers={'If-None-Match': '"other"'}).status_code == 200
@@ -0,0 +1,84 @@
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+
+from app import db
+from app.models import UserRole
+from app.utils.engine import InstrumentedQueuePool, engine_options
+
+
+def test_engine_options_by_database():
+    base = {
+        'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 8, 'max_overflow': 2, 'pool_recycle': 600},
+        'DB_STATEMENT_TIMEOUT_MS': 5000,
+    }
+
+    mysql = engine_options({**base, 'SQLALCHEMY_DATABASE_URI': 'mysql+pymysql://u:p@db/blog'})
+    assert mysql['pool_size'] == 8
+    assert mysql['poolclass'] is InstrumentedQueuePool
+    assert mysql['connect_args']['init_command'] == 'SET SESSION max_execution_time = 5000'
+
+    postgres = engine_options({**base, 'SQLALCHEMY_DATABASE_URI': 'postgresql://u:p@db/blog'})
+    assert postgres['connect_args']['options'] == '-c statement_timeout=5000'
+
+    memory = engine_options({**base, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    assert 'pool_size' not in memory and 'poolclass' not in memory
+
+
+def test_sqlite_pragmas_are_applied(app):
+    assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+    assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_memory_database_uses_static_pool():
+    from app import create_app
+    from app.config import Config
+
+    class MemoryConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+    app = create_app(MemoryConfig)
+    with app.app_context():
+        assert isinstance(db.engine.pool, StaticPool)
+
+
+def test_pool_stats_endpoint(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    db.engine.pool.reset_stats()
+    client.get('/api/articles')
+
+    stats = client.get('/api/admin/db/pool', headers=auth_header(admin)).get_json()
+    assert stats['pool_class'] == 'InstrumentedQueuePool'
+    assert stats['size'] == 5
+    assert stats['checkouts'] >= 1
+    assert stats['timeouts'] == 0
+    assert stats['wait_max_ms'] >= 0
+
+
+def test_pool_records_exhaustion():
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=0, timeout=0.05)
+    connection = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    connection.close()
+
+    stats = pool.stats()
+    assert stats['checkouts'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['checked_out'] == 0
+
+
+def test_import_does_not_change_logging_levels():
+    # 导入模块不修改全局日志配置，连接池日志级别在 init_engine 中设置
+    code = 'import logging, app.utils.engine; print(logging.getLogger("app.utils.engine").level)'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert output.strip() == str(logging.NOTSET)
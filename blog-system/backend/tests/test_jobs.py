@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Job
+from app.utils import jobs
+
+calls = []
+done = threading.Event()
+
+
+@jobs.handler('test_record')
+def record_job(value):
+    calls.append(value)
+    done.set()
+
+
+@jobs.handler('test_fail')
+def fail_job():
+    raise RuntimeError('下游服务不可用')
+
+
+def setup_function():
+    calls.clear()
+    done.clear()
+
+
+def test_job_is_enqueued_with_the_transaction(app):
+    jobs.enqueue('test_record', {'value': 1})
+    db.session.rollback()
+    assert Job.query.count() == 0
+
+    jobs.enqueue('test_record', {'value': 2})
+    db.session.commit()
+    assert jobs.job_counts() == {'pending': 1}
+
+    assert jobs.run_pending() == 1
+    assert calls == [2]
+    # 成功的任务被删除
+    assert Job.query.count() == 0
+
+
+def test_failed_job_is_retried_with_backoff(app):
+    app.config.update(JOB_MAX_ATTEMPTS=2, JOB_RETRY_BASE_SECONDS=60)
+    jobs.enqueue('test_fail')
+    db.session.commit()
+
+    assert jobs.run_pending() == 1
+    job = Job.query.one()
+    assert (job.status, job.attempts) == ('pending', 1)
+    assert 'RuntimeError: 下游服务不可用' in job.last_error
+    assert job.run_at > datetime.utcnow() + timedelta(seconds=50)
+    # 退避时间未到，不会再次执行
+    assert jobs.run_pending() == 0
+
+    job.run_at = datetime.utcnow()
+    db.session.commit()
+    assert jobs.run_pending() == 1
+    db.session.expire_all()
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert jobs.run_pending() == 0
+
+    assert jobs.retry_failed() == 1
+    db.session.expire_all()
+    assert (job.status, job.attempts) == ('pending', 0)
+    assert jobs.retry_delay(3, 10, 3600) == 40
+    assert jobs.retry_delay(20, 10, 3600) == 3600
+
+
+def test_job_is_claimed_once_and_reclaimed_after_lock_timeout(app):
+    jobs.enqueue('test_record', {'value': 1})
+    db.session.commit()
+
+    assert jobs._claim('worker-a') is not None
+    assert jobs._claim('worker-b') is None
+
+    # 执行者崩溃，认领超时后可以重新认领
+    job = Job.query.one()
+    job.locked_at = datetime.utcnow() - timedelta(seconds=app.config['JOB_LOCK_TIMEOUT'] + 1)
+    db.session.commit()
+    assert jobs.run_pending() == 1
+    assert calls == [1]
+    assert Job.query.count() == 0
+
+
+def test_worker_thread_runs_job_after_commit(app):
+    runner = jobs.JobRunner(app, workers=1, poll_seconds=60)
+    app.extensions['jobs'] = runner
+    try:
+        jobs.enqueue('test_record', {'value': 3})
+        db.session.commit()
+        # 提交后立即唤醒，不等待轮询间隔
+        assert done.wait(5)
+    finally:
+        runner.stop()
+    assert calls == [3]
+    # 停止后不会因新的请求或提交重新启动
+    runner.wake()
+    assert not any(thread.name.startswith('job-worker') for thread in threading.enumerate())
+
+
+def test_jobs_cli_commands(app):
+    jobs.enqueue('test_record', {'value': 4})
+    jobs.enqueue('test_fail', max_attempts=1)
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    assert 'pending: 2' in runner.invoke(args=['jobs-status']).output
+    assert '已执行 2 个任务' in runner.invoke(args=['jobs-worker', '--once']).output
+    assert calls == [4]
+    output = runner.invoke(args=['jobs-status']).output
+    assert 'pending: 0' in output and 'failed: 1' in output
+    assert '已重新排队 1 个任务' in runner.invoke(args=['jobs-retry']).output
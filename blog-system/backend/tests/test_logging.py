@@ -0,0 +1,100 @@
+import io
+import json
+import logging
+
+import pytest
+from flask import g
+
+from app import create_app, db
+from app.config import Config
+from app.models import UserRole
+from app.utils.log import NonBlockingQueueHandler, RequestContextFilter
+from app.utils.pagination import clear_count_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    """只为 admin 蓝图开启 DEBUG 日志且不采样"""
+    class LoggingConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+        LOG_BLUEPRINT_LEVELS = 'admin=DEBUG'
+        LOG_DEBUG_SAMPLE_RATE = 1.0
+        JOB_WORKERS = 0
+
+    app = create_app(LoggingConfig)
+    with app.app_context():
+        yield app
+        app.extensions['jobs'].stop()
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    clear_count_cache()
+
+
+def _capture(app):
+    stream = io.StringIO()
+    handler = app.extensions['logging']
+    handler.target.setStream(stream)
+
+    def lines():
+        handler.queue.join()  # 等待后台线程写出队列中的日志
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+    return lines
+
+
+def test_json_logs_carry_request_id_and_respect_blueprint_levels(app, client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    lines = _capture(app)
+
+    response = client.get('/api/admin/users', headers={**auth_header(admin), 'X-Request-ID': 'req-123'})
+    assert response.headers['X-Request-ID'] == 'req-123'
+    records = [record for record in lines() if record['logger'] == 'app.routes.admin']
+    assert records and all(record['level'] == 'DEBUG' for record in records)
+    assert {record['request_id'] for record in records} == {'req-123'}
+    assert records[0]['endpoint'] == 'admin.get_all_users'
+    assert records[0]['path'] == '/api/admin/users'
+
+    # 其他蓝图仍使用默认级别
+    assert not logging.getLogger('app.routes.auth').isEnabledFor(logging.DEBUG)
+
+
+def test_invalid_request_id_is_replaced(client):
+    response = client.get('/api/articles/tags', headers={'X-Request-ID': 'bad id'})
+    assert response.headers['X-Request-ID'] != 'bad id'
+    assert len(response.headers['X-Request-ID']) == 32
+
+
+def test_exceptions_are_serialized(app):
+    lines = _capture(app)
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logging.getLogger('app.test').exception('失败')
+    record = lines()[-1]
+    assert record['message'] == '失败'
+    assert record['request_id'] == '-'
+    assert 'ValueError: boom' in record['exc_info']
+
+
+def test_debug_sampling_is_per_request(app):
+    record = logging.LogRecord('app.routes.admin', logging.DEBUG, __file__, 1, 'debug', None, None)
+    assert not RequestContextFilter(0.0).filter(record)
+    sampler = RequestContextFilter(0.5)
+    decisions = set()
+    for index in range(50):
+        with app.test_request_context():
+            g.request_id = f'request-{index}'
+            first = sampler.filter(record)
+            assert all(sampler.filter(record) == first for _ in range(3))
+            decisions.add(first)
+    assert decisions == {True, False}
+    # 非DEBUG日志不采样
+    assert RequestContextFilter(0.0).filter(logging.LogRecord('app', logging.INFO, __file__, 1, 'info', None, None))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(1, logging.StreamHandler(io.StringIO()))
+    handler.stop()
+    for _ in range(3):
+        handler.emit(logging.LogRecord('app', logging.INFO, __file__, 1, 'x', None, None))
+    assert handler.dropped == 2
@@ -0,0 +1,65 @@
+import logging
+import re
+
+from app.models import UserRole
+
+
+def _metric(body, name, **labels):
+    """从Prometheus文本中读取指定标签的值"""
+    for line in body.splitlines():
+        if line.startswith(name + '{') and all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_metrics_record_latency_sql_and_size(app, client, make_user, make_article):
+    app.config['METRICS_ALLOWED_IPS'] = '127.0.0.1'
+    author = make_user('author')
+    for index in range(3):
+        make_article(author, title=f'文章{index}')
+    client.get('/api/articles?per_page=10')
+    client.get('/api/articles?per_page=10')
+    client.get('/api/articles/999')
+
+    body = client.get('/metrics').get_data(as_text=True)
+    endpoint = 'articles.get_articles'
+    assert _metric(body, 'blog_http_requests_total', endpoint=endpoint, method='GET', status=200) == 2
+    assert _metric(body, 'blog_http_request_duration_seconds_count', endpoint=endpoint) == 2
+    # 第二次请求命中响应缓存，不执行SQL
+    assert _metric(body, 'blog_http_request_sql_statements_bucket', endpoint=endpoint, le=0) == 1
+    assert _metric(body, 'blog_http_request_sql_statements_sum', endpoint=endpoint) >= 1
+    assert _metric(body, 'blog_http_response_size_bytes_sum', endpoint=endpoint) > 0
+    assert _metric(body, 'blog_http_requests_total', endpoint='articles.get_article', status=404) == 1
+    assert _metric(body, 'blog_db_pool_checkouts', bind='primary') >= 1
+    # /metrics 自身不计入
+    assert 'endpoint="metrics"' not in body
+
+
+def test_metrics_require_token_or_allowed_ip(app, client):
+    # 默认不开放
+    assert client.get('/metrics').status_code == 403
+
+    app.config['METRICS_TOKEN'] = 'secret'
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+
+    app.config['METRICS_ALLOWED_IPS'] = '10.0.0.0/8, 127.0.0.0/8'
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '192.168.1.5'}).status_code == 401
+
+
+def test_slow_query_log_has_call_site(app, client, make_user, auth_header, caplog):
+    admin = make_user('admin', role=UserRole.admin)
+    app.config['SLOW_QUERY_MS'] = 0.000001
+    with caplog.at_level(logging.WARNING, logger='app.slow_query'):
+        client.get('/api/articles/categories')
+    records = [record for record in caplog.records if record.name == 'app.slow_query']
+    assert records
+    assert re.search(r'app/routes/articles\.py:\d+ in get_categories', records[0].getMessage())
+
+    app.config['SLOW_QUERY_MS'] = 0
+    queries = client.get('/api/admin/db/slow-queries', headers=auth_header(admin)).get_json()['queries']
+    assert queries[-1]['endpoint'] == 'articles.get_categories'
+    assert 'SELECT' in queries[-1]['statement']
@@ -0,0 +1,67 @@
+from app import db
+from app.models import User
+from app.utils import auth
+
+
+def _login(client, username='alice', password='password'):
+    return client.post('/api/auth/login', json={'username': username, 'password': password})
+
+
+def test_login_upgrades_outdated_hash(app, client, make_user):
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    alice = make_user('alice')
+    assert alice.password_hash.startswith('pbkdf2:sha256:1000$')
+
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    assert _login(client).status_code == 200
+    db.session.expire_all()
+    upgraded = db.session.get(User, alice.id).password_hash
+    assert upgraded.startswith('pbkdf2:sha256:2000$')
+
+    # 参数未变化时不再重新计算
+    assert _login(client).status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, alice.id).password_hash == upgraded
+
+
+def test_login_rate_limit_per_ip(app, client, make_user):
+    app.config['LOGIN_RATE_LIMIT'] = 3
+    make_user('alice')
+    assert [_login(client, password='wrong').status_code for _ in range(3)] == [401, 401, 401]
+
+    response = _login(client)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 60
+
+    other = client.post('/api/auth/login', json={'username': 'alice', 'password': 'password'},
+                        environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+
+def test_saturated_hash_pool_returns_503(app, client, make_user):
+    make_user('alice')
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=0)
+    _, slots = auth._get_executor()
+    # 唯一的名额被占用时登录立即返回503，而不是排队等待
+    assert slots.acquire(blocking=False)
+    try:
+        response = _login(client)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        slots.release()
+    assert _login(client).status_code == 200
+
+
+def test_login_rate_limit_survives_response_cache_churn(app, client, make_user):
+    app.config['LOGIN_RATE_LIMIT'] = 3
+    make_user('alice')
+    cache = app.extensions['response_cache']
+    cache.backend.max_entries = 16
+    for attempt in range(3):
+        assert _login(client, password='wrong').status_code == 401
+        # 大量不同查询参数的公开请求会把响应缓存中的旧条目挤出，但不影响登录计数
+        for index in range(32):
+            client.get(f'/api/articles?x={attempt}-{index}')
+    assert cache.backend.size() <= 16
+    assert _login(client).status_code == 429
@@ -0,0 +1,91 @@
+from sqlalchemy import inspect, text
+
+from app import db
+from app.models import UserRole, ArticleStatus
+from app.schema import upgrade_schema
+from app.utils.query_plan import capture_queries, find_problems, plan_problems
+
+# 已知且可以接受的问题语句（按SQL片段匹配），新增条目需要说明原因
+ALLOWED = {
+    # 单篇文章的标签只有几条，排序开销可以忽略
+    'FROM tags, article_tags WHERE': '单篇文章的标签排序',
+    # 不筛选状态时只能使用作者前缀，排序范围限于同一作者的文章
+    'WHERE articles.author_id = ? ORDER BY': '个人文章列表（不筛选状态）',
+    # 页码模式的用户列表按主键顺序扫描到 OFFSET 位置，没有额外排序
+    'FROM users LIMIT': '用户列表页码分页',
+}
+
+
+def _problems(client, path, headers=None):
+    with capture_queries() as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, path
+    assert statements, path
+    return [
+        (' '.join(statement.split()), problems, plan)
+        for statement, problems, plan in find_problems(statements)
+        if not any(fragment in ' '.join(statement.split()) for fragment in ALLOWED)
+    ]
+
+
+def test_hot_queries_use_indexes(client, make_user, make_article, make_comment, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    author = make_user('author')
+    articles = [make_article(author, title=f'文章{i}', category='技术', tags=[])
+                for i in range(6)]
+    make_article(author, title='草稿', status=ArticleStatus.draft)
+    for i in range(6):
+        make_comment(articles[0], admin, content=f'评论{i}')
+
+    page = client.get('/api/articles?cursor=&limit=2').get_json()
+    comments = client.get(f'/api/comments/?article_id={articles[0].id}&cursor=&limit=2').get_json()
+    users = client.get('/api/admin/users?cursor=&limit=1', headers=auth_header(admin)).get_json()
+    mine = client.get('/api/auth/profile/articles?status=published&cursor=&limit=2',
+                      headers=auth_header(author)).get_json()
+    paths = [
+        ('/api/articles?page=2&per_page=2', None),
+        (f"/api/articles?cursor={page['next_cursor']}&limit=2", None),
+        ('/api/articles?category=技术', None),
+        (f'/api/articles/{articles[0].id}', None),
+        (f'/api/comments/?article_id={articles[0].id}&page=2&per_page=2', None),
+        (f"/api/comments/?article_id={articles[0].id}&cursor={comments['next_cursor']}&limit=2", None),
+        ('/api/comments/', None),
+        ('/api/auth/profile/articles', auth_header(author)),
+        ('/api/auth/profile/articles?status=draft', auth_header(author)),
+        (f"/api/auth/profile/articles?status=published&cursor={mine['next_cursor']}&limit=2",
+         auth_header(author)),
+        ('/api/admin/articles?page=1', auth_header(admin)),
+        ('/api/admin/articles?status=draft', auth_header(admin)),
+        ('/api/admin/users?page=1', auth_header(admin)),
+        (f"/api/admin/users?cursor={users['next_cursor']}&limit=1", auth_header(admin)),
+    ]
+    for path, headers in paths:
+        assert _problems(client, path, headers) == [], path
+
+
+def test_plan_problems_detects_scans_and_sorts():
+    tables = {'articles', 'tags'}
+    assert plan_problems('sqlite', ['SCAN articles', 'USE TEMP B-TREE FOR ORDER BY'], tables) == \
+        ['全表扫描 articles', '额外排序']
+    assert plan_problems('sqlite', ['SCAN articles USING INDEX idx_articles_created_at'], tables) == []
+    # 小表与子查询结果不算问题
+    assert plan_problems('sqlite', ['SCAN tags', 'USE TEMP B-TREE FOR ORDER BY'], tables) == []
+    assert plan_problems('sqlite', ['SCAN anon_1'], tables) == []
+    assert plan_problems('mysql', [{'table': 'articles', 'type': 'ALL', 'Extra': 'Using where; Using filesort'}],
+                         tables) == ['全表扫描 articles', '额外排序']
+    assert plan_problems('mysql', [{'table': 'articles', 'type': 'ref', 'Extra': 'Using index condition'}],
+                         tables) == []
+
+
+def test_upgrade_replaces_single_column_indexes(app):
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP INDEX idx_comments_article_created_at'))
+        conn.execute(text('CREATE INDEX idx_comments_article_id ON comments(article_id)'))
+        conn.execute(text('CREATE INDEX idx_articles_status ON articles(status)'))
+
+    upgrade_schema()
+
+    comment_indexes = {index['name'] for index in inspect(db.engine).get_indexes('comments')}
+    assert 'idx_comments_article_created_at' in comment_indexes
+    assert 'idx_comments_article_id' not in comment_indexes
+    assert 'idx_articles_status' not in {index['name'] for index in inspect(db.engine).get_indexes('articles')}
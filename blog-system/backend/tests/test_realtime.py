@@ -0,0 +1,117 @@
+import threading
+
+from app.models import ArticleStatus, UserRole
+from app.utils import realtime
+
+
+def _stream(client, article_id, headers=None):
+    response = client.get(f'/api/articles/{article_id}/comments/stream', headers=headers)
+    return response, iter(response.response)
+
+
+def _next(frames):
+    frame = next(frames)
+    return frame.decode() if isinstance(frame, bytes) else frame
+
+
+def test_stream_delivers_comment_events(app, client, make_user, make_article, auth_header):
+    app.config.update(SSE_HEARTBEAT_SECONDS=0.05, SSE_MAX_DURATION=5)
+    author = make_user('author')
+    article = make_article(author)
+
+    response, frames = _stream(client, article.id)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert _next(frames) == 'retry: 3000\n\n'
+
+    created = client.post('/api/comments/', headers=auth_header(author),
+                          json={'article_id': article.id, 'content': '实时评论'}).get_json()
+    frame = _next(frames)
+    assert frame.startswith(f'id: {created["id"]}\nevent: comment\ndata: ')
+    assert '"content":"实时评论"' in frame and '"username":"author"' in frame
+
+    client.post(f'/api/articles/{article.id}/comments', headers=auth_header(author), json={'content': '第二条'})
+    assert '"content":"第二条"' in _next(frames)
+
+    admin = make_user('admin', role=UserRole.admin)
+    assert client.delete(f'/api/comments/{created["id"]}', headers=auth_header(admin)).status_code == 200
+    assert _next(frames) == f'event: comment_deleted\ndata: {{"id":{created["id"]}}}\n\n'
+
+    # 其他文章的评论不会推送，没有事件时发送心跳
+    other = make_article(author, title='其他')
+    client.post('/api/comments/', headers=auth_header(author), json={'article_id': other.id, 'content': '无关'})
+    assert _next(frames) == ': keep-alive\n\n'
+
+    response.close()
+    assert realtime.broker().subscribers == 0
+
+
+def test_reconnect_replays_missed_comments(app, client, make_user, make_article, make_comment):
+    author = make_user('author')
+    article = make_article(author)
+    first = make_comment(article, author, content='已读')
+    missed = make_comment(article, author, content='错过的评论')
+
+    response, frames = _stream(client, article.id, headers={'Last-Event-ID': str(first.id)})
+    _next(frames)
+    frame = _next(frames)
+    assert frame.startswith(f'id: {missed.id}\nevent: comment\n') and '错过的评论' in frame
+    response.close()
+
+    # 错过的评论过多时要求客户端重新拉取列表
+    app.config['SSE_REPLAY_LIMIT'] = 1
+    make_comment(article, author, content='又一条')
+    response, frames = _stream(client, article.id, headers={'Last-Event-ID': str(first.id)})
+    _next(frames)
+    assert _next(frames) == 'event: resync\ndata: {}\n\n'
+    response.close()
+
+
+def test_stream_access_and_connection_limit(app, client, make_user, make_article):
+    author = make_user('author')
+    article = make_article(author)
+    draft = make_article(author, status=ArticleStatus.draft)
+    assert client.get('/api/articles/999/comments/stream').status_code == 404
+    assert client.get(f'/api/articles/{draft.id}/comments/stream').status_code == 403
+
+    app.config['SSE_MAX_CONNECTIONS'] = 1
+    response, _ = _stream(client, article.id)
+    rejected = client.get(f'/api/articles/{article.id}/comments/stream')
+    assert rejected.status_code == 503 and rejected.headers['Retry-After'] == '30'
+    # 响应体尚未开始生成就关闭连接时同样取消订阅
+    response.close()
+    assert realtime.broker().subscribers == 0
+
+
+def test_connection_limit_is_atomic():
+    broker = realtime.LocalBroker()
+    start = threading.Barrier(20)
+    results = []
+
+    def connect():
+        start.wait()
+        results.append(broker.try_subscribe('channel', limit=5))
+
+    threads = [threading.Thread(target=connect) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(subscription is not None for subscription in results) == 5
+    assert broker.subscribers == 5
+
+
+def test_slow_subscriber_is_asked_to_resync():
+    broker = realtime.LocalBroker(queue_size=2)
+    fast = broker.subscribe('channel')
+    slow = broker.subscribe('channel')
+    frames = realtime.stream(slow, heartbeat=0.01, max_duration=1)
+    assert next(frames).startswith('retry:')
+
+    for i in range(3):
+        broker.publish('channel', realtime.format_event('comment', f'{{"id":{i}}}', i))
+    # 每次发布只格式化一次，所有订阅者收到同一帧
+    assert fast.get(0) is slow._queue.queue[0]
+    assert next(frames) == 'event: resync\ndata: {}\n\n'
+    assert list(frames) == []
+    assert broker.subscribers == 1
@@ -0,0 +1,129 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import Article, RenderedContent, UserRole
+from app.utils import jobs, markdown, rendering
+from app.utils.markdown import render_markdown
+
+SOURCE = '简介段落\n\n## 安装\n运行 `pip install`，详见[文档](https://example.com "说明")。\n\n## 安装\n- 第一步\n- **第二步**'
+
+
+def test_render_markdown_builds_toc_and_reading_time():
+    rendered = render_markdown(SOURCE)
+    assert '<h2 id="安装">安装</h2>' in rendered.html
+    assert '<h2 id="安装-1">安装</h2>' in rendered.html
+    assert '<code>pip install</code>' in rendered.html
+    assert '<a href="https://example.com" title="说明" rel="nofollow noopener">文档</a>' in rendered.html
+    assert '<ul>\n<li>第一步</li>\n<li><strong>第二步</strong></li>\n</ul>' in rendered.html
+    assert rendered.toc == [{'level': 2, 'text': '安装', 'id': '安装'}, {'level': 2, 'text': '安装', 'id': '安装-1'}]
+    assert rendered.reading_minutes == 1
+    assert render_markdown('字' * 1000).reading_minutes == 3
+
+
+def test_render_markdown_escapes_html_and_unsafe_urls():
+    rendered = render_markdown(
+        '<script>alert(1)</script>\n\n[点我](javascript:alert(1)) ![图](data:image/png;base64,xx) '
+        '[链接](/articles/1 "a\\" onmouseover=\\"x")\n\n```html\n<b>代码</b>\n```'
+    )
+    assert '<script>' not in rendered.html
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in rendered.html
+    assert 'javascript:' not in rendered.html and 'data:' not in rendered.html
+    assert '点我' in rendered.html and '图' in rendered.html
+    assert 'onmouseover="' not in rendered.html
+    assert '<pre><code class="language-html">&lt;b&gt;代码&lt;/b&gt;\n</code></pre>' in rendered.html
+
+
+def test_render_markdown_rejects_urls_with_control_characters():
+    # 浏览器会忽略URL中的制表符、换行和C0控制字符，以下地址都会按 javascript: 执行
+    for source in ('[x](java&#09;script:alert(1))', '![a](java&#10;script:alert(1))',
+                   '[x](\x01javascript:alert(1))', '[x](&#x20;javascript:alert(1))'):
+        rendered = render_markdown(source).html
+        assert 'href=' not in rendered and 'src=' not in rendered, source
+        assert 'x' in rendered or 'a' in rendered
+
+
+def test_render_markdown_gfm_extensions_and_images():
+    rendered = render_markdown('| 名称 | 数量 |\n|:--|--:|\n| ~~旧~~ | 2 |\n\n![封面 **图**](/a.png "标题")')
+    assert '<th style="text-align:left">名称</th>' in rendered.html
+    assert '<td style="text-align:right">2</td>' in rendered.html
+    assert '<s>旧</s>' in rendered.html
+    assert '<img src="/a.png" alt="封面 图" title="标题" loading="lazy">' in rendered.html
+
+
+def test_rendered_html_is_sanitized_by_allowlist():
+    assert markdown.sanitize('<p onclick="x()">文字<script>alert(1)</script></p>') == '<p>文字</p>'
+    assert markdown.sanitize('<a href="java\tscript:alert(1)">x</a>') == '<a rel="nofollow noopener">x</a>'
+    assert markdown.sanitize('<table><tr><td style="text-align:left;background:url(x)">1</td></tr></table>') == \
+        '<table><tbody><tr><td style="text-align:left">1</td></tr></tbody></table>'
+
+
+def test_article_html_format_is_rendered_once_per_content(client, make_user, auth_header, monkeypatch):
+    calls = []
+    original = rendering.render_markdown
+    monkeypatch.setattr(rendering, 'render_markdown', lambda source: calls.append(source) or original(source))
+    author = make_user('author', role=UserRole.admin)
+    headers = auth_header(author)
+
+    article_id = client.post('/api/articles/', headers=headers, json={
+        'title': '标题', 'content': SOURCE, 'status': 'published'
+    }).get_json()['article_id']
+    # 写接口只加入渲染任务，由后台任务渲染
+    assert len(calls) == 0
+    assert jobs.run_pending() == 1
+    assert len(calls) == 1
+
+    data = client.get(f'/api/articles/{article_id}?format=html').get_json()
+    assert 'content' not in data
+    assert data['title'] == '标题' and data['html'].startswith('<p>简介段落</p>')
+    assert [entry['id'] for entry in data['toc']] == ['安装', '安装-1']
+    assert data['reading_minutes'] == 1 and data['word_count'] > 0
+    assert client.get(f'/api/articles/{article_id}').get_json()['content'] == SOURCE
+    assert client.get(f'/api/articles/{article_id}?format=pdf').status_code == 400
+
+    # 只修改标题不会重新渲染
+    client.put(f'/api/articles/{article_id}', headers=headers, json={'title': '新标题'})
+    assert jobs.run_pending() == 0
+    assert len(calls) == 1
+    assert client.get(f'/api/articles/{article_id}?format=html').get_json()['title'] == '新标题'
+
+    # 修改正文后重新渲染，旧的渲染结果被删除
+    old_hash = db.session.get(Article, article_id).content_hash
+    client.put(f'/api/articles/{article_id}', headers=headers, json={'content': '# 新正文'})
+    jobs.run_pending()
+    assert len(calls) == 2
+    assert db.session.get(RenderedContent, old_hash) is None
+    data = client.get(f'/api/articles/{article_id}?format=html').get_json()
+    assert data['html'] == '<h1 id="新正文">新正文</h1>'
+    assert len(calls) == 2
+
+
+def test_identical_content_shares_rendered_result(client, make_user, make_article):
+    author = make_user('author')
+    first = make_article(author, content='同样的正文')
+    second = make_article(author, content='同样的正文')
+    assert first.content_hash == second.content_hash
+    jobs.run_pending()
+    assert RenderedContent.query.count() == 1
+
+    # 仍被另一篇文章使用的渲染结果不会删除
+    db.session.delete(first)
+    db.session.commit()
+    assert RenderedContent.query.count() == 1
+    db.session.delete(second)
+    db.session.commit()
+    assert RenderedContent.query.count() == 0
+
+
+def test_missing_rendered_result_is_generated_on_read(client, make_user):
+    author = make_user('author')
+    # 绕过ORM写入的文章没有 content_hash 和渲染结果
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO articles (title, content, author_id, status, version) "
+            f"VALUES ('导入', '**导入的正文**', {author.id}, 'published', 1)"
+        ))
+    article_id = db.session.execute(text('SELECT id FROM articles')).scalar()
+
+    data = client.get(f'/api/articles/{article_id}?format=html').get_json()
+    assert data['html'] == '<p><strong>导入的正文</strong></p>'
+    assert db.session.get(RenderedContent, rendering.content_hash('**导入的正文**')) is not None
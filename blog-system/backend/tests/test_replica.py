@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import text
+
+from app import create_app, db
+from app.config import Config
+from app.models import UserRole
+from app.utils.pagination import clear_count_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    """主库与只读库分别使用两个SQLite文件，只读库中的数据与主库不同，便于区分查询去向"""
+    class ReplicaConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "primary.db"}'
+        SQLALCHEMY_BINDS = {'replica': f'sqlite:///{tmp_path / "replica.db"}'}
+        JOB_WORKERS = 0  # 不启动后台任务线程
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        replica = db.engines['replica']
+        db.metadata.create_all(replica)
+        with replica.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO users (id, username, email, password_hash, role) "
+                "VALUES (1, 'replica_user', 'replica@example.com', '-', 'user')"
+            ))
+            conn.execute(text(
+                "INSERT INTO articles (title, content, excerpt, author_id, status) "
+                "VALUES ('只读库文章', '正文', '正文', 1, 'published')"
+            ))
+        yield app
+        app.extensions['jobs'].stop()
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    clear_count_cache()
+
+
+def _titles(client, headers=None, query=''):
+    response = client.get(f'/api/articles?view=summary{query}', headers=headers or {})
+    return [article['title'] for article in response.get_json()['articles']], response
+
+
+def test_reads_use_replica_and_writes_use_primary(app, client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    assert _titles(client)[0] == ['只读库文章']
+    assert client.get('/api/auth/users/1').get_json()['username'] == 'replica_user'
+
+    response = client.post('/api/articles/', headers=auth_header(admin), json={
+        'title': '主库文章', 'content': '正文', 'status': 'published'
+    })
+    assert response.status_code == 201
+    with db.engines['replica'].connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM articles')).scalar() == 1
+
+
+def test_writer_is_pinned_to_primary(app, client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    client.post('/api/articles/', headers=auth_header(admin), json={
+        'title': '主库文章', 'content': '正文', 'status': 'published'
+    })
+
+    # 写入方在读己之写窗口内读取主库
+    assert _titles(client, auth_header(admin))[0] == ['主库文章']
+    # 其他请求方仍读取只读库，且窗口内只读库的响应不写入缓存
+    titles, response = _titles(client, query='&anonymous=1')
+    assert titles == ['只读库文章']
+    _, response = _titles(client, query='&anonymous=1')
+    assert response.headers['X-Cache'] == 'MISS'
+
+
+def test_pin_survives_response_cache_churn(app, client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    cache = app.extensions['response_cache']
+    cache.backend.max_entries = 8
+    client.post('/api/articles/', headers=auth_header(admin), json={
+        'title': '主库文章', 'content': '正文', 'status': 'published'
+    })
+    # 大量其他请求把响应缓存中的旧条目挤出，写入方仍固定读取主库
+    for index in range(32):
+        _titles(client, query=f'&page={index}')
+    assert _titles(client, auth_header(admin))[0] == ['主库文章']
+
+
+def test_pinning_can_be_disabled(app, client, make_user, auth_header):
+    app.config['READ_YOUR_WRITES_SECONDS'] = 0
+    admin = make_user('admin', role=UserRole.admin)
+    client.post('/api/articles/', headers=auth_header(admin), json={
+        'title': '主库文章', 'content': '正文', 'status': 'published'
+    })
+    assert _titles(client, auth_header(admin))[0] == ['只读库文章']
+    # 没有最近写入时只读库的响应正常缓存
+    _titles(client)
+    assert _titles(client)[1].headers['X-Cache'] == 'HIT'
@@ -0,0 +1,33 @@
+from sqlalchemy import inspect, text
+
+from app import db
+from app.schema import upgrade_schema
+
+
+def test_upgrade_adds_excerpt_column_and_backfills(app, make_user):
+    author = make_user('author')
+    with db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE articles DROP COLUMN excerpt'))
+        conn.execute(text(
+            "INSERT INTO articles (title, content, author_id, status) "
+            f"VALUES ('旧文章', '## 历史\n正文', {author.id}, 'published')"
+        ))
+
+    upgrade_schema()
+
+    assert 'excerpt' in {column['name'] for column in inspect(db.engine).get_columns('articles')}
+    assert db.session.execute(text('SELECT excerpt FROM articles')).scalar() == '历史 正文'
+
+
+def test_upgrade_backfills_excerpts_imported_after_column_exists(app, make_user):
+    author = make_user('author')
+    # 列已存在，通过SQL脚本导入的文章没有摘要
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO articles (title, content, author_id, status) "
+            f"VALUES ('导入文章', '**导入** 的正文', {author.id}, 'published')"
+        ))
+
+    upgrade_schema()
+
+    assert db.session.execute(text('SELECT excerpt FROM articles')).scalar() == '导入 的正文'
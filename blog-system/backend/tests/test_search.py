@@ -0,0 +1,84 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import ArticleStatus, UserRole
+from app.utils.content import make_excerpt
+from app.utils.search import make_snippet, rebuild_index
+
+
+def _search(client, q):
+    response = client.get('/api/articles/search', query_string={'q': q})
+    assert response.status_code == 200
+    return response.get_json()['results']
+
+
+def test_search_matches_chinese_substrings_with_snippet(client, make_user, make_article):
+    author = make_user('author')
+    make_article(author, title='Python数据科学入门', content='## NumPy基础\nNumPy是Python科学计算的基础库')
+    make_article(author, title='前端性能优化技巧', content='前端性能对于用户体验至关重要')
+
+    results = _search(client, '科学计算')
+
+    assert [r['title'] for r in results] == ['Python数据科学入门']
+    assert '<mark>科学计算</mark>' in results[0]['snippet']
+    assert [r['title'] for r in _search(client, '性能 体验')] == ['前端性能优化技巧']
+    assert _search(client, '数据 体验') == []
+
+
+def test_search_ranks_title_matches_first_and_skips_drafts(client, make_user, make_article):
+    author = make_user('author')
+    make_article(author, title='随笔', content='顺便提一下Flask')
+    make_article(author, title='Flask入门教程', content='Flask是一个轻量级的Web框架')
+    make_article(author, title='Flask草稿', content='Flask', status=ArticleStatus.draft)
+
+    results = _search(client, 'flask')
+
+    assert [r['title'] for r in results] == ['Flask入门教程', '随笔']
+    assert results[0]['score'] >= results[1]['score']
+
+
+def test_index_follows_updates_and_deletes(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    article = make_article(admin, title='旧标题', content='旧内容')
+
+    client.put(f'/api/articles/{article.id}', json={'content': '全新的正文'}, headers=auth_header(admin))
+    assert _search(client, '旧内容') == []
+    assert len(_search(client, '全新')) == 1
+
+    client.delete(f'/api/articles/{article.id}', headers=auth_header(admin))
+    assert _search(client, '全新') == []
+    assert db.session.execute(text('SELECT count(*) FROM articles_fts')).scalar() == 0
+
+
+def test_rebuild_index_covers_existing_rows(client, make_user, make_article):
+    make_article(make_user('author'), title='数据库设计最佳实践')
+    db.session.execute(text('DELETE FROM articles_fts'))
+    db.session.commit()
+
+    rebuild_index()
+
+    assert len(_search(client, '最佳实践')) == 1
+
+
+def test_like_fallback_writes_without_fts_table(app, client, make_user, make_article, auth_header):
+    # SQLite未编译FTS5时不存在 articles_fts 表，文章写入不应访问它
+    db.session.execute(text('DROP TABLE articles_fts'))
+    db.session.commit()
+    app.extensions['search_backend'] = 'like'
+    admin = make_user('admin', role=UserRole.admin)
+    article = make_article(admin, title='回退检索', content='旧内容')
+
+    client.put(f'/api/articles/{article.id}', json={'content': '全新的正文'}, headers=auth_header(admin))
+    assert [r['title'] for r in _search(client, '全新')] == ['回退检索']
+    assert client.delete(f'/api/articles/{article.id}', headers=auth_header(admin)).status_code == 200
+
+
+def test_search_rejects_empty_query(client):
+    assert client.get('/api/articles/search?q=%20').status_code == 400
+    assert client.get('/api/articles/search?q=%22%2A').get_json()['results'] == []
+
+
+def test_snippet_strips_markup_like_excerpt():
+    content = '## 安装\n详见[官方文档](https://example.com)与![截图](/a.png)。\n```\ncode\n```'
+    assert make_snippet(content, ['文档']) == '安装 详见官方<mark>文档</mark>与截图。'
+    assert make_excerpt(content) == '安装 详见官方文档与截图。'
@@ -0,0 +1,51 @@
+import datetime
+
+from flask import Flask
+
+from app.models import Article, ArticleStatus, Tag, UserRole
+from app.serializers import articles, ARTICLE_SUMMARY_FIELDS
+from app.utils.fastjson import FastJSONProvider, dumps, loads
+
+
+def _article():
+    return Article(id=7, title='标题', content='正文', excerpt='摘要', author_id=3, status=ArticleStatus.draft,
+                   category='技术', tags=[Tag(name='python'), Tag(name='flask')],
+                   created_at=datetime.datetime(2024, 5, 1, 8, 30, 15, 123456), updated_at=None)
+
+
+def test_field_plans_match_model_values():
+    data = articles.dump(_article())
+    assert set(data) == set(articles.names)
+    assert data['tags'] == ['python', 'flask']
+    assert data['status'] is ArticleStatus.draft
+    assert articles.plan(ARTICLE_SUMMARY_FIELDS) is articles.plan(list(ARTICLE_SUMMARY_FIELDS))
+    assert articles.dump(_article(), ('title',)) == {'title': '标题'}
+    assert articles.unknown(('title', 'secret')) == ['secret']
+    assert articles.columns(('id', 'tags')) == [Article.id]
+
+
+def test_encoding_matches_isoformat_and_enum_values():
+    article = _article()
+    decoded = loads(dumps(articles.dump(article)))
+    assert decoded['created_at'] == article.created_at.isoformat()
+    assert decoded['updated_at'] is None
+    assert decoded['status'] == 'draft'
+    assert loads(dumps({'role': UserRole.admin, 'big': 2 ** 70})) == {'role': 'admin', 'big': 2 ** 70}
+
+
+def test_provider_output_is_sorted_utf8():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    with app.app_context():
+        response = app.json.response({'b': '中文', 'a': datetime.date(2024, 1, 2)})
+    assert response.get_data() == '{"a":"2024-01-02","b":"中文"}\n'.encode()
+    assert response.mimetype == 'application/json'
+
+
+def test_api_responses_use_serializers(client, make_user, make_article):
+    author = make_user('author')
+    article = make_article(author, title='文章')
+    data = client.get(f'/api/articles/{article.id}?expand=author').get_json()
+    assert data['created_at'] == article.created_at.isoformat()
+    assert data['status'] == 'published'
+    assert data['author'] == {'id': author.id, 'username': 'author', 'role': 'user'}
@@ -0,0 +1,72 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import UserRole, ArticleStatus
+from tests.conftest import count_queries
+
+
+def _statistics(client, headers):
+    return client.get('/api/admin/statistics', headers=headers).get_json()
+
+
+def test_counters_follow_writes(client, make_user, make_article, make_comment, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = auth_header(admin)
+    client.post('/api/auth/register', json={'username': 'reader', 'email': 'reader@example.com', 'password': 'password'})
+    published = make_article(admin, title='已发布')
+    draft = make_article(admin, title='草稿', status=ArticleStatus.draft)
+    make_comment(published, admin)
+
+    assert _statistics(client, headers) == {
+        'total_users': 2, 'total_articles': 2, 'published_articles': 1,
+        'draft_articles': 1, 'total_comments': 1
+    }
+
+    client.put(f'/api/articles/{draft.id}', headers=headers, json={'status': 'published'})
+    assert _statistics(client, headers)['published_articles'] == 2
+    assert _statistics(client, headers)['draft_articles'] == 0
+
+    # 删除文章时其评论随之删除
+    client.delete(f'/api/articles/{published.id}', headers=headers)
+    result = _statistics(client, headers)
+    assert result['total_articles'] == 1
+    assert result['published_articles'] == 1
+    assert result['total_comments'] == 0
+
+
+def test_statistics_is_a_single_query(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = auth_header(admin)
+    with count_queries() as statements:
+        client.get('/api/admin/statistics', headers=headers)
+    assert len([s for s in statements if 'site_counters' in s]) == 1
+    assert not [s for s in statements if 'count(' in s.lower()]
+
+
+def test_deleting_user_updates_counters(client, make_user, make_article, make_comment, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    author = make_user('author')
+    article = make_article(author)
+    make_article(author, status=ArticleStatus.draft)
+    make_comment(article, admin)
+    make_comment(article, author)
+
+    assert client.delete(f'/api/admin/users/{author.id}', headers=auth_header(admin)).status_code == 200
+    assert _statistics(client, auth_header(admin)) == {
+        'total_users': 1, 'total_articles': 0, 'published_articles': 0,
+        'draft_articles': 0, 'total_comments': 0
+    }
+
+
+def test_reconcile_reports_and_fixes_drift(client, make_user, make_article, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    make_article(admin)
+    db.session.execute(text("UPDATE site_counters SET value = value + 3 WHERE name = 'total_articles'"))
+    db.session.commit()
+
+    result = client.post('/api/admin/statistics/reconcile', headers=auth_header(admin)).get_json()
+    assert result['drift'] == {'total_articles': {'stored': 4, 'actual': 1, 'drift': 3}}
+    assert result['statistics']['total_articles'] == 1
+
+    result = client.post('/api/admin/statistics/reconcile', headers=auth_header(admin)).get_json()
+    assert result['drift'] == {}
@@ -0,0 +1,105 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import UserRole, Tag, Category
+from app.schema import upgrade_schema
+
+
+def _counts(client, kind):
+    return {item['name']: item['count'] for item in client.get(f'/api/articles/{kind}').get_json()[kind]}
+
+
+def test_tag_and_category_filters(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = auth_header(admin)
+    for title, category, tags in [('一', '技术', ['python', 'flask']), ('二', '生活', ['python']), ('三', '技术', [])]:
+        response = client.post('/api/articles/', headers=headers, json={
+            'title': title, 'content': '正文', 'status': 'published', 'category': category, 'tags': tags
+        })
+        assert response.status_code == 201
+
+    by_tag = client.get('/api/articles?tag=python').get_json()
+    assert {article['title'] for article in by_tag['articles']} == {'一', '二'}
+    assert by_tag['total'] == 2
+
+    by_category = client.get('/api/articles?category=技术&view=summary').get_json()
+    assert {article['title'] for article in by_category['articles']} == {'一', '三'}
+
+    both = client.get('/api/articles?tag=flask&category=技术&cursor=&with_total=1').get_json()
+    assert [article['title'] for article in both['articles']] == ['一']
+    assert both['total'] == 1
+    assert both['articles'][0]['tags'] == ['python', 'flask']
+
+
+def test_counters_follow_publish_edit_and_delete(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    headers = auth_header(admin)
+    article_id = client.post('/api/articles/', headers=headers, json={
+        'title': '草稿', 'content': '正文', 'category': '技术', 'tags': ['python']
+    }).get_json()['article_id']
+    # 草稿不计数
+    assert _counts(client, 'tags') == {}
+    assert _counts(client, 'categories') == {}
+
+    client.put(f'/api/articles/{article_id}', headers=headers, json={'status': 'published'})
+    assert _counts(client, 'tags') == {'python': 1}
+    assert _counts(client, 'categories') == {'技术': 1}
+
+    client.put(f'/api/articles/{article_id}', headers=headers, json={'category': '生活', 'tags': ['flask', 'python']})
+    assert _counts(client, 'tags') == {'python': 1, 'flask': 1}
+    assert _counts(client, 'categories') == {'生活': 1}
+
+    client.put(f'/api/articles/{article_id}', headers=headers, json={'status': 'draft'})
+    assert _counts(client, 'tags') == {}
+
+    client.put(f'/api/articles/{article_id}', headers=headers, json={'status': 'published'})
+    client.delete(f'/api/articles/{article_id}', headers=headers)
+    assert _counts(client, 'tags') == {}
+    assert _counts(client, 'categories') == {}
+    assert db.session.execute(text('SELECT COUNT(*) FROM article_tags')).scalar() == 0
+
+
+def test_invalid_tags_are_rejected(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    response = client.post('/api/articles/', headers=auth_header(admin), json={
+        'title': '标题', 'content': '正文', 'tags': 'python'
+    })
+    assert response.status_code == 400
+    response = client.post('/api/articles/', headers=auth_header(admin), json={
+        'title': '标题', 'content': '正文', 'tags': [str(i) for i in range(21)]
+    })
+    assert response.status_code == 400
+
+
+def test_deleting_user_recounts_terms(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    author = make_user('author', role=UserRole.admin)
+    client.post('/api/articles/', headers=auth_header(author), json={
+        'title': '标题', 'content': '正文', 'status': 'published', 'category': '技术', 'tags': ['python']
+    })
+    assert _counts(client, 'tags') == {'python': 1}
+
+    assert client.delete(f'/api/admin/users/{author.id}', headers=auth_header(admin)).status_code == 200
+    assert _counts(client, 'tags') == {}
+    assert _counts(client, 'categories') == {}
+
+
+def test_upgrade_migrates_legacy_json_tags(app, make_user):
+    author = make_user('author')
+    with db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE articles ADD COLUMN tags TEXT'))
+        conn.execute(text(
+            "INSERT INTO articles (title, content, author_id, status, category, tags) "
+            f"VALUES ('旧文章', '正文', {author.id}, 'published', '技术', '[\"python\", \"flask\"]')"
+        ))
+    db.session.query(Category).delete()
+    db.session.commit()
+
+    upgrade_schema()
+    # 重复执行不会产生重复数据
+    upgrade_schema()
+
+    assert {tag.name: tag.article_count for tag in Tag.query.all()} == {'python': 1, 'flask': 1}
+    assert {category.name: category.article_count for category in Category.query.all()} == {'技术': 1}
+    assert db.session.execute(text('SELECT COUNT(*) FROM article_tags')).scalar() == 2
+    assert db.session.execute(text('SELECT tags FROM articles')).scalar() is None
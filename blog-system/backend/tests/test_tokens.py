@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app.models import RevokedToken, UserRole
+from app.utils import tokens
+from tests.conftest import count_queries
+
+
+def _login(client, username, password='password'):
+    token = client.post('/api/auth/login', json={'username': username, 'password': password}).get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_warm_requests_skip_user_queries(client, make_user):
+    make_user('alice')
+    headers = _login(client, 'alice')
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+
+    with count_queries() as statements:
+        response = client.get('/api/auth/profile', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['username'] == 'alice'
+    assert statements == []
+
+
+def test_profile_update_is_visible_immediately(client, make_user):
+    make_user('alice')
+    headers = _login(client, 'alice')
+    client.get('/api/auth/profile', headers=headers)
+    client.put('/api/auth/profile', headers=headers, json={'username': 'alice2'})
+    assert client.get('/api/auth/profile', headers=headers).get_json()['username'] == 'alice2'
+
+
+def test_role_change_and_deletion_revoke_tokens(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    make_user('moderator', role=UserRole.admin)
+    make_user('bob')
+    moderator = _login(client, 'moderator')
+    bob = _login(client, 'bob')
+    moderator_id = client.get('/api/auth/profile', headers=moderator).get_json()['id']
+    bob_id = client.get('/api/auth/profile', headers=bob).get_json()['id']
+    assert client.get('/api/admin/statistics', headers=moderator).status_code == 200
+
+    client.put(f'/api/admin/users/{moderator_id}', headers=auth_header(admin), json={'role': 'user'})
+    response = client.get('/api/admin/statistics', headers=moderator)
+    assert response.status_code == 401
+    # 重新登录后获得新角色的令牌
+    assert client.get('/api/admin/statistics', headers=_login(client, 'moderator')).status_code == 403
+
+    client.delete(f'/api/admin/users/{bob_id}', headers=auth_header(admin))
+    assert client.get('/api/auth/profile', headers=bob).status_code == 401
+
+
+def test_password_change_revokes_tokens(client, make_user, auth_header):
+    admin = make_user('admin', role=UserRole.admin)
+    bob = make_user('bob')
+    headers = _login(client, 'bob')
+    client.put(f'/api/admin/users/{bob.id}', headers=auth_header(admin), json={'password': 'new-password'})
+    assert client.get('/api/auth/profile', headers=headers).status_code == 401
+    assert client.get('/api/auth/profile', headers=_login(client, 'bob', 'new-password')).status_code == 200
+
+
+def test_logout_revokes_single_token_or_all(client, make_user):
+    make_user('alice')
+    first = _login(client, 'alice')
+    second = _login(client, 'alice')
+
+    assert client.post('/api/auth/logout', headers=first).status_code == 200
+    assert client.get('/api/auth/profile', headers=first).status_code == 401
+    assert client.get('/api/auth/profile', headers=second).status_code == 200
+
+    third = _login(client, 'alice')
+    assert client.post('/api/auth/logout', headers=second, json={'all': True}).status_code == 200
+    assert client.get('/api/auth/profile', headers=third).status_code == 401
+    assert client.get('/api/auth/profile', headers=_login(client, 'alice')).status_code == 200
+
+
+def test_cached_token_still_expires(client, make_user):
+    alice = make_user('alice')
+    token = create_access_token(identity=str(alice.id), additional_claims={'role': 'user', 'ver': 0},
+                                expires_delta=timedelta(seconds=1))
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+    time.sleep(1.1)
+    assert client.get('/api/auth/profile', headers=headers).status_code == 401
+
+
+def test_logout_reaches_processes_without_shared_cache(app, client, make_user):
+    alice = make_user('alice')
+    headers = _login(client, 'alice')
+    client.get('/api/auth/profile', headers=headers)
+    manager = app.extensions['flask-jwt-extended']
+    stale = manager.user_states.get(alice.id)[1]
+    assert tokens._state_ttl() == app.config['AUTH_STATE_LOCAL_TTL']
+
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert RevokedToken.query.count() == 1
+
+    # 模拟另一个进程：lru 后端的标签版本号不跨进程，缓存中仍是退出前的状态
+    version = tokens._state_version(alice.id)
+    manager.user_states.set(alice.id, (version, stale), time.time() + 5)
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+    # 缓存在 AUTH_STATE_LOCAL_TTL 后过期，重新加载时读到吊销记录
+    manager.user_states.set(alice.id, (version, stale), time.time() - 1)
+    assert client.get('/api/auth/profile', headers=headers).status_code == 401
@@ -0,0 +1,23 @@
+from tests.conftest import count_queries
+
+
+def test_batch_user_lookup_returns_id_map(client, make_user):
+    alice = make_user('alice')
+    bob = make_user('bob')
+    url = f'/api/auth/users?ids={alice.id},{bob.id},999'
+
+    with count_queries() as statements:
+        response = client.get(url)
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['users'][str(alice.id)] == {'id': alice.id, 'username': 'alice', 'role': 'user'}
+    assert data['users'][str(bob.id)]['username'] == 'bob'
+    assert data['missing'] == [999]
+    assert len(statements) == 1
+
+
+def test_batch_user_lookup_rejects_invalid_ids(client):
+    assert client.get('/api/auth/users?ids=1,abc').status_code == 400
+    too_many = ','.join(str(i) for i in range(1, 102))
+    assert client.get(f'/api/auth/users?ids={too_many}').status_code == 400
@@ -0,0 +1,11 @@
+"""
+WSGI入口模块
+==================
+供生产环境的WSGI服务器加载应用，例如：
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()
@@ -5,7 +5,15 @@ CREATE DATABASE IF NOT EXISTS blog_system CHARACTER SET utf8mb4 COLLATE utf8mb4_
 USE blog_system;
 
 -- 删除已存在的表（如果存在）
+DROP TABLE IF EXISTS jobs;
+DROP TABLE IF EXISTS revoked_tokens;
+DROP TABLE IF EXISTS idempotency_keys;
+DROP TABLE IF EXISTS rendered_contents;
+DROP TABLE IF EXISTS site_counters;
 DROP TABLE IF EXISTS comments;
+DROP TABLE IF EXISTS article_tags;
+DROP TABLE IF EXISTS tags;
+DROP TABLE IF EXISTS categories;
 DROP TABLE IF EXISTS articles;
 DROP TABLE IF EXISTS users;
 
@@ -16,6 +24,7 @@ CREATE TABLE users (
     email VARCHAR(100) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
     role ENUM('user', 'admin') DEFAULT 'user',
+    token_version INT NOT NULL DEFAULT 0,  -- 令牌版本号，递增后已签发的令牌全部失效
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -24,12 +33,15 @@ CREATE TABLE articles (
     id INT PRIMARY KEY AUTO_INCREMENT,
     title VARCHAR(200) NOT NULL,
     content TEXT NOT NULL,
+    excerpt VARCHAR(255),  -- 文章摘要，写入文章时由正文生成
+    content_hash VARCHAR(64),  -- 正文的SHA-256，对应 rendered_contents 中的渲染结果；为空时应用启动时补齐
     author_id INT NOT NULL,
     status ENUM('draft', 'published') DEFAULT 'draft',
     category VARCHAR(50),
-    tags TEXT,  -- 在MySQL中使用TEXT存储JSON格式的标签
+    tags TEXT,  -- 旧版JSON格式标签，仅用于导入数据；应用启动时迁移到 tags / article_tags 表后置空
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 1,  -- 版本号，每次更新递增，用于生成ETag
     FOREIGN KEY (author_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
@@ -44,11 +56,98 @@ CREATE TABLE comments (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- 标签表（article_count 为已发布文章数，由应用在写文章时维护）
+CREATE TABLE tags (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    article_count INT NOT NULL DEFAULT 0
+);
+
+-- 分类表（article_count 为已发布文章数，由应用在写文章时维护）
+CREATE TABLE categories (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    article_count INT NOT NULL DEFAULT 0
+);
+
+-- 文章与标签关联表
+CREATE TABLE article_tags (
+    article_id INT NOT NULL,
+    tag_id INT NOT NULL,
+    PRIMARY KEY (article_id, tag_id),
+    FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+);
+
+-- 站点计数表（用户数、文章数、评论数，由应用在写入时增量维护，启动时自动初始化）
+CREATE TABLE site_counters (
+    name VARCHAR(50) PRIMARY KEY,
+    value INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- 正文渲染结果表（以正文的SHA-256为键，正文相同的文章共享一条记录）
+CREATE TABLE rendered_contents (
+    content_hash VARCHAR(64) PRIMARY KEY,
+    renderer_version INT NOT NULL,
+    html MEDIUMTEXT NOT NULL,
+    toc TEXT NOT NULL,  -- 目录（JSON）
+    word_count INT NOT NULL,
+    reading_minutes INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 幂等键表（批量写入等接口按 Idempotency-Key 请求头保存处理结果，过期后由应用清理）
+CREATE TABLE idempotency_keys (
+    scope VARCHAR(150) NOT NULL,
+    `key` VARCHAR(100) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    status_code INT,
+    response_body MEDIUMTEXT,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (scope, `key`)
+);
+
+-- 已吊销令牌表（单个令牌退出登录时写入，随用户认证状态加载，令牌过期后由应用清理）
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(36) PRIMARY KEY,
+    user_id INT NOT NULL,
+    expires_at DATETIME NOT NULL
+);
+
+-- 后台任务表（写操作附带的渲染等工作在同一事务中入队，由后台工作线程或独立工作进程执行，成功后删除）
+CREATE TABLE jobs (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    name VARCHAR(100) NOT NULL,
+    payload TEXT NOT NULL,  -- 处理函数的参数（JSON）
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending / running / failed
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL,
+    run_at DATETIME NOT NULL,  -- 最早执行时间（UTC）
+    locked_by VARCHAR(150),
+    locked_at DATETIME,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- 创建索引以提高查询性能
-CREATE INDEX idx_articles_author_id ON articles(author_id);
-CREATE INDEX idx_articles_status ON articles(status);
-CREATE INDEX idx_comments_article_id ON comments(article_id);
+-- 组合索引与模型（app/models.py）中的声明保持一致；InnoDB二级索引末尾隐含主键，可直接满足 (created_at, id) 排序
+CREATE INDEX idx_users_created_at ON users(created_at);
+CREATE INDEX idx_articles_status_created_at ON articles(status, created_at);
+CREATE INDEX idx_articles_author_status_created_at ON articles(author_id, status, created_at);
+CREATE INDEX idx_articles_created_at ON articles(created_at);
+CREATE INDEX ix_articles_category ON articles(category);
+CREATE INDEX ix_articles_content_hash ON articles(content_hash);
+CREATE INDEX idx_article_tags_tag_id ON article_tags(tag_id);
+CREATE INDEX idx_comments_article_created_at ON comments(article_id, created_at);
 CREATE INDEX idx_comments_user_id ON comments(user_id);
+CREATE INDEX idx_comments_created_at ON comments(created_at);
+CREATE INDEX ix_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX idx_jobs_status_run_at ON jobs(status, run_at);
+CREATE INDEX ix_revoked_tokens_user_id ON revoked_tokens(user_id);
+CREATE INDEX ix_revoked_tokens_expires_at ON revoked_tokens(expires_at);
+-- 文章全文索引（ngram解析器支持中文检索，需要MySQL 5.7.6+）
+CREATE FULLTEXT INDEX ft_articles_title_content ON articles(title, content) WITH PARSER ngram;
 
 -- 插入默认管理员账户（密码：admin123）
 INSERT INTO users (username, email, password_hash, role) VALUES 
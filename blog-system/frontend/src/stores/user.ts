@@ -227,6 +227,13 @@ export const userStore = defineStore('user', {
     },
     
     logout() {
+      // 通知后端吊销当前令牌（失败不影响本地退出）
+      if (this.token) {
+        api.post('/auth/logout', null, {
+          headers: { Authorization: `Bearer ${this.token}` }
+        }).catch(() => {})
+      }
+      
       // 清除状态
       this.token = null
       this.user = null